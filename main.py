@@ -19,11 +19,12 @@ from modules.browser.extractor import (
     get_stock_value_direct, 
     get_tabung_terjual_direct, 
     get_customer_list_from_cards,
-    click_last_customer_card,
-    click_first_customer_card,
-    get_transaction_timestamp
 )
+from modules.browser.detail_fetcher import customer_key, fetch_transaction_timestamps
+from modules.data.transaction_store import sync_transactions
+from modules.core.config import TRANSACTION_SYNC_ENABLED
 from modules.browser.navigation import click_laporan_penjualan_direct, click_rekap_penjualan_direct
+from modules.browser.waits import get_wait_ledger, page_ready, wait_until
 
 # Setup logging
 logging.basicConfig(
@@ -134,44 +135,39 @@ def main():
                         print("[SUCCESS] Berhasil klik menu Rekap Penjualan")
                         
                         # --- TAMBAHAN BARU: List Customer & Klik Terakhir ---
-                        time.sleep(1.0) # Tunggu loading list
+                        wait_until(page, "list customer rekap", page_ready("rekap-penjualan"), replaces=1.0)
                         customers = get_customer_list_from_cards(page)
                         print(f"[INFO] Total customer terdeteksi: {len(customers)}")
                         
                         if customers:
-                           # --- EXTRA ALUR: Klik Last -> Timestamp -> Back -> Klik First ---
-                            # Aksi 1: Klik Customer Paling Bawah (Sudah scroll sebelumnya)
-                            if click_last_customer_card(page):
-                                # Ambil Timestamp Customer Terakhir
-                                ts_last = get_transaction_timestamp(page)
+                            # --- EXTRA ALUR: Timestamp customer paling bawah & paling atas ---
+                            # Detail dibuka di tab paralel (context yang sama), tanpa go_back
+                            timestamps = fetch_transaction_timestamps(
+                                page, customers, which="first_last"
+                            )
+                            with_nik = [c for c in customers if c.get("nik")]
+                            if with_nik and timestamps:
+                                ts_last = timestamps.get(customer_key(with_nik[-1])) or "Not Found"
+                                ts_first = timestamps.get(customer_key(with_nik[0])) or "Not Found"
                                 print(f"[INFO] Waktu Transaksi (Last Customer): {ts_last}")
-                                
-                                # Kembali ke list
-                                print("Navigasi kembali ke daftar customer...")
-                                page.go_back()
-                                time.sleep(1.5) # Wait reload
-                                
-                                # Aksi 2: Klik Customer Paling Atas
-                                if click_first_customer_card(page):
-                                    # Ambil Timestamp Customer Pertama
-                                    ts_first = get_transaction_timestamp(page)
-                                    print(f"[INFO] Waktu Transaksi (First Customer): {ts_first}")
-                                    
-                                    print("\n" + "="*50)
-                                    print("ANALISIS WAKTU INPUT")
-                                    print("="*50)
-                                    print(f"Jam Pertama (Bawah) : {ts_last}")
-                                    print(f"Jam Kedua (Atas)    : {ts_first}")
-                                    print("-> Berarti pangkalan input berada dalam kurun waktu tersebut")
-                                    print("="*50 + "\n")
-                                    
-                                    # Kembali lagi (optional, untuk cleanup)
-                                    page.go_back()
-                                    time.sleep(0.5)    # ----------------------------------------------------
-                                    
-                                else:
-                                    print("[WARNING] Gagal klik menu Rekap Penjualan")
+                                print(f"[INFO] Waktu Transaksi (First Customer): {ts_first}")
+
+                                print("\n" + "="*50)
+                                print("ANALISIS WAKTU INPUT")
+                                print("="*50)
+                                print(f"Jam Pertama (Bawah) : {ts_last}")
+                                print(f"Jam Kedua (Atas)    : {ts_first}")
+                                print("-> Berarti pangkalan input berada dalam kurun waktu tersebut")
+                                print("="*50 + "\n")
+                            else:
+                                print("[WARNING] Gagal mengambil timestamp transaksi customer")
                             # ----------------------------------------------------------------
+
+                        # --- Sync riwayat transaksi (inkremental, opsional) ---
+                        if TRANSACTION_SYNC_ENABLED:
+                            sync_summary = sync_transactions(page, account["pangkalan_id"])
+                            print(f"[INFO] Sync transaksi: {sync_summary['new']} baru, "
+                                  f"{sync_summary['failed']} gagal")
                         
                     else:
                         print("[WARNING] Gagal klik menu Rekap Penjualan")
@@ -220,6 +216,11 @@ def main():
         minutes = int(duration // 60)
         seconds = int(duration % 60)
         print(f"\n[INFO] Total Waktu Eksekusi: {minutes} menit {seconds} detik")
+        waits = get_wait_ledger().summary()
+        print(
+            f"[INFO] Sleep tetap dihemat: {waits['saved']:.1f} detik "
+            f"(diganti {waits['replaced']:.1f}, ditunggu {waits['waited']:.1f})"
+        )
         print("Selesai.")
 
 if __name__ == "__main__":
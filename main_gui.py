@@ -13,6 +13,7 @@ except ImportError:
 import base64
 import io
 import logging
+import multiprocessing
 import os
 import sys
 import time
@@ -38,8 +39,11 @@ from modules.browser.navigation import (
     click_laporan_penjualan_direct,
 )
 from modules.browser.setup import PlaywrightBrowserManager
+from modules.core.async_process_manager import AsyncProcessManager
+from modules.core.config import AUTOMATION_ENGINE, NUM_SHARDS
 from modules.core.network import check_before_step, is_online, wait_for_internet
 from modules.core.process_manager import ProcessManager
+from modules.core.sharded_runner import ShardedRunner
 from modules.core.telemetry import get_telemetry_manager
 from modules.core.utils import setup_logging
 from modules.data.excel import save_to_excel_pivot_format
@@ -269,7 +273,15 @@ def start_automation(accounts, settings):
         settings (dict): Settings automation {
             "headless": bool,
             "date": str (YYYY-MM-DD atau null),
-            "delay": float
+            "dates": list tanggal (YYYY-MM-DD) atau {"start", "end"} (opsional,
+                multi-tanggal dalam satu login per akun; menggantikan "date")
+            "delay": float,
+            "max_workers": int (opsional, default MAX_WORKERS di config)
+            "engine": "sync" | "async" | "api" (opsional, default AUTOMATION_ENGINE di config)
+            "shards": int (opsional, >1 = ShardedRunner multi-proses)
+            "use_session": bool (opsional, default True - pakai session tersimpan)
+            "pipeline_depth": int (opsional, default PIPELINE_DEPTH di config)
+            "launch_profile": str (opsional, default BROWSER_LAUNCH_PROFILE di config)
         }
 
     Returns:
@@ -362,9 +374,20 @@ def run_automation_background(accounts, settings):
         }
 
         # Initialize Manager with Supabase client for direct database storage
-        process_manager_instance = ProcessManager(
-            callbacks, supabase_client=supabase_manager
-        )
+        engine = settings.get("engine", AUTOMATION_ENGINE)
+        num_shards = int(settings.get("shards") or NUM_SHARDS)
+        if num_shards > 1:
+            # Shard per proses, masing-masing membuat Supabase client sendiri
+            process_manager_instance = ShardedRunner(
+                callbacks, supabase_client=supabase_manager, num_shards=num_shards
+            )
+        else:
+            manager_class = (
+                AsyncProcessManager if engine == "async" else ProcessManager
+            )
+            process_manager_instance = manager_class(
+                callbacks, supabase_client=supabase_manager
+            )
 
         # Run Process - results are saved directly to database
         results = process_manager_instance.run(accounts, settings)
@@ -854,4 +877,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Wajib untuk multiprocessing (spawn) pada build executable
+    multiprocessing.freeze_support()
     main()
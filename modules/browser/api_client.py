@@ -0,0 +1,340 @@
+"""
+HTTP API client untuk portal merchant (tanpa Chromium)
+File ini login dan mengambil stok dashboard + total Laporan Penjualan langsung
+dari backend API yang dipanggil SPA setelah login, memakai satu HTTP session
+yang di-pool (keep-alive, HTTP/2 jika httpx + h2 tersedia).
+
+Path endpoint dan nama field diatur di config (API_ENDPOINTS, API_*_KEYS),
+base_url bisa diganti sehingga client bisa diuji terhadap server lokal yang
+meniru endpoint portal.
+
+Usage:
+    client = create_api_client()
+    data = client.fetch_account_data(username, pin, selected_date)
+    # {"stok": "89", "tabung_terjual": 12}
+"""
+
+import logging
+import re
+from datetime import datetime
+
+logger = logging.getLogger("api_client")
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+try:
+    from modules.core.config import (
+        API_BASE_URL,
+        API_DATE_FORMAT,
+        API_ENDPOINTS,
+        API_HTTP2,
+        API_LOGIN_FIELDS,
+        API_SALES_DATE_PARAMS,
+        API_SALES_KEYS,
+        API_STOCK_KEYS,
+        API_TIMEOUT,
+        API_TOKEN_KEYS,
+    )
+except ImportError:
+    API_BASE_URL = "https://api-map.my-pertamina.id"
+    API_ENDPOINTS = {
+        "login": "/general/v1/users/login",
+        "stock": "/general/v2/products",
+        "sales": "/general/v1/transactions/report",
+    }
+    API_LOGIN_FIELDS = {"username": "username", "pin": "password"}
+    API_TOKEN_KEYS = ("accessToken", "access_token", "token")
+    API_STOCK_KEYS = ("stockAvailable", "stock", "stok")
+    API_SALES_KEYS = ("totalSold", "total_sold", "tabungTerjual", "totalQuantity")
+    API_SALES_DATE_PARAMS = ("startDate", "endDate")
+    API_DATE_FORMAT = "%Y-%m-%d"
+    API_TIMEOUT = 15
+    API_HTTP2 = True
+
+
+class ApiClientError(Exception):
+    """Request API gagal (HTTP error, payload tidak dikenali, library tidak ada)"""
+
+
+class ApiAuthError(ApiClientError):
+    """Login API ditolak (username/PIN salah atau akun terkunci)"""
+
+
+# Angka dengan pemisah ribuan saja ("1.234", "12,500"), bukan desimal ("12.0")
+_THOUSANDS_RE = re.compile(r"^-?\d{1,3}([.,]\d{3})+$")
+
+
+# ============================================
+# PARSER PAYLOAD (dipakai juga oleh response capture)
+# ============================================
+
+
+def find_field(payload, keys):
+    """
+    Cari nilai field pertama yang namanya ada di keys (depth-first, termasuk
+    di dalam list/dict bersarang seperti {"data": {"stockAvailable": 89}})
+
+    Args:
+        payload: JSON yang sudah di-decode
+        keys (tuple): Nama field kandidat, urutan = prioritas
+
+    Returns:
+        Nilai field, None jika tidak ditemukan
+    """
+    if isinstance(payload, dict):
+        for key in keys:
+            if key in payload and payload[key] is not None:
+                return payload[key]
+        children = payload.values()
+    elif isinstance(payload, list):
+        children = payload
+    else:
+        return None
+
+    for child in children:
+        if isinstance(child, (dict, list)):
+            value = find_field(child, keys)
+            if value is not None:
+                return value
+    return None
+
+
+def _to_int(value):
+    """
+    Konversi angka dari payload ke int, None jika gagal.
+    "1.234" / "12,500" dibaca sebagai ribuan; "12.0" / "12,0" sebagai desimal (12)
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if _THOUSANDS_RE.match(text):
+        return int(text.replace(".", "").replace(",", ""))
+    try:
+        return int(float(text.replace(",", ".")))
+    except ValueError:
+        return None
+
+
+def parse_token(payload):
+    """
+    Returns:
+        str: Access token dari response login, None jika tidak ada
+    """
+    token = find_field(payload, API_TOKEN_KEYS)
+    return token if isinstance(token, str) and token else None
+
+
+def parse_stock(payload):
+    """
+    Returns:
+        str: Nilai stok (format sama dengan get_stock_value_direct), None jika
+             payload bukan payload stok
+    """
+    value = _to_int(find_field(payload, API_STOCK_KEYS))
+    return str(value) if value is not None else None
+
+
+def parse_tabung_terjual(payload):
+    """
+    Returns:
+        int: Total tabung terjual, None jika payload bukan payload penjualan
+    """
+    return _to_int(find_field(payload, API_SALES_KEYS))
+
+
+# ============================================
+# CLIENT
+# ============================================
+
+
+class MerchantApiClient:
+    """
+    Client HTTP untuk backend portal merchant.
+    Satu instance = satu connection pool; token disimpan per panggilan
+    sehingga instance bisa dipakai bergantian oleh banyak akun (satu worker).
+    """
+
+    def __init__(self, base_url=None, timeout=None, endpoints=None, http2=None):
+        """
+        Args:
+            base_url (str): Base URL API. Default API_BASE_URL (bisa diarahkan
+                ke server lokal untuk pengujian)
+            timeout (float): Timeout request (detik). Default API_TIMEOUT
+            endpoints (dict): Override path endpoint {login, stock, sales}
+            http2 (bool): Pakai HTTP/2 jika httpx + h2 tersedia. Default API_HTTP2
+        """
+        self.base_url = (base_url or API_BASE_URL).rstrip("/")
+        self.timeout = timeout if timeout is not None else API_TIMEOUT
+        self.endpoints = dict(API_ENDPOINTS)
+        if endpoints:
+            self.endpoints.update(endpoints)
+        self.http2 = API_HTTP2 if http2 is None else http2
+        self.backend = None
+        self._session = self._create_session()
+
+    def _create_session(self):
+        """Buat session ter-pool: httpx (HTTP/2 jika bisa) atau requests.Session"""
+        headers = {"Accept": "application/json", "Content-Type": "application/json"}
+
+        if httpx is not None:
+            limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60)
+            try:
+                session = httpx.Client(
+                    http2=self.http2,
+                    timeout=self.timeout,
+                    headers=headers,
+                    limits=limits,
+                )
+                self.backend = "httpx-h2" if self.http2 else "httpx"
+            except ImportError:
+                # http2=True butuh paket h2
+                session = httpx.Client(timeout=self.timeout, headers=headers, limits=limits)
+                self.backend = "httpx"
+            return session
+
+        if requests is not None:
+            session = requests.Session()
+            session.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.backend = "requests"
+            return session
+
+        raise ApiClientError("httpx atau requests tidak terinstall")
+
+    def _request(self, method, endpoint, token=None, **kwargs):
+        """
+        Kirim request ke endpoint dan decode JSON
+
+        Args:
+            method (str): "GET" / "POST"
+            endpoint (str): Key di self.endpoints
+            token (str): Bearer token hasil login
+
+        Returns:
+            dict/list: Payload JSON
+
+        Raises:
+            ApiAuthError: Status 401/403
+            ApiClientError: Status error lain, koneksi gagal, atau bukan JSON
+        """
+        url = f"{self.base_url}{self.endpoints[endpoint]}"
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+
+        try:
+            if self.backend == "requests":
+                response = self._session.request(
+                    method, url, headers=headers, timeout=self.timeout, **kwargs
+                )
+            else:
+                response = self._session.request(method, url, headers=headers, **kwargs)
+        except Exception as e:
+            raise ApiClientError(f"Request {endpoint} gagal: {str(e)}") from e
+
+        if response.status_code in (401, 403):
+            raise ApiAuthError(f"{endpoint} ditolak (HTTP {response.status_code})")
+        if response.status_code >= 400:
+            raise ApiClientError(f"{endpoint} gagal (HTTP {response.status_code})")
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise ApiClientError(f"Response {endpoint} bukan JSON") from e
+
+    def login(self, username, pin):
+        """
+        Login dan ambil access token
+
+        Returns:
+            str: Access token
+
+        Raises:
+            ApiAuthError: Kredensial ditolak (HTTP 401/403)
+            ApiClientError: Token tidak ada di response (payload tidak dikenali)
+        """
+        body = {API_LOGIN_FIELDS["username"]: username, API_LOGIN_FIELDS["pin"]: pin}
+        payload = self._request("POST", "login", json=body)
+        token = parse_token(payload)
+        if not token:
+            raise ApiClientError("Token tidak ditemukan di response login")
+        return token
+
+    def get_stock(self, token):
+        """
+        Returns:
+            str: Nilai stok dashboard
+
+        Raises:
+            ApiClientError: Payload stok tidak dikenali
+        """
+        stock = parse_stock(self._request("GET", "stock", token=token))
+        if stock is None:
+            raise ApiClientError("Field stok tidak ditemukan di response")
+        return stock
+
+    def get_tabung_terjual(self, token, selected_date=None):
+        """
+        Args:
+            token (str): Access token
+            selected_date (datetime): Tanggal laporan. Default hari ini
+
+        Returns:
+            int: Total tabung terjual pada tanggal tersebut
+
+        Raises:
+            ApiClientError: Payload penjualan tidak dikenali
+        """
+        date_str = (selected_date or datetime.now()).strftime(API_DATE_FORMAT)
+        start_param, end_param = API_SALES_DATE_PARAMS
+        params = {start_param: date_str, end_param: date_str}
+
+        terjual = parse_tabung_terjual(
+            self._request("GET", "sales", token=token, params=params)
+        )
+        if terjual is None:
+            raise ApiClientError("Field tabung terjual tidak ditemukan di response")
+        return terjual
+
+    def fetch_account_data(self, username, pin, selected_date=None):
+        """
+        Login lalu ambil stok dan tabung terjual satu akun
+
+        Returns:
+            dict: {"stok": str, "tabung_terjual": int}
+        """
+        token = self.login(username, pin)
+        return {
+            "stok": self.get_stock(token),
+            "tabung_terjual": self.get_tabung_terjual(token, selected_date),
+        }
+
+    def close(self):
+        """Tutup connection pool"""
+        try:
+            self._session.close()
+        except Exception:
+            pass
+
+
+def create_api_client(base_url=None):
+    """
+    Returns:
+        MerchantApiClient: Client baru, None jika httpx/requests tidak tersedia
+    """
+    try:
+        return MerchantApiClient(base_url=base_url)
+    except ApiClientError as e:
+        logger.warning(f"API client tidak tersedia: {str(e)}")
+        return None
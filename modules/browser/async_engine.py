@@ -0,0 +1,835 @@
+"""
+Async automation engine berbasis playwright.async_api
+File ini berisi versi asyncio dari flow login, navigasi, dan ekstraksi data
+sehingga banyak akun bisa diproses bersamaan dalam satu event loop
+(tanpa satu OS thread per browser).
+
+Selector, JS detektor/predicate, aturan (jalur klik kalender, filter tanggal
+via URL) dan parser text dipakai bersama dengan modul sync (login.py,
+navigation.py, extractor.py, page_routes.py, waits.py); file ini hanya berisi
+I/O async-nya. Tidak ada sleep tetap: setiap langkah menunggu kondisi nyata.
+"""
+
+import asyncio
+import itertools
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
+
+from modules.browser.extractor import (
+    TABUNG_TERJUAL_READY_JS,
+    TEXT_SNAPSHOT_JS,
+    parse_stock_from_snapshot,
+    parse_tabung_terjual_from_snapshot,
+)
+from modules.browser.login import (
+    AUTH_ERROR_WATCH_JS,
+    AUTH_URL_KEYWORDS,
+    DASHBOARD_TARGET,
+    EMAIL_TARGET,
+    LOGIN_BUTTON_TARGET,
+    LOGIN_FORM_TIMEOUT,
+    LOGIN_OUTCOME_JS,
+    LOGIN_OUTCOME_RETRY_MS,
+    LOGIN_OUTCOME_TIMEOUT,
+    PIN_TARGET,
+    _any_of,
+    is_navigation_error,
+    is_page_closed_error,
+    login_outcome_args,
+)
+from modules.browser.navigation import (
+    CALENDAR_DAY_SELECTED_JS,
+    CALENDAR_DAY_SELECTOR,
+    CALENDAR_HEADER_CHANGED_JS,
+    CALENDAR_HEADER_SELECTOR,
+    CALENDAR_MONTH_SELECTOR,
+    CALENDAR_NEXT_SELECTOR,
+    CALENDAR_PREV_SELECTOR,
+    CALENDAR_STEP_TIMEOUT,
+    DATE_RANGE_BUTTON_TARGET,
+    LAPORAN_PENJUALAN_TARGET,
+    MONTH_NAME_TO_NUMBER,
+    NAVIGATION_READY_TIMEOUT,
+    calendar_click_plan,
+    date_filter_url,
+    date_range_label,
+    parse_calendar_header,
+    record_date_filter,
+)
+from modules.browser.page_routes import READY_PREDICATES
+from modules.browser.selector_registry import get_selector_registry
+from modules.browser.setup import (
+    BROWSER_LAUNCH_PROFILE,
+    DEFAULT_TIMEOUT,
+    DEFAULT_USER_AGENT,
+    DEFAULT_VIEWPORT,
+    NAVIGATION_TIMEOUT,
+    STEALTH_INIT_SCRIPT,
+    _resolve_executable_path,
+    get_launch_args,
+    get_telemetry_manager,
+    is_headless_mode,
+)
+from modules.browser.waits import (
+    DOM_QUIET_JS,
+    POLL_INTERVAL_MS,
+    WAIT_DEFAULT_TIMEOUT,
+    WAIT_DOM_QUIET_MS,
+)
+
+from modules.core.constants import LOGIN_URL
+
+try:
+    from modules.core.config import GAGAL_MASUK_AKUN_TIMEOUT
+except ImportError:
+    GAGAL_MASUK_AKUN_TIMEOUT = 120
+
+logger = logging.getLogger("playwright_automation")
+
+
+# ============================================
+# BROWSER POOL (ASYNC)
+# ============================================
+
+
+class AsyncPooledContext:
+    """
+    Satu BrowserContext terisolasi milik satu akun, dipinjam dari AsyncBrowserPool
+    """
+
+    def __init__(self, pool, context: BrowserContext, page: Page):
+        self.pool = pool
+        self.context: BrowserContext = context
+        self.page: Page = page
+
+    async def close(self):
+        """Kembalikan context ke pool (context ditutup, browser tetap hidup)"""
+        if self.context is None:
+            return
+        await self.pool.release(self)
+
+
+class AsyncBrowserPool:
+    """
+    Versi async dari BrowserPool: satu Playwright driver dan satu Chromium
+    untuk seluruh run, BrowserContext baru per akun.
+    Semua method harus dipanggil dari event loop yang sama.
+    """
+
+    def __init__(self, headless=None, profile=None):
+        """
+        Args:
+            headless (bool): Mode headless. Jika None, gunakan config default
+            profile (str): Launch profile (LAUNCH_PROFILES). Default dari config
+        """
+        self.headless = is_headless_mode() if headless is None else headless
+        self.profile = profile or BROWSER_LAUNCH_PROFILE
+        self.playwright: Playwright = None
+        self.browser: Browser = None
+        self.active_leases = []
+        self.contexts_created = 0
+        self.telemetry = get_telemetry_manager() if get_telemetry_manager else None
+        self._start_lock = asyncio.Lock()
+
+    def _record_duration(self, operation_name, started_at):
+        """Catat durasi operasi pool ke telemetry (jika tersedia)"""
+        if self.telemetry:
+            self.telemetry.record_duration(operation_name, time.time() - started_at)
+
+    def is_running(self):
+        """
+        Returns:
+            bool: True jika browser masih hidup dan terkoneksi
+        """
+        try:
+            return self.browser is not None and self.browser.is_connected()
+        except Exception:
+            return False
+
+    async def start(self):
+        """
+        Start Playwright driver dan launch Chromium (sekali per run)
+
+        Returns:
+            bool: True jika browser siap digunakan
+        """
+        async with self._start_lock:
+            if self.is_running():
+                return True
+
+            print(f"Menjalankan shared Chromium (async, profile '{self.profile}')...")
+            started_at = time.time()
+            try:
+                if self.playwright is None:
+                    self.playwright = await async_playwright().start()
+
+                executable_path = _resolve_executable_path()
+                launch_kwargs = {
+                    "headless": self.headless,
+                    "args": get_launch_args(self.profile),
+                    "timeout": 30000,
+                }
+                if executable_path:
+                    launch_kwargs["executable_path"] = executable_path
+
+                self.browser = await self.playwright.chromium.launch(**launch_kwargs)
+                self._record_duration("browser_launch", started_at)
+                print(f"✓ Shared Chromium (async) siap ({time.time() - started_at:.2f}s)")
+                return True
+
+            except Exception as e:
+                print(f"✗ Error launch shared Chromium (async): {str(e)}")
+                logger.error(f"Error launch AsyncBrowserPool: {str(e)}", exc_info=True)
+                await self.close()
+                return False
+
+    async def acquire(self):
+        """
+        Buat BrowserContext + Page baru yang terisolasi untuk satu akun
+
+        Returns:
+            AsyncPooledContext: Lease berisi context dan page, atau None jika gagal
+        """
+        if not await self.start():
+            return None
+
+        started_at = time.time()
+        context = None
+        try:
+            context = await self.browser.new_context(
+                viewport=DEFAULT_VIEWPORT,
+                user_agent=DEFAULT_USER_AGENT,
+                ignore_https_errors=True,
+                java_script_enabled=True,
+                bypass_csp=True,
+                permissions=[],
+            )
+            context.set_default_timeout(DEFAULT_TIMEOUT)
+            context.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
+            await context.add_init_script(STEALTH_INIT_SCRIPT)
+            page = await context.new_page()
+            self._record_duration("context_create", started_at)
+
+            lease = AsyncPooledContext(self, context, page)
+            self.active_leases.append(lease)
+            self.contexts_created += 1
+            return lease
+
+        except Exception as e:
+            print(f"✗ Error membuat browser context (async): {str(e)}")
+            logger.error(f"Error acquire AsyncBrowserPool: {str(e)}", exc_info=True)
+            if context:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            return None
+
+    async def release(self, lease: AsyncPooledContext):
+        """
+        Tutup context milik lease. Browser tetap hidup untuk akun berikutnya.
+        """
+        try:
+            if lease.context:
+                await lease.context.close()
+        except Exception as e:
+            logger.warning(f"Warning saat menutup context (async): {str(e)}")
+        finally:
+            lease.context = None
+            lease.page = None
+            if lease in self.active_leases:
+                self.active_leases.remove(lease)
+
+    async def close(self):
+        """Tutup semua context aktif, browser, dan Playwright driver"""
+        for lease in list(self.active_leases):
+            await self.release(lease)
+
+        try:
+            if self.browser:
+                await self.browser.close()
+        except Exception as e:
+            logger.warning(f"Warning saat menutup shared browser (async): {str(e)}")
+        finally:
+            self.browser = None
+
+        try:
+            if self.playwright:
+                await self.playwright.stop()
+        except Exception as e:
+            logger.warning(f"Warning saat stop Playwright (async): {str(e)}")
+        finally:
+            self.playwright = None
+
+        print(f"✓ AsyncBrowserPool ditutup ({self.contexts_created} context dibuat)")
+
+
+# ============================================
+# HELPER
+# ============================================
+
+
+async def _first_visible(page: Page, target, timeout: int = 2000):
+    """
+    Cari locator pertama yang visible dari selector target registry
+    (versi async dari SelectorRegistry.first_visible)
+
+    Args:
+        page (Page): Playwright async Page
+        target (str): Nama target di selector registry
+        timeout (int): Timeout wait visible per selector (ms)
+
+    Returns:
+        Locator: Locator yang visible, None jika tidak ada
+    """
+    registry = get_selector_registry()
+    for selector in registry.candidates(target):
+        started_at = time.perf_counter()
+        try:
+            locator = page.locator(selector).first
+            if await locator.count() > 0:
+                await locator.wait_for(state="visible", timeout=timeout)
+                registry.record(target, selector, True, time.perf_counter() - started_at)
+                return locator
+        except Exception:
+            pass
+        registry.record(target, selector, False, time.perf_counter() - started_at)
+    return None
+
+
+async def _wait_any_visible(page: Page, target, timeout: int):
+    """
+    Tunggu selector mana pun dari target registry visible dalam satu wait
+    (locator gabungan _any_of, sama dengan flow sync), lalu catat selector
+    yang cocok ke registry
+
+    Returns:
+        Locator: Locator gabungan, None jika timeout
+    """
+    locator = _any_of(page, target)
+    started_at = time.perf_counter()
+    try:
+        await locator.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        return None
+
+    registry = get_selector_registry()
+    duration = time.perf_counter() - started_at
+    for selector in registry.candidates(target):
+        try:
+            visible = await page.locator(selector).first.is_visible()
+        except Exception:
+            visible = False
+        registry.record(target, selector, visible, duration if visible else 0.0)
+        if visible:
+            break
+    return locator
+
+
+# ============================================
+# LOGIN
+# ============================================
+
+
+async def _click_login_button_async(page: Page, timeout: int = LOGIN_FORM_TIMEOUT) -> bool:
+    """
+    Versi async dari _click_login_button: klik MASUK setelah tombol enabled
+    (actionability Playwright), force click jika terhalang overlay
+
+    Returns:
+        bool: True jika tombol berhasil diklik
+    """
+    login_button = await _wait_any_visible(page, LOGIN_BUTTON_TARGET, timeout)
+    if login_button is None:
+        return False
+    try:
+        await login_button.click(timeout=timeout)
+    except PlaywrightTimeoutError:
+        if not await login_button.is_enabled():
+            return False
+        await login_button.click(force=True)
+    return True
+
+
+async def login_direct_async(
+    page: Page, username: str, pin: str, wait_on_lockout: bool = True
+):
+    """
+    Versi async dari login_direct (lihat modules.browser.login.login_direct).
+    Setiap langkah menunggu sinyal nyata (field visible, tombol enabled,
+    detektor hasil login), bukan sleep tetap.
+
+    Args:
+        page (Page): Playwright async Page
+        username (str): Username berupa email atau nomor HP merchant
+        pin (str): PIN untuk authentication ke portal
+        wait_on_lockout (bool): True = tunggu GAGAL_MASUK_AKUN_TIMEOUT lalu klik
+                          ulang. False = langsung return dengan 'retry_after'
+                          (detik) supaya pemanggil bisa memarkir akun dan
+                          melepas slot konkurensinya
+
+    Returns:
+        tuple: (success, dict) - Status login dan info gagal masuk akun
+    """
+    print(f"\n=== LOGIN ASYNC UNTUK {username} ===")
+
+    info = {
+        "gagal_masuk_akun": False,
+        "count": 0,
+        "outcome": None,
+        "retry_after": None,
+    }
+
+    try:
+        await page.goto(LOGIN_URL, wait_until="domcontentloaded")
+
+        email_input = await _wait_any_visible(page, EMAIL_TARGET, LOGIN_FORM_TIMEOUT)
+        if email_input is None:
+            print(f"✗ Gagal mengisi email ({username})")
+            return False, info
+        await email_input.fill(username)
+
+        pin_input = await _wait_any_visible(page, PIN_TARGET, LOGIN_FORM_TIMEOUT)
+        if pin_input is None:
+            print(f"✗ Gagal mengisi PIN ({username})")
+            return False, info
+        await pin_input.fill(pin)
+
+        try:
+            await page.evaluate(AUTH_ERROR_WATCH_JS, list(AUTH_URL_KEYWORDS))
+        except Exception:
+            pass
+        if not await _click_login_button_async(page):
+            print(f"✗ Gagal mengklik tombol login ({username})")
+            return False, info
+
+        # === TUNGGU HASIL (detektor yang sama dengan flow sync) ===
+        outcome = await detect_login_outcome_async(page)
+
+        if outcome["type"] == "gagal_masuk":
+            info["gagal_masuk_akun"] = True
+            info["count"] = 1
+
+            if not wait_on_lockout:
+                # Pemanggil yang menjadwalkan retry (deferred retry queue)
+                print(
+                    f"✗ 'Gagal Masuk Akun' untuk {username}, diparkir "
+                    f"{GAGAL_MASUK_AKUN_TIMEOUT} detik"
+                )
+                info["outcome"] = outcome["type"]
+                info["retry_after"] = GAGAL_MASUK_AKUN_TIMEOUT
+                return False, info
+
+            # Cooldown lockout dari server (bukan menunggu UI); asyncio.sleep
+            # tidak memblok akun lain di event loop yang sama
+            print(
+                f"✗ 'Gagal Masuk Akun' untuk {username}, "
+                f"menunggu {GAGAL_MASUK_AKUN_TIMEOUT} detik..."
+            )
+            await asyncio.sleep(GAGAL_MASUK_AKUN_TIMEOUT)
+
+            # Reset tanda status auth percobaan pertama (lockout juga 4xx)
+            try:
+                await page.evaluate(AUTH_ERROR_WATCH_JS, list(AUTH_URL_KEYWORDS))
+            except Exception:
+                pass
+            if not await _click_login_button_async(page):
+                info["outcome"] = outcome["type"]
+                return False, info
+            outcome = await detect_login_outcome_async(page)
+
+        info["outcome"] = outcome["type"]
+
+        if outcome["type"] == "success":
+            print(f"✓ Login berhasil ({username})")
+            return True, info
+
+        if outcome["type"] == "auth_rejected":
+            print(
+                f"✗ Login gagal - ditolak server ({outcome['detail']}), "
+                f"cek username/PIN ({username})"
+            )
+            return False, info
+
+        print(f"✗ Login gagal - {outcome['type']} ({username})")
+        return False, info
+
+    except Exception as e:
+        print(f"✗ Error dalam login async: {str(e)}")
+        logger.error(f"Error dalam login async: {str(e)}", exc_info=True)
+        return False, info
+
+
+async def detect_login_outcome_async(page: Page, timeout: int = LOGIN_OUTCOME_TIMEOUT):
+    """
+    Versi async dari detect_login_outcome
+
+    Returns:
+        dict: {"type": "success" | "gagal_masuk" | "network_error"
+               | "auth_rejected" | "timeout" | "error", "detail": str atau None}
+    """
+    deadline = time.time() + timeout / 1000
+
+    while True:
+        remaining = int((deadline - time.time()) * 1000)
+        if remaining <= 0:
+            return {"type": "timeout", "detail": None}
+
+        try:
+            return await page.evaluate(LOGIN_OUTCOME_JS, login_outcome_args(remaining))
+        except Exception as e:
+            if page.is_closed() or is_page_closed_error(e):
+                return {"type": "error", "detail": str(e)}
+            # Full navigation menghancurkan execution context detektor
+            if "merchant-login" not in page.url:
+                return {"type": "success", "detail": page.url}
+            try:
+                if is_navigation_error(e):
+                    await page.wait_for_load_state("domcontentloaded", timeout=remaining)
+                else:
+                    # Error lain: jeda dulu supaya tidak busy-spin sampai deadline
+                    logger.debug(f"Detektor login async gagal, diulang: {e}")
+                    await page.wait_for_timeout(min(LOGIN_OUTCOME_RETRY_MS, remaining))
+            except Exception as wait_error:
+                if page.is_closed() or is_page_closed_error(wait_error):
+                    return {"type": "error", "detail": str(wait_error)}
+
+
+async def wait_for_dashboard_async(page: Page, timeout: int = 20000) -> bool:
+    """
+    Versi async dari wait_for_dashboard
+
+    Returns:
+        bool: True jika dashboard berhasil dimuat
+    """
+    try:
+        await page.wait_for_url(
+            lambda url: "merchant-login" not in url, timeout=timeout
+        )
+        if await _first_visible(page, DASHBOARD_TARGET) is not None:
+            return True
+        return "merchant-login" not in page.url
+
+    except PlaywrightTimeoutError:
+        return "merchant-login" not in page.url
+    except Exception as e:
+        print(f"⚠ Error menunggu dashboard (async): {str(e)}")
+        return False
+
+
+# ============================================
+# WAIT (kondisi & JS yang sama dengan modules.browser.waits)
+# ============================================
+
+# Key unik per wait supaya state polling di browser tidak tercampur
+_wait_keys = itertools.count(1)
+
+
+async def _wait_js(page: Page, js: str, arg=None, timeout: int = WAIT_DEFAULT_TIMEOUT) -> bool:
+    """
+    Tunggu predicate JS bernilai truthy
+
+    Returns:
+        bool: True jika terpenuhi, False jika timeout
+    """
+    try:
+        await page.wait_for_function(
+            js, arg=arg, polling=POLL_INTERVAL_MS, timeout=timeout
+        )
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+async def _wait_page_ready(page: Page, name: str, timeout: int = WAIT_DEFAULT_TIMEOUT) -> bool:
+    """Predicate halaman siap (page_routes.READY_PREDICATES)"""
+    return await _wait_js(page, READY_PREDICATES[name], timeout=timeout)
+
+
+async def _wait_dom_quiet(page: Page, timeout: int = WAIT_DEFAULT_TIMEOUT) -> bool:
+    """Tidak ada mutasi DOM selama WAIT_DOM_QUIET_MS"""
+    return await _wait_js(
+        page,
+        DOM_QUIET_JS,
+        arg={"quietMs": WAIT_DOM_QUIET_MS, "key": f"async-{next(_wait_keys)}"},
+        timeout=timeout,
+    )
+
+
+# ============================================
+# NAVIGASI
+# ============================================
+
+
+async def click_laporan_penjualan_async(page: Page) -> bool:
+    """
+    Versi async dari click_laporan_penjualan_direct: klik menu sidebar lalu
+    tunggu predicate halaman "laporan-penjualan" siap
+
+    Returns:
+        bool: True jika berhasil, False jika gagal
+    """
+    try:
+        registry = get_selector_registry()
+        for selector in registry.candidates(LAPORAN_PENJUALAN_TARGET):
+            started_at = time.perf_counter()
+            success = False
+            try:
+                menu_item = page.locator(selector).first
+                if await menu_item.count() > 0:
+                    await menu_item.click(timeout=3000)
+                    success = await _wait_page_ready(
+                        page, "laporan-penjualan", NAVIGATION_READY_TIMEOUT
+                    )
+            except Exception:
+                pass
+            registry.record(
+                LAPORAN_PENJUALAN_TARGET, selector, success, time.perf_counter() - started_at
+            )
+            if success:
+                return True
+
+        print("✗ Gagal menemukan menu Laporan Penjualan (async)")
+        return False
+
+    except Exception as e:
+        logger.error(f"Error click_laporan_penjualan_async: {str(e)}", exc_info=True)
+        return False
+
+
+async def _calendar_header_text(page: Page) -> Optional[str]:
+    header = page.locator(CALENDAR_HEADER_SELECTOR).first
+    if await header.count() == 0:
+        return None
+    return ((await header.text_content()) or "").strip()
+
+
+async def _click_and_wait_header(page: Page, locator, timeout: int) -> bool:
+    """Klik elemen kalender lalu tunggu header berubah"""
+    before = await _calendar_header_text(page)
+    await locator.click()
+    return await _wait_js(
+        page,
+        CALENDAR_HEADER_CHANGED_JS,
+        arg={"selector": CALENDAR_HEADER_SELECTOR, "before": before},
+        timeout=timeout,
+    )
+
+
+async def _calendar_go_to_month(page: Page, year: int, month: int, timeout: int) -> bool:
+    """
+    Versi async dari navigation._calendar_go_to_month (jalur klik dari
+    calendar_click_plan)
+
+    Returns:
+        bool: True jika header kalender menampilkan bulan target
+    """
+    shown = parse_calendar_header(await _calendar_header_text(page))
+    if shown is None:
+        return False
+    if shown == (year, month):
+        return True
+
+    level, steps = calendar_click_plan(shown, (year, month))
+    control = page.locator(
+        CALENDAR_NEXT_SELECTOR if steps > 0 else CALENDAR_PREV_SELECTOR
+    ).first
+
+    if level == "month":
+        for _ in range(abs(steps)):
+            if not await _click_and_wait_header(page, control, timeout):
+                return False
+    else:
+        header = page.locator(CALENDAR_HEADER_SELECTOR).first
+        if not await _click_and_wait_header(page, header, timeout):
+            return False
+        for _ in range(abs(steps)):
+            if not await _click_and_wait_header(page, control, timeout):
+                return False
+
+        month_names = [name for name, number in MONTH_NAME_TO_NUMBER.items() if number == month]
+        month_btn = page.locator(CALENDAR_MONTH_SELECTOR).filter(
+            has_text=re.compile(rf"^\s*({'|'.join(month_names)})\s*$", re.IGNORECASE)
+        ).first
+        if await month_btn.count() == 0 or not await _click_and_wait_header(
+            page, month_btn, timeout
+        ):
+            return False
+
+    return parse_calendar_header(await _calendar_header_text(page)) == (year, month)
+
+
+async def _open_date_range_picker(page: Page, timeout: int) -> bool:
+    """Klik "Atur Rentang Waktu" lalu tunggu kalender muncul"""
+    registry = get_selector_registry()
+    for selector in registry.candidates(DATE_RANGE_BUTTON_TARGET):
+        started_at = time.perf_counter()
+        success = False
+        try:
+            elem = page.locator(selector).first
+            if await elem.count() > 0 and await elem.is_visible():
+                await elem.click()
+                await page.locator(CALENDAR_HEADER_SELECTOR).first.wait_for(
+                    state="visible", timeout=timeout
+                )
+                success = True
+        except Exception:
+            pass
+        registry.record(
+            DATE_RANGE_BUTTON_TARGET, selector, success, time.perf_counter() - started_at
+        )
+        if success:
+            return True
+    return False
+
+
+async def _apply_date_range_calendar(
+    page: Page, start_date: datetime, end_date: datetime, timeout: int
+) -> bool:
+    """Versi async dari navigation._apply_date_range_calendar"""
+    if not await _open_date_range_picker(page, timeout):
+        return False
+
+    for index, target in enumerate((start_date, end_date)):
+        if not await _calendar_go_to_month(page, target.year, target.month, timeout):
+            print(f"   ✗ Kalender tidak bisa dipindah ke {target.strftime('%m/%Y')}")
+            return False
+        day_btn = page.locator(CALENDAR_DAY_SELECTOR).filter(
+            has_text=re.compile(rf"^\s*{target.day}\s*$")
+        ).first
+        if await day_btn.count() == 0:
+            print(f"   ✗ Tanggal {target.day} tidak ditemukan di kalender")
+            return False
+        await day_btn.click()
+        if index == 0 and not await _wait_js(page, CALENDAR_DAY_SELECTED_JS, timeout=timeout):
+            return False
+
+    # Picker biasanya menutup setelah range lengkap
+    try:
+        await page.locator(CALENDAR_HEADER_SELECTOR).first.wait_for(
+            state="hidden", timeout=timeout
+        )
+    except PlaywrightTimeoutError:
+        pass
+    await _wait_dom_quiet(page, timeout)
+    return True
+
+
+async def apply_date_range_async(
+    page: Page,
+    start_date: datetime,
+    end_date: Optional[datetime] = None,
+    page_name: str = "laporan-penjualan",
+    timeout: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Versi async dari navigation.apply_date_range: hari ini -> default,
+    query param URL (DATE_FILTER_URL_PARAMS), lalu kalender jalur minimal
+
+    Returns:
+        str: Metode yang berhasil ("default", "url", "calendar"), None jika gagal
+    """
+    end_date = end_date or start_date
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    timeout = CALENDAR_STEP_TIMEOUT if timeout is None else timeout
+
+    today = datetime.now().date()
+    if start_date.date() == today and end_date.date() == today:
+        return record_date_filter("default")
+
+    print(f"📅 Menerapkan filter tanggal (async): {date_range_label(start_date, end_date)}...")
+
+    url = date_filter_url(page.url, start_date, end_date)
+    if url:
+        try:
+            await page.goto(url, wait_until="domcontentloaded")
+            if await _wait_page_ready(page, page_name, NAVIGATION_READY_TIMEOUT):
+                return record_date_filter("url")
+        except Exception as e:
+            logger.debug(f"Filter tanggal via URL gagal (async): {e}")
+
+    try:
+        if await _apply_date_range_calendar(page, start_date, end_date, timeout):
+            return record_date_filter("calendar")
+    except Exception as e:
+        logger.debug(f"Filter tanggal via kalender gagal (async): {e}")
+
+    record_date_filter("failed")
+    return None
+
+
+async def click_date_elements_async(page: Page, target_date: datetime) -> bool:
+    """
+    Versi async dari click_date_elements_direct (lewat apply_date_range_async)
+
+    Returns:
+        bool: True jika berhasil, False jika gagal
+    """
+    return await apply_date_range_async(page, target_date) is not None
+
+
+# ============================================
+# EKSTRAKSI DATA
+# ============================================
+
+
+async def get_stock_value_async(page: Page) -> Optional[str]:
+    """
+    Versi async dari get_stock_value_direct: tunggu angka stok dashboard
+    dirender dan DOM tenang, lalu satu snapshot text
+
+    Returns:
+        str: Nilai stok (contoh: "89"), None jika gagal
+    """
+    try:
+        await _wait_page_ready(page, "dashboard")
+        await _wait_dom_quiet(page)
+
+        # Semua blok text kandidat dalam satu round trip, parsing di Python
+        stock_value = parse_stock_from_snapshot(await page.evaluate(TEXT_SNAPSHOT_JS))
+        if stock_value:
+            return stock_value
+
+        print("✗ Gagal mengambil data stok dari dashboard (async)")
+        return None
+
+    except Exception as e:
+        logger.error(f"Error get_stock_value_async: {str(e)}", exc_info=True)
+        return None
+
+
+async def get_tabung_terjual_async(page: Page) -> Optional[int]:
+    """
+    Versi async dari get_tabung_terjual_direct: percobaan pertama menunggu
+    angka total terjual dirender, berikutnya menunggu DOM tenang
+
+    Returns:
+        int: Jumlah tabung terjual, None jika gagal
+    """
+    max_retries = 5
+    for attempt in range(max_retries):
+        try:
+            if attempt == 0:
+                await _wait_js(page, TABUNG_TERJUAL_READY_JS)
+            else:
+                await _wait_dom_quiet(page)
+
+            tabung_terjual = parse_tabung_terjual_from_snapshot(
+                await page.evaluate(TEXT_SNAPSHOT_JS)
+            )
+            if tabung_terjual is not None:
+                return tabung_terjual
+
+        except Exception as e:
+            print(f"⚠ Error dalam loop ekstraksi async: {str(e)}")
+
+    print("✗ Gagal mengambil data tabung terjual (async)")
+    return None
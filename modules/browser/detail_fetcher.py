@@ -0,0 +1,260 @@
+"""
+Pengambilan detail transaksi customer (timestamp, jumlah tabung) secara paralel
+File ini membuka detail customer di beberapa tab sekaligus dalam context
+yang sudah login (cookies + localStorage sama), sehingga loading halaman
+detail berjalan bersamaan di browser. Timestamp dibaca dengan satu
+wait_for_function per tab.
+
+Usage:
+    customers = get_customer_list_from_cards(page)
+    timestamps = fetch_transaction_timestamps(page, customers, which="first_last")
+    # {"710...0011#0": "30 Jan 2026 · 06:17", ...}  (key = customer["key"])
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from modules.browser.extractor import (
+    CUSTOMER_CARD_SELECTOR,
+    card_key,
+    get_customer_list_from_cards,
+)
+
+try:
+    from modules.core.config import DETAIL_FETCH_MAX_TABS
+except ImportError:
+    DETAIL_FETCH_MAX_TABS = 4
+
+logger = logging.getLogger("playwright_automation")
+
+# Resolve dengan timestamp "DD Mon YYYY · HH:MM" pertama yang visible dan
+# jumlah tabung di halaman detail (sekaligus menunggu detail selesai render)
+DETAIL_RECORD_JS = r"""
+() => {
+    const re = /\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s*·\s*\d{2}:\d{2}/;
+    for (const el of document.querySelectorAll("div.mantine-Text-root")) {
+        if (el.offsetParent === null) continue;
+        const match = (el.textContent || "").match(re);
+        if (match) {
+            const tabung = (document.body.innerText || "").match(/(\d+)\s*Tabung/i);
+            return { waktu: match[0], tabung: tabung ? parseInt(tabung[1], 10) : null };
+        }
+    }
+    return null;
+}
+"""
+
+# Batas waktu per langkah (milliseconds)
+LIST_READY_TIMEOUT = 10000
+CARD_SEARCH_TIMEOUT = 8000
+DETAIL_READY_TIMEOUT = 8000
+
+
+def customer_key(customer: Dict) -> str:
+    """
+    Returns:
+        str: Identitas kartu customer (key hasil fetch_transaction_details)
+    """
+    return customer.get("key") or card_key(customer["nik"], customer.get("ke", 0))
+
+
+def select_customers(customers: List[Dict], which="first_last") -> List[Dict]:
+    """
+    Pilih customer yang akan diambil detailnya
+
+    Args:
+        customers (list): Hasil get_customer_list_from_cards / iter_customer_cards
+        which (str/list): "first", "last", "first_last", "all", atau list NIK
+
+    Returns:
+        list: Kartu terpilih yang punya NIK (unik per kartu, urutan list).
+              Pembelian berulang NIK yang sama adalah kartu yang berbeda.
+    """
+    with_nik = [customer for customer in customers if customer.get("nik")]
+    if not with_nik:
+        return []
+
+    if which == "first":
+        selected = with_nik[:1]
+    elif which == "last":
+        selected = with_nik[-1:]
+    elif which == "first_last":
+        selected = [with_nik[0], with_nik[-1]] if len(with_nik) > 1 else with_nik
+    elif which == "all":
+        selected = with_nik
+    else:
+        wanted = set(which)
+        selected = [customer for customer in with_nik if customer["nik"] in wanted]
+
+    unique = {}
+    for customer in selected:
+        unique.setdefault(customer_key(customer), customer)
+    return list(unique.values())
+
+
+def read_detail_record(page: Page, timeout: int = DETAIL_READY_TIMEOUT) -> Optional[Dict]:
+    """
+    Tunggu halaman detail dan ambil timestamp + jumlah tabung dalam satu call
+
+    Returns:
+        dict: {"waktu": "30 Jan 2026 · 06:17", "tabung": int/None},
+              None jika detail tidak muncul
+    """
+    try:
+        return page.wait_for_function(DETAIL_RECORD_JS, timeout=timeout).json_value()
+    except PlaywrightTimeoutError:
+        return None
+
+
+def read_detail_timestamp(page: Page, timeout: int = DETAIL_READY_TIMEOUT) -> Optional[str]:
+    """
+    Returns:
+        str: Timestamp transaksi di halaman detail, None jika tidak muncul
+    """
+    record = read_detail_record(page, timeout)
+    return record["waktu"] if record else None
+
+
+def _open_card(page: Page, customer: Dict, timeout: int = CARD_SEARCH_TIMEOUT) -> bool:
+    """
+    Cari kartu customer (scroll jika belum dirender) lalu klik. Kartu ke-N
+    dengan NIK yang sama dipilih sesuai customer["ke"], sehingga pembelian
+    berulang membuka detail transaksinya sendiri.
+
+    Returns:
+        bool: True jika kartu diklik
+    """
+    occurrence = customer.get("ke", 0)
+    cards = page.locator(CUSTOMER_CARD_SELECTOR).filter(has_text=customer["nik"])
+    card = cards.nth(occurrence)
+    deadline = time.time() + timeout / 1000
+
+    while cards.count() <= occurrence:
+        if time.time() >= deadline:
+            return False
+        # Kartu di bawah belum dirender (lazy load / virtual scroll)
+        page.evaluate("window.scrollBy(0, window.innerHeight)")
+        page.wait_for_timeout(200)
+
+    card.scroll_into_view_if_needed()
+    card.click(force=True)
+    return True
+
+
+def _fetch_serial(page: Page, customer: Dict) -> Optional[Dict]:
+    """Ambil detail satu kartu customer di page utama lalu kembali ke list"""
+    try:
+        if not _open_card(page, customer):
+            return None
+        record = read_detail_record(page)
+        page.go_back(wait_until="domcontentloaded")
+        page.wait_for_selector(CUSTOMER_CARD_SELECTOR, timeout=LIST_READY_TIMEOUT)
+        return record
+    except Exception as e:
+        logger.debug(f"Fetch detail serial gagal untuk {customer_key(customer)}: {e}")
+        return None
+
+
+def fetch_transaction_details(
+    page: Page,
+    customers: Optional[List[Dict]] = None,
+    which="first_last",
+    max_tabs: Optional[int] = None,
+    serial_fallback: bool = True,
+) -> Dict[str, Optional[Dict]]:
+    """
+    Ambil detail transaksi (timestamp + jumlah tabung) untuk sekumpulan
+    customer dengan tab paralel di context yang sama. Setiap batch: semua tab
+    membuka list, lalu semua tab mengklik kartunya (detail dimuat bersamaan),
+    baru hasilnya dibaca. Customer yang tidak ditemukan di tab (mis. filter
+    tanggal tidak ikut di URL) diambil ulang secara serial di page utama.
+
+    Args:
+        page (Page): Page di halaman Rekap Penjualan (list customer)
+        customers (list): List customer; None = harvest dari page
+        which (str/list): "first", "last", "first_last", "all", atau list NIK
+        max_tabs (int): Jumlah tab paralel. Default DETAIL_FETCH_MAX_TABS
+        serial_fallback (bool): Ambil ulang yang gagal di page utama
+            (page utama akan go_back ke list)
+
+    Returns:
+        dict: {key kartu (customer_key): {"waktu", "tabung"} atau None}
+    """
+    if customers is None:
+        customers = get_customer_list_from_cards(page)
+
+    targets = select_customers(customers, which)
+    if not targets:
+        return {}
+
+    max_tabs = max(1, min(max_tabs or DETAIL_FETCH_MAX_TABS, len(targets)))
+    list_url = page.url
+    results = {}
+    tabs = []
+
+    print(f"Mengambil {len(targets)} detail transaksi ({max_tabs} tab paralel)...")
+    started_at = time.time()
+
+    try:
+        for start in range(0, len(targets), max_tabs):
+            batch = targets[start : start + max_tabs]
+            while len(tabs) < len(batch):
+                tabs.append(page.context.new_page())
+
+            # 1. Semua tab mulai memuat list (tidak menunggu selesai)
+            for tab in tabs[: len(batch)]:
+                tab.goto(list_url, wait_until="commit")
+
+            # 2. Klik kartu di tiap tab; detail tab sebelumnya dimuat di background
+            opened = []
+            for tab, customer in zip(tabs, batch):
+                try:
+                    tab.wait_for_selector(CUSTOMER_CARD_SELECTOR, timeout=LIST_READY_TIMEOUT)
+                    opened.append(_open_card(tab, customer))
+                except Exception as e:
+                    logger.debug(f"Tab detail gagal untuk {customer_key(customer)}: {e}")
+                    opened.append(False)
+
+            # 3. Baca hasil
+            for tab, customer, is_open in zip(tabs, batch, opened):
+                results[customer_key(customer)] = read_detail_record(tab) if is_open else None
+
+    finally:
+        for tab in tabs:
+            try:
+                tab.close()
+            except Exception:
+                pass
+
+    missing = [customer for customer in targets if not results.get(customer_key(customer))]
+    if missing and serial_fallback:
+        print(f"⚠ {len(missing)} detail tidak didapat di tab, mencoba serial...")
+        for customer in missing:
+            results[customer_key(customer)] = _fetch_serial(page, customer)
+
+    found = sum(1 for value in results.values() if value)
+    print(
+        f"✓ {found}/{len(targets)} detail transaksi didapat "
+        f"dalam {time.time() - started_at:.1f} detik"
+    )
+    return results
+
+
+def fetch_transaction_timestamps(
+    page: Page,
+    customers: Optional[List[Dict]] = None,
+    which="first_last",
+    max_tabs: Optional[int] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Ambil timestamp detail transaksi (lihat fetch_transaction_details)
+
+    Returns:
+        dict: {key kartu (customer_key): timestamp atau None}
+    """
+    details = fetch_transaction_details(page, customers, which, max_tabs)
+    return {key: (record["waktu"] if record else None) for key, record in details.items()}
@@ -0,0 +1,137 @@
+"""
+Rule engine untuk ekstraksi angka dari snapshot text halaman
+File ini berisi ExtractionRule (deklarasi satu strategi: sumber blok text,
+regex yang sudah di-compile, kata wajib/terlarang) dan RuleSet yang mencoba
+rule sesuai statistik run sebelumnya (lihat strategy_stats.py).
+
+Rule untuk stok dan tabung terjual dideklarasikan di extractor.py.
+"""
+
+import re
+import time
+
+from modules.browser.strategy_stats import get_strategy_stats
+
+try:
+    from modules.core.config import ADAPTIVE_STRATEGY_ORDER
+except ImportError:
+    ADAPTIVE_STRATEGY_ORDER = True
+
+DEFAULT_FLAGS = re.IGNORECASE | re.DOTALL
+
+
+class ExtractionRule:
+    """
+    Satu strategi ekstraksi pada snapshot (hasil take_text_snapshot).
+    Kandidat di snapshot[source] berupa string, atau pasangan
+    [text, context] jika syarat kata dicek pada konteks yang lebih luas.
+    """
+
+    def __init__(self, name, source, patterns, flags=DEFAULT_FLAGS, require=(), exclude=()):
+        """
+        Args:
+            name (str): Nama strategi (kunci statistik)
+            source (str): Key snapshot yang berisi kandidat
+            patterns (list/str): Regex dengan satu group angka, di-compile sekali
+            flags (int): Flag regex
+            require (tuple): Kata (lowercase) yang wajib ada di konteks kandidat
+            exclude (tuple): Kata (lowercase) yang tidak boleh ada di konteks
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        self.name = name
+        self.source = source
+        self.regexes = [re.compile(pattern, flags) for pattern in patterns]
+        self.require = tuple(require)
+        self.exclude = tuple(exclude)
+
+    def _candidates(self, snapshot):
+        value = snapshot.get(self.source)
+        if value is None:
+            return []
+        return [value] if isinstance(value, str) else value
+
+    def apply(self, snapshot):
+        """
+        Returns:
+            str: Angka hasil group pertama yang cocok, None jika tidak ada
+        """
+        for candidate in self._candidates(snapshot):
+            if isinstance(candidate, (list, tuple)):
+                text, context = candidate
+            else:
+                text = context = candidate
+            if not text:
+                continue
+
+            if self.require or self.exclude:
+                context_lower = " ".join((context or "").split()).lower()
+                if not all(word in context_lower for word in self.require):
+                    continue
+                if any(word in context_lower for word in self.exclude):
+                    continue
+
+            for regex in self.regexes:
+                match = regex.search(text)
+                if match:
+                    return match.group(1)
+        return None
+
+
+class RuleSet:
+    """
+    Kumpulan rule untuk satu nilai (mis. stok). Rule dicoba dari yang paling
+    murah per keberhasilan menurut statistik tersimpan; setiap percobaan
+    dicatat (hit/miss/latency).
+    """
+
+    def __init__(self, group, rules, convert=None, stats=None, adaptive=None):
+        """
+        Args:
+            group (str): Nama kelompok statistik (mis. "extract:stock")
+            rules (list): List ExtractionRule, urutan = prioritas awal
+            convert (callable): Konversi hasil string (mis. int)
+            stats (StrategyStats): Default get_strategy_stats()
+            adaptive (bool): Default ADAPTIVE_STRATEGY_ORDER
+        """
+        self.group = group
+        self.rules = list(rules)
+        self.convert = convert
+        self._stats = stats
+        self.adaptive = ADAPTIVE_STRATEGY_ORDER if adaptive is None else adaptive
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = get_strategy_stats()
+        return self._stats
+
+    def ordered_rules(self):
+        """
+        Returns:
+            list: Rule sesuai urutan percobaan saat ini
+        """
+        if not self.adaptive:
+            return list(self.rules)
+        by_name = {rule.name: rule for rule in self.rules}
+        return [by_name[name] for name in self.stats.order(self.group, list(by_name))]
+
+    def apply(self, snapshot):
+        """
+        Jalankan rule pada snapshot sampai ada yang berhasil
+
+        Returns:
+            tuple: (value, rule_name), (None, None) jika semua rule gagal
+        """
+        if not snapshot:
+            return None, None
+
+        for rule in self.ordered_rules():
+            started_at = time.perf_counter()
+            value = rule.apply(snapshot)
+            self.stats.record(
+                self.group, rule.name, value is not None, time.perf_counter() - started_at
+            )
+            if value is not None:
+                return (self.convert(value) if self.convert else value), rule.name
+        return None, None
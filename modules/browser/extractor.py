@@ -4,12 +4,30 @@ File ini menangani proses ekstraksi data menggunakan Playwright
 """
 
 import logging
+import re
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from playwright.sync_api import Page
+from playwright.sync_api import Locator, Page, Response
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
+from modules.browser.api_client import (
+    API_ENDPOINTS,
+    parse_stock,
+    parse_tabung_terjual,
+)
+from modules.browser.extraction_rules import DEFAULT_FLAGS, ExtractionRule, RuleSet
+from modules.browser.waits import (
+    LOADER_SELECTORS,
+    all_of,
+    dom_quiet,
+    loader_hidden,
+    page_ready,
+    predicate,
+    selector_state,
+    wait_until,
+)
+
 # Import constants dari local module
 try:
     from modules.core.constants import DEFAULT_DELAY
@@ -19,10 +37,467 @@ except ImportError:
     except ImportError:
         DEFAULT_DELAY = 2.0
 
+try:
+    from modules.core.config import (
+        CARD_SCROLL_MAX_IDLE_ROUNDS,
+        CARD_SCROLL_SETTLE_TIMEOUT,
+        RESPONSE_CAPTURE_TIMEOUT,
+    )
+except ImportError:
+    RESPONSE_CAPTURE_TIMEOUT = 5000
+    CARD_SCROLL_SETTLE_TIMEOUT = 1500
+    CARD_SCROLL_MAX_IDLE_ROUNDS = 2
+
+try:
+    from modules.core.telemetry import get_telemetry_manager
+except ImportError:
+    get_telemetry_manager = None
+
 logger = logging.getLogger("automation")
 
+# Pattern untuk dashboard: "Stok\n89 Tabung" atau "Stok 89 Tabung"
+# Ditambahkan variasi pattern
+STOCK_TEXT_PATTERNS = [
+    r"Stok\s*\n?\s*(\d+)\s*Tabung",
+    r"Stok[:\s]*(\d+)\s*Tabung",
+    r"Sisa Kuota.*?(\d+)\s*Tabung",  # Antisipasi istilah lain
+    r"Tersedia.*?(\d+)\s*Tabung",
+]
+
+# Pattern untuk Data Penjualan
+TABUNG_TERJUAL_TEXT_PATTERNS = [
+    r"Total Tabung LPG 3 Kg Terjual\s*\n?\s*(\d+)\s*Tabung",
+    r"Total Tabung LPG 3 Kg Terjual[^\d]*(\d+)\s*Tabung",
+]
+
+# Regex di-compile sekali saat import (dipakai parser snapshot & jalur per-elemen)
+STOCK_TEXT_REGEXES = [re.compile(p, DEFAULT_FLAGS) for p in STOCK_TEXT_PATTERNS]
+TABUNG_TERJUAL_TEXT_REGEXES = [
+    re.compile(p, DEFAULT_FLAGS) for p in TABUNG_TERJUAL_TEXT_PATTERNS
+]
+STOK_ELEMENT_PATTERN = r"Stok.*?(\d+)\s*Tabung"
+TERJUAL_HEADING_PATTERN = r"Total Tabung LPG 3 Kg Terjual[^\d]*(\d+)\s*Tabung"
+TOTAL_TABUNG_PATTERN = r"Total Tabung[^\d]*(\d+)\s*Tabung"
+TABUNG_COUNT_PATTERN = r"(\d+)\s*Tabung"
+STOK_ELEMENT_REGEX = re.compile(STOK_ELEMENT_PATTERN, DEFAULT_FLAGS)
+TERJUAL_HEADING_REGEX = re.compile(TERJUAL_HEADING_PATTERN, DEFAULT_FLAGS)
+TOTAL_TABUNG_REGEX = re.compile(TOTAL_TABUNG_PATTERN, re.IGNORECASE)
+TABUNG_COUNT_REGEX = re.compile(TABUNG_COUNT_PATTERN, re.IGNORECASE)
+FIRST_NUMBER_REGEX = re.compile(r"(\d+)")
+NIK_REGEX = re.compile(r"\b(\d{16})\b")
+TIMESTAMP_REGEX = re.compile(r"\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s*·\s*\d{2}:\d{2}")
+
+# Kondisi siap: angka total tabung terjual sudah dirender di Laporan Penjualan
+TABUNG_TERJUAL_READY_JS = r"""
+() => /Total Tabung LPG 3 Kg Terjual[^\d]*\d+\s*Tabung/i.test(document.body.innerText || "")
+"""
+
+# Strategi ekstraksi (deklaratif) pada snapshot DOM, lihat take_text_snapshot.
+# Urutan = prioritas awal; RuleSet mengurutkan ulang berdasarkan statistik.
+STOCK_RULES = RuleSet(
+    "extract:stock",
+    [
+        # Elemen "Stok" + parent + grandparent
+        ExtractionRule("stok_element", "stok", STOK_ELEMENT_PATTERN),
+        # Pattern dashboard di seluruh body
+        ExtractionRule("body_pattern", "body", STOCK_TEXT_PATTERNS),
+        # Parent elemen "Tabung" yang menyebut stok (bukan harga)
+        ExtractionRule(
+            "tabung_parent",
+            "tabung_parent",
+            r"(\d+)",
+            require=("stok",),
+            exclude=("harga",),
+        ),
+    ],
+)
+
+TABUNG_TERJUAL_RULES = RuleSet(
+    "extract:tabung_terjual",
+    [
+        # Container heading "Total Tabung LPG 3 Kg Terjual"
+        ExtractionRule("terjual_heading", "terjual_heading", TERJUAL_HEADING_PATTERN),
+        # Pattern Data Penjualan di seluruh body
+        ExtractionRule("body_pattern", "body", TABUNG_TERJUAL_TEXT_PATTERNS),
+        # Section "Data Penjualan"
+        ExtractionRule(
+            "data_penjualan",
+            "data_penjualan",
+            TOTAL_TABUNG_PATTERN,
+            flags=re.IGNORECASE,
+        ),
+        # Elemen "XX Tabung" di dalam konteks total terjual
+        ExtractionRule(
+            "tabung_element",
+            "tabung_count",
+            TABUNG_COUNT_PATTERN,
+            flags=re.IGNORECASE,
+            require=("total tabung", "terjual"),
+        ),
+    ],
+    convert=int,
+)
+
+
+def parse_stock_from_text(page_text: str) -> Optional[str]:
+    """
+    Cari nilai stok di text halaman dashboard (tanpa akses browser)
+
+    Args:
+        page_text (str): Text body halaman
+
+    Returns:
+        str: Nilai stok (contoh: "89"), None jika tidak ditemukan
+    """
+    if not page_text:
+        return None
+
+    for regex in STOCK_TEXT_REGEXES:
+        match = regex.search(page_text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def parse_tabung_terjual_from_text(page_text: str) -> Optional[int]:
+    """
+    Cari jumlah tabung terjual di text halaman Laporan Penjualan (tanpa akses browser)
+
+    Args:
+        page_text (str): Text body halaman
+
+    Returns:
+        int: Jumlah tabung terjual, None jika tidak ditemukan
+    """
+    if not page_text:
+        return None
+
+    for regex in TABUNG_TERJUAL_TEXT_REGEXES:
+        match = regex.search(page_text)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+# ============================================
+# SNAPSHOT DOM (SATU ROUND TRIP)
+# ============================================
+
+# Kumpulkan semua blok text kandidat dalam satu page.evaluate. Elemen kandidat
+# = parent dari text node yang cocok (setara elemen terkecil yang ditemukan
+# selector text=/.../ Playwright), beserta text parent/grandparent-nya.
+TEXT_SNAPSHOT_JS = r"""
+() => {
+    const root = document.body;
+    if (!root) return null;
+    const textOf = (el) => (el && el.textContent) || "";
+    const up = (el, levels) => {
+        for (let i = 0; i < levels && el; i++) el = el.parentElement;
+        return el;
+    };
+    const elementsMatching = (re) => {
+        const found = new Set();
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+        let node;
+        while ((node = walker.nextNode())) {
+            if (node.parentElement && re.test(node.textContent)) {
+                found.add(node.parentElement);
+            }
+        }
+        return Array.from(found);
+    };
+    return {
+        body: textOf(root),
+        stok: elementsMatching(/Stok/i).map((el) =>
+            [textOf(el), textOf(up(el, 1)), textOf(up(el, 2))].join(" ")
+        ),
+        tabung_parent: elementsMatching(/Tabung/i).map((el) => textOf(up(el, 1))),
+        tabung_count: elementsMatching(/\d+\s*Tabung/i).map((el) => [
+            textOf(el),
+            textOf(up(el, 2)),
+        ]),
+        terjual_heading: elementsMatching(/Total Tabung LPG 3 Kg Terjual/i).map(
+            (el) => textOf(up(el, 2))
+        ),
+        data_penjualan: elementsMatching(/Data Penjualan/i).map((el) =>
+            textOf(up(el, 2))
+        ),
+    };
+}
+"""
+
+# Method Page/Locator yang memicu round trip ke browser
+# (page.locator(), locator.first, locator.locator() tidak)
+IPC_METHODS = {
+    "all",
+    "count",
+    "evaluate",
+    "get_attribute",
+    "inner_text",
+    "is_visible",
+    "text_content",
+    "title",
+    "wait_for",
+    "wait_for_load_state",
+}
+
+
+class IpcCounter:
+    """
+    Proxy Page/Locator yang menghitung panggilan IPC ke browser.
+    Locator yang dihasilkan proxy ikut dibungkus dan berbagi counter.
+
+    Usage:
+        counted = IpcCounter(page)
+        get_stock_value_direct(counted)
+        print(counted.calls)
+    """
+
+    def __init__(self, target, counter=None):
+        self._target = target
+        self._counter = counter if counter is not None else [0]
+
+    @property
+    def calls(self):
+        return self._counter[0]
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, Locator):
+            return IpcCounter(value, self._counter)
+        return value
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return self._wrap(attr)
+
+        def call(*args, **kwargs):
+            if name in IPC_METHODS:
+                self._counter[0] += 1
+            return self._wrap(attr(*args, **kwargs))
+
+        return call
+
+
+def _record_ipc_calls(field, path, calls):
+    """Catat jumlah IPC satu ekstraksi ke TelemetryManager (jika tersedia)"""
+    if get_telemetry_manager is None:
+        return
+    telemetry = get_telemetry_manager()
+    telemetry.increment_counter(f"ipc_calls_{field}_{path}", calls)
+    telemetry.increment_counter(f"extractions_{field}_{path}")
+
+
+def take_text_snapshot(page: Page) -> Optional[Dict]:
+    """
+    Ambil semua blok text kandidat stok/penjualan dalam satu page.evaluate
+
+    Returns:
+        dict: {body, stok, tabung_parent, tabung_count, terjual_heading,
+               data_penjualan}, None jika body belum ada
+    """
+    return page.evaluate(TEXT_SNAPSHOT_JS)
+
+
+def parse_stock_from_snapshot(snapshot: Optional[Dict]) -> Optional[str]:
+    """
+    Jalankan STOCK_RULES pada snapshot (tanpa akses browser)
+
+    Args:
+        snapshot (dict): Hasil take_text_snapshot
+
+    Returns:
+        str: Nilai stok, None jika tidak ditemukan
+    """
+    stock_value, rule_name = STOCK_RULES.apply(snapshot)
+    if rule_name:
+        logger.debug(f"Stok dari rule '{rule_name}': {stock_value}")
+    return stock_value
 
-def get_stock_value_direct(page: Page) -> Optional[str]:
+
+def parse_tabung_terjual_from_snapshot(snapshot: Optional[Dict]) -> Optional[int]:
+    """
+    Jalankan TABUNG_TERJUAL_RULES pada snapshot (tanpa akses browser)
+
+    Args:
+        snapshot (dict): Hasil take_text_snapshot
+
+    Returns:
+        int: Jumlah tabung terjual, None jika tidak ditemukan
+    """
+    tabung_terjual, rule_name = TABUNG_TERJUAL_RULES.apply(snapshot)
+    if rule_name:
+        logger.debug(f"Tabung terjual dari rule '{rule_name}': {tabung_terjual}")
+    return tabung_terjual
+
+
+def measure_extraction_ipc(page: Page, field="stock") -> Dict:
+    """
+    Bandingkan jumlah IPC jalur per-elemen (lama) dan snapshot pada halaman
+    yang sama (untuk pengukuran, bukan dipakai di flow utama)
+
+    Args:
+        page (Page): Page di dashboard (field="stock") atau Laporan Penjualan
+        field (str): "stock" atau "tabung_terjual"
+
+    Returns:
+        dict: {"per_element": {"calls", "value"}, "snapshot": {"calls", "value"}}
+    """
+    if field == "stock":
+        per_element = _get_stock_value_per_element
+        parse_snapshot = parse_stock_from_snapshot
+    else:
+        per_element = _get_tabung_terjual_per_element
+        parse_snapshot = parse_tabung_terjual_from_snapshot
+
+    counted = IpcCounter(page)
+    per_element_value = per_element(counted)
+    per_element_calls = counted.calls
+
+    counted = IpcCounter(page)
+    snapshot_value = parse_snapshot(take_text_snapshot(counted))
+
+    result = {
+        "per_element": {"calls": per_element_calls, "value": per_element_value},
+        "snapshot": {"calls": counted.calls, "value": snapshot_value},
+    }
+    print(
+        f"IPC {field}: per-elemen {per_element_calls} call, "
+        f"snapshot {counted.calls} call"
+    )
+    return result
+
+
+class ResponseCapture:
+    """
+    Tangkap stok dan tabung terjual dari response XHR yang dipanggil SPA,
+    sehingga nilai didapat begitu payload tiba tanpa menunggu render DOM.
+    Harus di-attach sebelum navigasi (sebelum login untuk stok dashboard).
+
+    Usage:
+        capture = ResponseCapture()
+        capture.attach(page)
+        login_direct(page, ...)
+        stok = get_stock_value_direct(page, capture=capture)
+        ...
+        capture.reset_sales()                 # sebelum ganti filter tanggal
+        terjual = get_tabung_terjual_direct(page, capture=capture)
+        capture.record_to_telemetry(telemetry, username)
+    """
+
+    def __init__(self, endpoints=None):
+        """
+        Args:
+            endpoints (dict): Path endpoint {stock, sales}. Default API_ENDPOINTS
+        """
+        endpoints = endpoints or API_ENDPOINTS
+        self.stock_path = endpoints["stock"]
+        self.sales_path = endpoints["sales"]
+        self.stock = None
+        self.tabung_terjual = None
+        self.responses_seen = 0
+        # Sumber nilai akhir per field: "network", "dom", atau None (gagal)
+        self.sources = {"stock": None, "tabung_terjual": None}
+        self._page = None
+
+    def attach(self, page: Page):
+        """Subscribe ke event response page"""
+        self._page = page
+        page.on("response", self._on_response)
+
+    def detach(self):
+        """Lepas listener (aman dipanggil walau page sudah ditutup)"""
+        if self._page is None:
+            return
+        try:
+            self._page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+        self._page = None
+
+    def reset_sales(self):
+        """Lupakan nilai penjualan lama (mis. sebelum filter tanggal diterapkan)"""
+        self.tabung_terjual = None
+
+    def _on_response(self, response: Response):
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            url = response.url.split("?", 1)[0]
+            is_stock = url.endswith(self.stock_path)
+            is_sales = url.endswith(self.sales_path)
+            if not (is_stock or is_sales) or not response.ok:
+                return
+
+            self.responses_seen += 1
+            payload = response.json()
+            if is_stock:
+                stock = parse_stock(payload)
+                if stock is not None:
+                    self.stock = stock
+            else:
+                terjual = parse_tabung_terjual(payload)
+                if terjual is not None:
+                    self.tabung_terjual = terjual
+        except Exception as e:
+            # Body tidak bisa dibaca / bukan JSON: DOM tetap jadi fallback
+            logger.debug(f"Response capture dilewati: {e}")
+
+    def _wait_for(self, page: Page, attr, timeout):
+        # Event response hanya diproses selama sync API aktif, jadi tunggu
+        # dengan wait_for_timeout (bukan time.sleep) supaya listener jalan
+        deadline = time.time() + timeout / 1000
+        while getattr(self, attr) is None and time.time() < deadline:
+            try:
+                page.wait_for_timeout(100)
+            except Exception:
+                break
+        return getattr(self, attr)
+
+    def wait_for_stock(self, page: Page, timeout=None):
+        """
+        Returns:
+            str: Nilai stok dari response, None jika tidak tiba dalam timeout
+        """
+        return self._wait_for(
+            page, "stock", RESPONSE_CAPTURE_TIMEOUT if timeout is None else timeout
+        )
+
+    def wait_for_tabung_terjual(self, page: Page, timeout=None):
+        """
+        Returns:
+            int: Tabung terjual dari response, None jika tidak tiba dalam timeout
+        """
+        return self._wait_for(
+            page,
+            "tabung_terjual",
+            RESPONSE_CAPTURE_TIMEOUT if timeout is None else timeout,
+        )
+
+    def record_to_telemetry(self, telemetry, username):
+        """
+        Kirim sumber nilai (network/dom) akun ke TelemetryManager
+
+        Args:
+            telemetry (TelemetryManager): Instance telemetry
+            username (str): Username akun
+        """
+        telemetry.record_account_stats(
+            username,
+            "extraction",
+            {"sources": dict(self.sources), "responses_seen": self.responses_seen},
+        )
+        for field, source in self.sources.items():
+            if source:
+                telemetry.increment_counter(f"{field}_from_{source}")
+        return dict(self.sources)
+
+
+def get_stock_value_direct(
+    page: Page, capture: Optional[ResponseCapture] = None
+) -> Optional[str]:
     """
     ============================================
     FUNGSI GET STOCK VALUE - DIRECT METHOD
@@ -33,6 +508,8 @@ def get_stock_value_direct(page: Page) -> Optional[str]:
 
     Args:
         page (Page): Playwright Page object yang sudah di dashboard utama
+        capture (ResponseCapture): Jika diisi, pakai nilai dari response XHR
+                                   dulu; strategi DOM hanya sebagai fallback
 
     Returns:
         str: Nilai stok dalam format string (contoh: "89")
@@ -40,17 +517,58 @@ def get_stock_value_direct(page: Page) -> Optional[str]:
     """
     print("Mengambil data stok dari dashboard utama...")
 
+    if capture:
+        stock_value = capture.wait_for_stock(page)
+        if stock_value is not None:
+            capture.sources["stock"] = "network"
+            print(f"✓ Stok berhasil diambil dari response API: {stock_value} tabung")
+            return stock_value
+        print("⚠ Response stok tidak tertangkap, fallback ke DOM")
+
+    stock_value = _get_stock_value_from_dom(page)
+    if capture and stock_value:
+        capture.sources["stock"] = "dom"
+    return stock_value
+
+
+def _get_stock_value_from_dom(page: Page) -> Optional[str]:
+    """
+    Ambil stok dari text DOM dashboard: satu snapshot page.evaluate lalu
+    parsing di Python. Jalur per-elemen hanya dipakai jika evaluate gagal.
+    """
+    _wait_for_stock_rendered(page)
+    counted = IpcCounter(page)
     try:
-        # Tunggu halaman dashboard stabil (network idle)
-        try:
-            page.wait_for_load_state("networkidle", timeout=5000)
-        except:
-            pass
-            
-        time.sleep(0.8) # Tambahan sleep untuk memastikan rendering selesai
+        stock_value = parse_stock_from_snapshot(take_text_snapshot(counted))
+        _record_ipc_calls("stock", "snapshot", counted.calls)
+        if stock_value:
+            print(f"✓ Stok berhasil diambil dari snapshot DOM: {stock_value} tabung")
+        else:
+            print("✗ Gagal mengambil data stok dari dashboard")
+        return stock_value
+
+    except Exception as e:
+        logger.debug(f"Snapshot stok gagal, pakai jalur per-elemen: {e}")
+
+    counted = IpcCounter(page)
+    stock_value = _get_stock_value_per_element(counted)
+    _record_ipc_calls("stock", "per_element", counted.calls)
+    return stock_value
+
 
-        import re
+def _wait_for_stock_rendered(page: Page) -> bool:
+    """Tunggu angka stok dashboard dirender (pengganti networkidle + sleep 0.8)"""
+    return wait_until(
+        page,
+        "angka stok dashboard",
+        all_of(page_ready("dashboard"), dom_quiet()),
+        replaces=0.8,
+    )
 
+
+def _get_stock_value_per_element(page: Page) -> Optional[str]:
+    """Ambil stok dari text DOM dashboard, satu IPC per elemen kandidat"""
+    try:
         # Debug: Print page title and url
         print(f"   URL: {page.url}")
         print(f"   Title: {page.title()}")
@@ -77,9 +595,7 @@ def get_stock_value_direct(page: Page) -> Optional[str]:
 
                     # Cari pattern angka diikuti "Tabung"
                     # Handle newlines dan spasi berlebih
-                    match = re.search(
-                        r"Stok.*?(\d+)\s*Tabung", search_text, re.IGNORECASE | re.DOTALL
-                    )
+                    match = STOK_ELEMENT_REGEX.search(search_text)
                     if match:
                         stock_value = match.group(1)
                         print(
@@ -95,21 +611,10 @@ def get_stock_value_direct(page: Page) -> Optional[str]:
         try:
             page_text = page.text_content("body")
 
-            # Pattern untuk dashboard: "Stok\n89 Tabung" atau "Stok 89 Tabung"
-            # Ditambahkan variasi pattern
-            patterns = [
-                r"Stok\s*\n?\s*(\d+)\s*Tabung",
-                r"Stok[:\s]*(\d+)\s*Tabung",
-                r"Sisa Kuota.*?(\d+)\s*Tabung", # Antisipasi istilah lain
-                r"Tersedia.*?(\d+)\s*Tabung",
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    stock_value = match.group(1)
-                    print(f"✓ Stok berhasil diambil dari pattern (Strategy 2): {stock_value} tabung")
-                    return stock_value
+            stock_value = parse_stock_from_text(page_text)
+            if stock_value:
+                print(f"✓ Stok berhasil diambil dari pattern (Strategy 2): {stock_value} tabung")
+                return stock_value
         except Exception as e:
             logger.debug(f"Strategi 2 gagal: {e}")
 
@@ -128,7 +633,7 @@ def get_stock_value_direct(page: Page) -> Optional[str]:
 
                     # Pastikan ini adalah data stok (bukan harga atau yang lain)
                     if "stok" in clean_text and "harga" not in clean_text:
-                        match = re.search(r"(\d+)", parent_text)
+                        match = FIRST_NUMBER_REGEX.search(parent_text)
                         if match:
                             stock_value = match.group(1)
                             print(f"✓ Stok berhasil diambil (Strategy 3): {stock_value} tabung")
@@ -156,7 +661,9 @@ def get_stock_value_direct(page: Page) -> Optional[str]:
         return None
 
 
-def get_tabung_terjual_direct(page: Page) -> Optional[int]:
+def get_tabung_terjual_direct(
+    page: Page, capture: Optional[ResponseCapture] = None
+) -> Optional[int]:
     """
     ============================================
     FUNGSI GET TABUNG TERJUAL - DIRECT METHOD
@@ -167,6 +674,8 @@ def get_tabung_terjual_direct(page: Page) -> Optional[int]:
 
     Args:
         page (Page): Playwright Page object yang sudah berada di halaman Laporan Penjualan
+        capture (ResponseCapture): Jika diisi, pakai nilai dari response XHR
+                                   dulu; strategi DOM hanya sebagai fallback
 
     Returns:
         int: Jumlah tabung terjual
@@ -174,16 +683,74 @@ def get_tabung_terjual_direct(page: Page) -> Optional[int]:
     """
     print("Mengambil data tabung terjual dari Laporan Penjualan...")
 
+    if capture:
+        tabung_terjual = capture.wait_for_tabung_terjual(page)
+        if tabung_terjual is not None:
+            capture.sources["tabung_terjual"] = "network"
+            print(f"✓ Tabung terjual diambil dari response API: {tabung_terjual} tabung")
+            return tabung_terjual
+        print("⚠ Response penjualan tidak tertangkap, fallback ke DOM")
+
+    tabung_terjual = _get_tabung_terjual_from_dom(page)
+    if capture and tabung_terjual is not None:
+        capture.sources["tabung_terjual"] = "dom"
+    return tabung_terjual
+
+
+def _get_tabung_terjual_from_dom(page: Page) -> Optional[int]:
+    """
+    Ambil tabung terjual dari text DOM Laporan Penjualan: satu snapshot
+    page.evaluate per percobaan lalu parsing di Python. Jalur per-elemen
+    hanya dipakai jika evaluate gagal.
+    """
+    counted = IpcCounter(page)
+    try:
+        max_retries = 5
+        for attempt in range(max_retries):
+            _wait_for_tabung_terjual_rendered(page, attempt)
+
+            tabung_terjual = parse_tabung_terjual_from_snapshot(
+                take_text_snapshot(counted)
+            )
+            if tabung_terjual is not None:
+                _record_ipc_calls("tabung_terjual", "snapshot", counted.calls)
+                print(f"✓ Tabung terjual berhasil diambil: {tabung_terjual} tabung")
+                return tabung_terjual
+            print(f"⚠ Percobaan ekstraksi ke-{attempt + 1} belum berhasil...")
+
+        _record_ipc_calls("tabung_terjual", "snapshot", counted.calls)
+        print("✗ Gagal mengambil data tabung terjual setelah semua percobaan")
+        return None
+
+    except Exception as e:
+        logger.debug(f"Snapshot penjualan gagal, pakai jalur per-elemen: {e}")
+
+    counted = IpcCounter(page)
+    tabung_terjual = _get_tabung_terjual_per_element(counted)
+    _record_ipc_calls("tabung_terjual", "per_element", counted.calls)
+    return tabung_terjual
+
+
+def _wait_for_tabung_terjual_rendered(page: Page, attempt: int) -> bool:
+    """
+    Percobaan pertama menunggu angka total terjual dirender, percobaan
+    berikutnya menunggu DOM tenang (pengganti sleep 0.5 per percobaan)
+    """
+    if attempt == 0:
+        condition = predicate("tabung_terjual_rendered", TABUNG_TERJUAL_READY_JS)
+        return wait_until(page, "angka tabung terjual", condition, replaces=0.5)
+    return wait_until(page, "ulang ekstraksi tabung terjual", dom_quiet(), replaces=0.5)
+
+
+def _get_tabung_terjual_per_element(page: Page) -> Optional[int]:
+    """Ambil tabung terjual dari text DOM, satu IPC per elemen kandidat"""
     # Retry mechanism
     max_retries = 5
     for attempt in range(max_retries):
         try:
             print(f"   Percobaan ekstraksi ke-{attempt + 1}...")
 
-            # Tunggu halaman stabil
-            time.sleep(0.5)
-
-            import re
+            _wait_for_tabung_terjual_rendered(page, attempt)
 
             # Strategi 1: Cari heading "Total Tabung LPG 3 Kg Terjual"
             # diikuti angka dan "Tabung" di Data Penjualan
@@ -199,11 +766,7 @@ def get_tabung_terjual_direct(page: Page) -> Optional[int]:
 
                         # Cari angka diikuti "Tabung" setelah heading
                         # Pattern: "Total Tabung LPG 3 Kg Terjual\n12 Tabung"
-                        match = re.search(
-                            r"Total Tabung LPG 3 Kg Terjual[^\d]*(\d+)\s*Tabung",
-                            text_content,
-                            re.IGNORECASE | re.DOTALL,
-                        )
+                        match = TERJUAL_HEADING_REGEX.search(text_content)
                         if match:
                             tabung_terjual = int(match.group(1))
                             print(
@@ -219,20 +782,12 @@ def get_tabung_terjual_direct(page: Page) -> Optional[int]:
             try:
                 page_text = page.text_content("body")
 
-                # Pattern untuk Data Penjualan
-                patterns = [
-                    r"Total Tabung LPG 3 Kg Terjual\s*\n?\s*(\d+)\s*Tabung",
-                    r"Total Tabung LPG 3 Kg Terjual[^\d]*(\d+)\s*Tabung",
-                ]
-
-                for pattern in patterns:
-                    match = re.search(pattern, page_text, re.IGNORECASE | re.DOTALL)
-                    if match:
-                        tabung_terjual = int(match.group(1))
-                        print(
-                            f"✓ Tabung terjual berhasil diambil: {tabung_terjual} tabung"
-                        )
-                        return tabung_terjual
+                tabung_terjual = parse_tabung_terjual_from_text(page_text)
+                if tabung_terjual is not None:
+                    print(
+                        f"✓ Tabung terjual berhasil diambil: {tabung_terjual} tabung"
+                    )
+                    return tabung_terjual
             except Exception as e:
                 logger.debug(f"Strategi 2 gagal: {e}")
 
@@ -248,11 +803,7 @@ def get_tabung_terjual_direct(page: Page) -> Optional[int]:
                         section_text = section.text_content()
 
                         # Cari "Total Tabung" dalam section ini
-                        match = re.search(
-                            r"Total Tabung[^\d]*(\d+)\s*Tabung",
-                            section_text,
-                            re.IGNORECASE,
-                        )
+                        match = TOTAL_TABUNG_REGEX.search(section_text)
                         if match:
                             tabung_terjual = int(match.group(1))
 
@@ -279,9 +830,7 @@ def get_tabung_terjual_direct(page: Page) -> Optional[int]:
                             and "terjual" in parent_text.lower()
                         ):
                             elem_text = elem.text_content()
-                            match = re.search(
-                                r"(\d+)\s*Tabung", elem_text, re.IGNORECASE
-                            )
+                            match = TABUNG_COUNT_REGEX.search(elem_text)
                             if match:
                                 tabung_terjual = int(match.group(1))
                                 print(
@@ -324,9 +873,6 @@ def get_customer_list_direct(page: Page, min_tabung: int = 2) -> List[Dict]:
     try:
         customers = []
 
-        # Tunggu tabel muncul
-        time.sleep(2.0)
-
         # Coba berbagai selector untuk tabel customer
         table_selectors = [
             "table tbody tr",
@@ -335,6 +881,11 @@ def get_customer_list_direct(page: Page, min_tabung: int = 2) -> List[Dict]:
             "div[role='table'] div[role='row']",
         ]
 
+        wait_until(
+            page, "baris tabel customer", selector_state(", ".join(table_selectors)),
+            replaces=2.0,
+        )
+
         for selector in table_selectors:
             try:
                 rows = page.locator(selector).all()
@@ -357,8 +908,6 @@ def get_customer_list_direct(page: Page, min_tabung: int = 2) -> List[Dict]:
                         row_text = row.text_content()
 
                         # Extract jumlah tabung (cari angka)
-                        import re
-
                         numbers = re.findall(r"\b(\d+)\b", row_text)
 
                         if not numbers:
@@ -440,16 +989,13 @@ def extract_transaction_data(page: Page) -> Dict:
             "total_harga": "",
         }
 
-        # Tunggu halaman stabil
-        time.sleep(1.0)
+        wait_until(page, "detail transaksi", dom_quiet(), replaces=1.0)
 
         # Extract dengan mencari label-value pairs
         page_text = page.text_content("body")
 
-        import re
-
         # Extract NIK (16 digit)
-        nik_match = re.search(r"\b(\d{16})\b", page_text)
+        nik_match = NIK_REGEX.search(page_text)
         if nik_match:
             transaction_data["nik"] = nik_match.group(1)
 
@@ -500,97 +1046,182 @@ def wait_for_data_load(page: Page, timeout: int = 10000) -> bool:
     Returns:
         bool: True jika data berhasil dimuat, False jika timeout
     """
-    try:
-        # Tunggu loading spinner hilang
-        loading_selectors = [
-            ".loading",
-            ".spinner",
-            "[class*='loading']",
-            "[class*='spinner']",
-        ]
+    # Loading spinner (LOADER_SELECTORS) hilang lalu content berhenti berubah
+    if wait_until(
+        page,
+        "data selesai dimuat",
+        all_of(loader_hidden(LOADER_SELECTORS), dom_quiet()),
+        replaces=1.0,
+        timeout=timeout,
+    ):
+        print("✓ Loading selesai")
+        return True
 
-        for selector in loading_selectors:
-            try:
-                loading = page.locator(selector).first
-                if loading.is_visible(timeout=1000):
-                    loading.wait_for(state="hidden", timeout=timeout)
-                    print("✓ Loading selesai")
-                    return True
-            except Exception:
-                continue
+    print("Timeout menunggu data load")
+    return False
+
+# Wrapper per kartu customer di Rekap Penjualan (Nama + NIK + Button)
+CUSTOMER_CARD_SELECTOR = "div.mantine-hpmcve"
+
+# Ambil kartu yang baru dirender (belum pernah dikirim) lalu scroll satu
+# langkah, dalam satu round trip. Kartu ditandai dengan signature text-nya,
+# sehingga elemen yang didaur ulang virtual scroll (isi berubah) terkirim lagi.
+CARD_HARVEST_JS = """
+(selector) => {
+    const signatureOf = (text) => text.length + ":" + text.slice(0, 64);
+    const cards = Array.from(document.querySelectorAll(selector));
+    const batch = [];
+    for (const el of cards) {
+        const text = el.textContent || "";
+        if (!text.trim()) continue;
+        const signature = signatureOf(text);
+        if (el.dataset.sfxSeen === signature) continue;
+        el.dataset.sfxSeen = signature;
+        batch.push(text);
+    }
+    const last = cards[cards.length - 1];
+    if (last) last.scrollIntoView({ block: "end" });
+    window.scrollBy(0, Math.round(window.innerHeight * 0.8));
+    return { batch: batch, rendered: cards.length };
+}
+"""
 
-        # Tunggu content muncul
-        time.sleep(1.0)
-        return True
+# Hapus tanda harvest dan scroll ke atas, supaya list yang sama bisa di-harvest ulang
+CARD_RESET_JS = """
+(selector) => {
+    for (const el of document.querySelectorAll(selector)) delete el.dataset.sfxSeen;
+    window.scrollTo(0, 0);
+}
+"""
+
+# True jika ada kartu baru / kartu yang isinya berubah sejak harvest terakhir
+CARD_CHANGED_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).some((el) => {
+    const text = el.textContent || "";
+    return text.trim() && el.dataset.sfxSeen !== text.length + ":" + text.slice(0, 64);
+})
+"""
+
+
+def parse_customer_card(text: str) -> Dict:
+    """
+    Ambil nama dan NIK dari text satu kartu customer
+
+    Args:
+        text (str): Text kartu, mis. "RICHARD F LANTU 710xxxxxxxxxx0011 Jenis Pelanggan..."
+
+    Returns:
+        dict: {"nama", "nik"} (nik kosong jika tidak ditemukan)
+    """
+    nama = "Unknown"
+    nik = ""
+
+    nik_match = NIK_REGEX.search(text)
+    if nik_match:
+        nik = nik_match.group(0)
+        # Nama biasanya baris terakhir sebelum NIK
+        pre_nik = text.split(nik)[0].strip()
+        lines = [l.strip() for l in pre_nik.split("\n") if l.strip()]
+        if lines:
+            nama = lines[-1]
+    else:
+        lines = [l.strip() for l in text.split("\n") if l.strip()]
+        if lines:
+            nama = lines[0]
+
+    return {"nama": nama, "nik": nik}
+
+
+def card_key(identity: str, occurrence: int = 0) -> str:
+    """
+    Identitas satu kartu customer (satu transaksi) di list Rekap Penjualan
+
+    Args:
+        identity (str): NIK (atau text kartu jika tidak ada NIK)
+        occurrence (int): Urutan kartu di antara kartu dengan identity yang sama
+
+    Returns:
+        str: Mis. "710xxxxxxxxxx0011#0", "710xxxxxxxxxx0011#1" untuk pembelian kedua
+    """
+    return f"{identity}#{occurrence}"
+
+
+def iter_customer_cards(
+    page: Page,
+    card_selector: str = CUSTOMER_CARD_SELECTOR,
+    settle_timeout: int = None,
+    max_idle_rounds: int = None,
+) -> Iterator[Dict]:
+    """
+    Generator kartu customer: scroll bertahap, ambil kartu yang baru dirender
+    per batch (satu page.evaluate), dan yield customer begitu didapat.
+    Setiap kartu adalah satu transaksi, jadi pembelian berulang NIK yang sama
+    tetap di-yield; identitas kartu = NIK + urutan kemunculan NIK tersebut.
+    Hanya counter per NIK yang disimpan, jadi memori tetap kecil untuk list panjang.
+
+    Args:
+        page (Page): Page di halaman Rekap Penjualan
+        card_selector (str): Selector kartu customer
+        settle_timeout (int): Batas tunggu kartu baru setelah scroll (ms).
+                              Default CARD_SCROLL_SETTLE_TIMEOUT
+        max_idle_rounds (int): Putaran berturut-turut tanpa kartu baru sebelum
+                               berhenti. Default CARD_SCROLL_MAX_IDLE_ROUNDS
+
+    Yields:
+        dict: {"no", "nama", "nik", "ke", "key"} - urut sesuai kemunculan.
+              "ke" = urutan kartu ini di antara kartu dengan NIK yang sama
+              (0 = paling atas), "key" = identitas kartu (lihat card_key)
+    """
+    settle_timeout = CARD_SCROLL_SETTLE_TIMEOUT if settle_timeout is None else settle_timeout
+    max_idle_rounds = (
+        CARD_SCROLL_MAX_IDLE_ROUNDS if max_idle_rounds is None else max_idle_rounds
+    )
+
+    occurrences = {}
+    count = 0
+    idle_rounds = 0
+
+    page.evaluate(CARD_RESET_JS, card_selector)
+
+    while idle_rounds < max_idle_rounds:
+        result = page.evaluate(CARD_HARVEST_JS, card_selector)
+
+        new_in_batch = 0
+        for text in result["batch"]:
+            customer = parse_customer_card(text)
+            # Kartu tanpa NIK diidentifikasi dengan text-nya
+            identity = customer["nik"] or text.strip()
+            customer["ke"] = occurrences.get(identity, 0)
+            occurrences[identity] = customer["ke"] + 1
+            customer["key"] = card_key(identity, customer["ke"])
+            count += 1
+            new_in_batch += 1
+            customer["no"] = count
+            yield customer
+
+        idle_rounds = 0 if new_in_batch else idle_rounds + 1
+
+        # Tunggu kartu baru dirender setelah scroll (lazy load / virtual scroll)
+        try:
+            page.wait_for_function(
+                CARD_CHANGED_JS, arg=card_selector, timeout=settle_timeout
+            )
+        except PlaywrightTimeoutError:
+            idle_rounds += 1
 
-    except PlaywrightTimeoutError:
-        print("Timeout menunggu data load")
-        return False
-    except Exception as e:
-        print(f"⚠ Error menunggu data load: {str(e)}")
-        return False
 
 def get_customer_list_from_cards(page: Page) -> List[Dict]:
     """
-    Mengambil daftar customer (Simplified).
-    Hanya scroll sekali ke bawah lalu ambil customer menggunakan selector 'div.mantine-hpmcve'
+    Mengambil daftar customer dari kartu 'div.mantine-hpmcve' di Rekap Penjualan.
+    Memakai iter_customer_cards (scroll bertahap sampai tidak ada kartu baru);
+    untuk list sangat panjang pakai generator-nya langsung.
     """
-    print("Mengekstrak daftar customer (Simple Scroll)...")
-    customers = []
-    
+    print("Mengekstrak daftar customer (scroll bertahap)...")
+
     try:
-        # 1. Simple Scroll to Bottom
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(1.0) # Tunggu load
-        
-        # 2. Ambil data dengan selector wrapper spesifik
-        # div.mantine-Paper-root ternyata membungkus banyak item
-        # div.mantine-hpmcve adalah wrapper per item (Nama + Button)
-        
-        cards = page.locator("div.mantine-hpmcve").all()
-        
-        # Jika selector aneh itu tidak ketemu, coba fallback ke yang mengandung text ciri khas
-        if not cards:
-             print("Selector .mantine-hpmcve tidak ketemu, mencoba fallback...")
-             # Cari elemen yang memiliki text 'Jenis Pelanggan' tapi bukan container besar
-             # Agak tricky, kita stick ke hpmcve dulu sesuai request user sebelumnya
-        
-        print(f"Total kartu customer ditemukan: {len(cards)}")
-        
-        for idx, card in enumerate(cards):
-            try:
-                text = card.text_content()
-                if not text: continue
-                
-                # Parsing Nama
-                # Struktur text biasanya: "RICHARD F LANTU710xxxxxxxxxx0011 Jenis Pelanggan..."
-                # Kita coba split berdasarkan NIK (16 digit)
-                
-                import re
-                
-                nama = "Unknown"
-                nik = ""
-                
-                # Cari NIK
-                nik_match = re.search(r"\b\d{16}\b", text)
-                if nik_match:
-                    nik = nik_match.group(0)
-                    # Nama biasanya ada sebelum NIK
-                    # Ambil text sebelum NIK
-                    pre_nik = text.split(nik)[0].strip()
-                    # Bersihkan jika ada newline
-                    lines = [l.strip() for l in pre_nik.split('\n') if l.strip()]
-                    if lines:
-                        nama = lines[-1] # Ambil yang paling bawah dari blok atas (paling dekat NIK)
-                else:
-                    # Fallback simple
-                    lines = [l.strip() for l in text.split('\n') if l.strip()]
-                    if lines: nama = lines[0]
-                
-                customers.append({"no": idx+1, "nama": nama, "nik": nik})
-            except: 
-                continue
-                
+        customers = list(iter_customer_cards(page))
+        print(f"Total kartu customer ditemukan: {len(customers)}")
+
         if customers:
             first = customers[0]
             last = customers[-1]
@@ -614,7 +1245,7 @@ def click_last_customer_card(page: Page) -> bool:
         # 1. Scroll Paling Bawah
         print("Scrolling ke bawah page...")
         page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(0.5)
+        wait_until(page, "kartu customer setelah scroll", dom_quiet(), replaces=0.5)
         
         # 2. Cari elemen spesifik (mantine-hpmcve)
         # Ini adalah wrapper yang berisi Nama dan NIK
@@ -640,12 +1271,13 @@ def click_last_customer_card(page: Page) -> bool:
         
         # Scroll & Click
         last_target.scroll_into_view_if_needed()
-        time.sleep(0.2)
         
         # Klik langsung pada wrapper tersebut
         print("Mengklik elemen .mantine-hpmcve terakhir...")
-        last_target.click(force=True)
-        time.sleep(1.0)
+        wait_until(
+            page, "detail customer terakhir", dom_quiet(), replaces=1.2,
+            action=lambda: last_target.click(force=True),
+        )
         
         print("✓ Berhasil klik customer terakhir!")
         return True
@@ -661,12 +1293,8 @@ def click_first_customer_card(page: Page) -> bool:
     """
     print("Mencari customer PERTAMA untuk diklik...")
     try:
-        # Import re for validation if needed
-        import re
-
         # 1. Pastikan di top page
         # page.evaluate("window.scrollTo(0, 0)")
-        # time.sleep(1.0)
         
         # 2. Cari elemen spesifik (mantine-hpmcve)
         targets = page.locator("div.mantine-hpmcve").all()
@@ -704,9 +1332,10 @@ def click_first_customer_card(page: Page) -> bool:
         print(f"Target klik ditemukan (Text: {first_target.text_content()})")
         
         first_target.scroll_into_view_if_needed()
-        time.sleep(0.2)
-        first_target.click(force=True)
-        time.sleep(1.0)
+        wait_until(
+            page, "detail customer pertama", dom_quiet(), replaces=1.2,
+            action=lambda: first_target.click(force=True),
+        )
         
         print("✓ Berhasil klik customer PERTAMA!")
         return True
@@ -731,15 +1360,14 @@ def get_transaction_timestamp(page: Page) -> str:
         # .mantine-1ic1mzf
         
         # Cara 2: Regex search di semua text element (Lebih robust)
-        import re
-        timestamp_pattern = r"\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s*·\s*\d{2}:\d{2}"
         
         elements = page.locator("div.mantine-Text-root").all()
         for el in elements:
             if not el.is_visible(): continue
             text = el.text_content()
-            if text and re.search(timestamp_pattern, text):
-                clean_time = re.search(timestamp_pattern, text).group(0)
+            match = TIMESTAMP_REGEX.search(text) if text else None
+            if match:
+                clean_time = match.group(0)
                 print(f"✓ Timestamp ditemukan: {clean_time}")
                 return clean_time
                 
@@ -5,10 +5,15 @@ File ini menangani proses login dan error handling menggunakan Playwright
 
 import logging
 import time
+from urllib.parse import urljoin
 
 from playwright.sync_api import Page
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
+from modules.browser.page_routes import READY_PREDICATES, get_route_table
+from modules.browser.selector_registry import get_selector_registry, register_selectors
+from modules.browser.waits import url_contains, wait_until
+
 # Import constants dari local module
 try:
     from modules.core.constants import DEFAULT_DELAY, LOGIN_URL
@@ -19,278 +24,567 @@ except ImportError:
         LOGIN_URL = "https://subsiditepatlpg.mypertamina.id/merchant-login"
         DEFAULT_DELAY = 2.0
 
+try:
+    from modules.core.config import (
+        GAGAL_MASUK_AKUN_TIMEOUT,
+        LOGIN_FORM_TIMEOUT,
+        LOGIN_OUTCOME_TIMEOUT,
+        SESSION_CHECK_TIMEOUT,
+    )
+except ImportError:
+    GAGAL_MASUK_AKUN_TIMEOUT = 120
+    LOGIN_FORM_TIMEOUT = 10000
+    LOGIN_OUTCOME_TIMEOUT = 15000
+    SESSION_CHECK_TIMEOUT = 3000
+
+try:
+    from modules.core.telemetry import get_telemetry_manager
+except ImportError:
+    get_telemetry_manager = None
+
 logger = logging.getLogger("playwright_automation")
 
+# Kata kunci URL endpoint autentikasi (XHR/fetch POST)
+AUTH_URL_KEYWORDS = ("login", "auth", "token", "signin")
+
+# Selector kandidat (dipakai bersama oleh flow sync dan async)
+EMAIL_SELECTORS = [
+    'input[type="text"]',
+    'input[type="email"]',
+    'input[name="email"]',
+    'input[name="username"]',
+    'input[placeholder*="Email"]',
+    'input[placeholder*="email"]',
+]
+
+PIN_SELECTORS = [
+    'input[type="password"]',
+    'input[name="password"]',
+    'input[name="pin"]',
+    'input[placeholder*="PIN"]',
+    'input[placeholder*="Password"]',
+]
+
+LOGIN_BUTTON_SELECTORS = [
+    'button:has-text("MASUK")',
+    'button:has-text("Masuk")',
+    'button:has-text("LOGIN")',
+    'button:has-text("Login")',
+    'button[type="submit"]',
+]
+
+DASHBOARD_INDICATORS = [
+    "text=Dashboard",
+    "text=Laporan Penjualan",
+    "text=Atur Produk",
+    "text=Catat Penjualan",
+    "text=Atur Stok",
+    "[class*='dashboard']",
+    "[class*='sidebar']",
+]
+
+# Target selector registry (urutan dipelajari dari statistik antar run)
+EMAIL_TARGET = register_selectors("login.email", EMAIL_SELECTORS)
+PIN_TARGET = register_selectors("login.pin", PIN_SELECTORS)
+LOGIN_BUTTON_TARGET = register_selectors("login.button", LOGIN_BUTTON_SELECTORS)
+DASHBOARD_TARGET = register_selectors("login.dashboard", DASHBOARD_INDICATORS)
+
+
+def _any_of(page: Page, selectors):
+    """
+    Gabungkan list selector kandidat menjadi satu locator (locator.or_),
+    sehingga satu wait bisa menunggu selector mana pun yang muncul duluan
+
+    Args:
+        page (Page): Playwright Page object
+        selectors (list/str): Selector kandidat, atau nama target registry
+
+    Returns:
+        Locator: Locator gabungan (elemen pertama yang cocok)
+    """
+    if isinstance(selectors, str):
+        selectors = get_selector_registry().candidates(selectors)
+    locator = page.locator(selectors[0])
+    for selector in selectors[1:]:
+        locator = locator.or_(page.locator(selector))
+    return locator.first
+
+
+def _is_auth_response(response):
+    """Cek apakah response adalah XHR/fetch autentikasi (POST ke endpoint login)"""
+    request = response.request
+    if request.method != "POST" or request.resource_type not in ("xhr", "fetch"):
+        return False
+    url = response.url.lower()
+    return any(keyword in url for keyword in AUTH_URL_KEYWORDS)
+
+
+def _record_login_timings(timings):
+    """Kirim durasi per fase login ke TelemetryManager (jika tersedia)"""
+    if get_telemetry_manager is None:
+        return
+    telemetry = get_telemetry_manager()
+    for phase, duration in timings.items():
+        telemetry.record_duration(f"login_{phase}", duration)
+
+
+# Script deteksi hasil login di dalam halaman: satu Promise yang resolve pada
+# sinyal pertama (URL keluar dari halaman login, modal gagal masuk, error
+# jaringan pada request auth, login ditolak (HTTP 4xx), atau timeout).
+# MutationObserver memicu cek saat DOM berubah; interval kecil menangkap
+# perubahan URL via history.pushState. Penolakan 4xx diberi jeda rejectGrace
+# supaya modal "Gagal Masuk Akun" (lockout, juga 4xx) tetap dikenali lebih dulu.
+LOGIN_OUTCOME_JS = """
+({ timeout, loginPath, errorTexts, modalSelector, rejectGrace }) => new Promise((resolve) => {
+    let done = false;
+    let scheduled = false;
+    let rejectedAt = null;
+    const cleanups = [];
+    const finish = (type, detail) => {
+        if (done) return;
+        done = true;
+        cleanups.forEach((fn) => fn());
+        resolve({ type, detail: detail || null });
+    };
+    const findErrorText = (text) => errorTexts.find((t) => text && text.includes(t));
+    const check = () => {
+        scheduled = false;
+        if (!location.href.includes(loginPath)) return finish('success', location.href);
+        if (window.__snapfluxAuthError) return finish('network_error', window.__snapfluxAuthError);
+        for (const modal of document.querySelectorAll(modalSelector)) {
+            const hit = findErrorText(modal.innerText);
+            if (hit) return finish('gagal_masuk', hit);
+        }
+        const hit = findErrorText(document.body ? document.body.innerText : '');
+        if (hit) return finish('gagal_masuk', hit);
+        if (window.__snapfluxAuthRejected) {
+            if (rejectedAt === null) rejectedAt = Date.now();
+            if (Date.now() - rejectedAt >= rejectGrace) {
+                return finish('auth_rejected', window.__snapfluxAuthRejected);
+            }
+        }
+    };
+    const schedule = () => {
+        if (!scheduled) { scheduled = true; queueMicrotask(check); }
+    };
+
+    const observer = new MutationObserver(schedule);
+    observer.observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+    cleanups.push(() => observer.disconnect());
+
+    const interval = setInterval(check, 100);
+    cleanups.push(() => clearInterval(interval));
+
+    const onAuthError = () => schedule();
+    window.addEventListener('snapflux:auth-error', onAuthError);
+    cleanups.push(() => window.removeEventListener('snapflux:auth-error', onAuthError));
+
+    const timer = setTimeout(() => finish('timeout'), timeout);
+    cleanups.push(() => clearTimeout(timer));
+
+    check();
+})
+"""
+
+# Script yang membungkus fetch/XHR untuk menandai hasil request autentikasi:
+# error jaringan (gagal koneksi atau HTTP 5xx) dan login ditolak (HTTP 4xx,
+# mis. PIN salah). Dipasang sebelum klik MASUK.
+AUTH_ERROR_WATCH_JS = """
+(keywords) => {
+    window.__snapfluxAuthError = null;
+    window.__snapfluxAuthRejected = null;
+    if (window.__snapfluxAuthWatch) return;
+    window.__snapfluxAuthWatch = true;
+    const isAuth = (url) => keywords.some((k) => String(url).toLowerCase().includes(k));
+    const flag = (detail) => {
+        window.__snapfluxAuthError = detail;
+        window.dispatchEvent(new Event('snapflux:auth-error'));
+    };
+    const flagStatus = (status) => {
+        if (status >= 500) return flag('HTTP ' + status);
+        if (status >= 400) {
+            window.__snapfluxAuthRejected = 'HTTP ' + status;
+            window.dispatchEvent(new Event('snapflux:auth-error'));
+        }
+    };
+
+    const originalFetch = window.fetch;
+    window.fetch = function (input, init) {
+        const url = typeof input === 'string' ? input : (input && input.url);
+        return originalFetch.apply(this, arguments).then((response) => {
+            if (isAuth(url)) flagStatus(response.status);
+            return response;
+        }, (error) => {
+            if (isAuth(url)) flag(String(error));
+            throw error;
+        });
+    };
+
+    const originalOpen = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        if (isAuth(url)) {
+            this.addEventListener('error', () => flag('XHR network error'));
+            this.addEventListener('load', () => flagStatus(this.status));
+        }
+        return originalOpen.apply(this, arguments);
+    };
+}
+"""
+
+# Teks pesan "Gagal Masuk Akun" yang dicari oleh detektor
+GAGAL_MASUK_TEXTS = [
+    "Gagal Masuk Akun",
+    "Akun anda tidak dapat melakukan login",
+    "salah PIN 5 kali",
+    "Login kembali setelah",
+]
+
+# Container modal/dialog yang dicek lebih dulu sebelum seluruh body
+LOGIN_MODAL_SELECTOR = "[role='dialog'], .mantine-Modal-root, .modal, .dialog"
+
+# Jeda sebelum detektor dijalankan ulang setelah error non-navigasi (ms)
+LOGIN_OUTCOME_RETRY_MS = 250
+
+# Jeda setelah response auth 4xx sebelum hasil "auth_rejected" dipakai (ms):
+# lockout juga dijawab 4xx, modal "Gagal Masuk Akun"-nya dirender sesudahnya
+AUTH_REJECTED_GRACE_MS = 300
+
+
+def login_outcome_args(remaining):
+    """Argumen LOGIN_OUTCOME_JS (dipakai bersama flow sync dan async)"""
+    return {
+        "timeout": remaining,
+        "loginPath": "merchant-login",
+        "errorTexts": GAGAL_MASUK_TEXTS,
+        "modalSelector": LOGIN_MODAL_SELECTOR,
+        "rejectGrace": AUTH_REJECTED_GRACE_MS,
+    }
+
+
+def is_page_closed_error(error):
+    """True jika detektor gagal karena page/context/browser sudah ditutup"""
+    return "has been closed" in str(error) or "Target closed" in str(error)
+
 
-def login_direct(page: Page, username: str, pin: str):
+def is_navigation_error(error):
+    """True jika execution context detektor hancur karena navigasi"""
+    message = str(error)
+    return "Execution context was destroyed" in message or "navigat" in message.lower()
+
+
+def detect_login_outcome(page: Page, timeout: int = LOGIN_OUTCOME_TIMEOUT):
+    """
+    Tunggu hasil login dengan satu detektor di dalam halaman (Promise.race
+    antara URL dashboard, modal "Gagal Masuk Akun", error jaringan auth,
+    response auth 4xx, dan timeout). Return segera setelah sinyal pertama muncul.
+
+    Args:
+        page (Page): Playwright Page object
+        timeout (int): Batas waktu menunggu (ms)
+
+    Returns:
+        dict: {"type": "success" | "gagal_masuk" | "network_error"
+               | "auth_rejected" | "timeout" | "error", "detail": str atau None}
+    """
+    deadline = time.time() + timeout / 1000
+
+    while True:
+        remaining = int((deadline - time.time()) * 1000)
+        if remaining <= 0:
+            return {"type": "timeout", "detail": None}
+
+        try:
+            return page.evaluate(LOGIN_OUTCOME_JS, login_outcome_args(remaining))
+        except Exception as e:
+            if page.is_closed() or is_page_closed_error(e):
+                return {"type": "error", "detail": str(e)}
+            # Full navigation menghancurkan execution context detektor
+            if "merchant-login" not in page.url:
+                return {"type": "success", "detail": page.url}
+            try:
+                if is_navigation_error(e):
+                    page.wait_for_load_state("domcontentloaded", timeout=remaining)
+                else:
+                    # Error lain: jeda dulu supaya tidak busy-spin sampai deadline
+                    logger.debug(f"Detektor login gagal, diulang: {e}")
+                    page.wait_for_timeout(min(LOGIN_OUTCOME_RETRY_MS, remaining))
+            except Exception as wait_error:
+                if page.is_closed() or is_page_closed_error(wait_error):
+                    return {"type": "error", "detail": str(wait_error)}
+
+
+class _LoginClickError(Exception):
+    """Tombol login tidak bisa diklik (dipakai untuk keluar dari expect_response)"""
+
+
+def _click_login_button(page: Page, timeout: int = LOGIN_FORM_TIMEOUT):
+    """
+    Klik tombol MASUK setelah tombol benar-benar enabled.
+    Klik normal menunggu actionability (visible, stable, enabled); jika
+    terhalang overlay, fallback ke force click seperti perilaku sebelumnya.
+
+    Raises:
+        _LoginClickError: Jika tombol tidak ditemukan/tidak bisa diklik
+    """
+    login_button = _any_of(page, LOGIN_BUTTON_TARGET)
+    started_at = time.perf_counter()
+    try:
+        login_button.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        raise _LoginClickError("Tombol login tidak ditemukan")
+    get_selector_registry().record_match(
+        page, LOGIN_BUTTON_TARGET, time.perf_counter() - started_at
+    )
+
+    try:
+        login_button.click(timeout=timeout)
+    except PlaywrightTimeoutError:
+        if not login_button.is_enabled():
+            raise _LoginClickError("Tombol login tidak pernah enabled")
+        login_button.click(force=True)
+
+
+class _AuthStatusWatch:
+    """
+    Catat HTTP status response autentikasi lewat listener, tanpa menunggunya.
+    Hasil login ditentukan oleh detect_login_outcome (URL/modal/status auth
+    dari AUTH_ERROR_WATCH_JS), jadi endpoint auth yang tidak cocok
+    AUTH_URL_KEYWORDS tidak menambah waktu tunggu.
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.status = None
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if self.status is None and _is_auth_response(response):
+            self.status = response.status
+
+    def close(self):
+        """
+        Returns:
+            int: HTTP status response autentikasi, None jika tidak terlihat
+        """
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+        return self.status
+
+
+def _submit_login(page: Page) -> _AuthStatusWatch:
+    """
+    Klik MASUK; status response autentikasi dicatat di background
+
+    Returns:
+        _AuthStatusWatch: Panggil close() setelah hasil login diketahui
+
+    Raises:
+        _LoginClickError: Jika tombol tidak bisa diklik
+    """
+    try:
+        # Tandai error jaringan pada request auth untuk detektor hasil login
+        page.evaluate(AUTH_ERROR_WATCH_JS, list(AUTH_URL_KEYWORDS))
+    except Exception:
+        pass
+
+    watch = _AuthStatusWatch(page)
+    try:
+        _click_login_button(page)
+    except Exception:
+        watch.close()
+        raise
+    return watch
+
+
+def login_direct(
+    page: Page,
+    username: str,
+    pin: str,
+    prewarmed: bool = False,
+    wait_on_lockout: bool = True,
+):
     """
     ============================================
     FUNGSI LOGIN OTOMATIS KE PORTAL MERCHANT
     ============================================
 
     Fungsi ini melakukan login otomatis ke portal merchant Pertamina dengan Playwright.
-    Menggunakan direct selector untuk performa optimal.
+    Setiap langkah menunggu sinyal nyata (bukan sleep tetap):
 
-    Proses yang dilakukan:
-    1. Navigasi ke halaman login
-    2. Mencari dan mengisi field email/username
-    3. Mencari dan mengisi field PIN/password
-    4. Mencari dan mengklik tombol login
-    5. Deteksi pesan "Gagal Masuk Akun" jika ada
-    6. Return status login
+    1. Navigasi ke halaman login -> tunggu field email visible
+    2. Isi email dan PIN
+    3. Klik MASUK saat tombol enabled (status XHR autentikasi dicatat di background)
+    4. Satu detektor di halaman menunggu hasil pertama: URL dashboard,
+       modal "Gagal Masuk Akun", error jaringan, atau login ditolak
+       (HTTP 4xx, mis. PIN salah) (detect_login_outcome)
+    5. Return status login beserta durasi per fase
 
     Args:
         page (Page): Playwright Page object
         username (str): Username berupa email atau nomor HP merchant
         pin (str): PIN untuk authentication ke portal
+        prewarmed (bool): True jika halaman login sudah dibuka lebih dulu
+                          (pipeline pre-warming), navigasi ulang dilewati
+        wait_on_lockout (bool): True = tunggu GAGAL_MASUK_AKUN_TIMEOUT lalu klik
+                          ulang (perilaku lama). False = langsung return dengan
+                          'retry_after' (detik) supaya pemanggil bisa menjadwalkan
+                          ulang akun tanpa memblok worker
 
     Returns:
         tuple: (success, dict) - Status login dan info gagal masuk akun
-               Jika login berhasil: (True, {'gagal_masuk_akun': False, 'count': 0})
-               Jika login gagal: (False, {'gagal_masuk_akun': False, 'count': 0})
-               Jika ada gagal masuk akun: (True/False, {'gagal_masuk_akun': True, 'count': 1})
+               Jika login berhasil: (True, {'gagal_masuk_akun': False, 'count': 0, ...})
+               Jika login gagal: (False, {'gagal_masuk_akun': False, 'count': 0, ...})
+               Jika ada gagal masuk akun: (True/False, {'gagal_masuk_akun': True, 'count': 1, ...})
+               Dict juga berisi 'timings' (detik per fase), 'outcome'
+               ("success" | "gagal_masuk" | "network_error" | "auth_rejected"
+               | "timeout" | "error")
     """
     print(f"\n=== LOGIN LANGSUNG UNTUK {username} ===")
 
-    try:
-        # Navigasi ke halaman login
-        print(f"Navigasi ke {LOGIN_URL}...")
-        page.goto(LOGIN_URL, wait_until="domcontentloaded")
-
-        # Tunggu halaman loading - OPTIMIZED DELAY
-        time.sleep(1.0)
-
-        # Langsung cari dan isi email
-        print("Mencari dan mengisi field email...")
-        email_filled = False
-
-        # Coba berbagai selector untuk email field
-        email_selectors = [
-            'input[type="text"]',
-            'input[type="email"]',
-            'input[name="email"]',
-            'input[name="username"]',
-            'input[placeholder*="Email"]',
-            'input[placeholder*="email"]',
-        ]
-
-        for selector in email_selectors:
-            try:
-                email_input = page.locator(selector).first
-                if email_input.count() > 0:
-                    try:
-                        email_input.wait_for(state="visible", timeout=2000)
-                        email_input.clear()
-                        email_input.fill(username)
-                        print(f"✓ Email berhasil diisi: {username}")
-                        email_filled = True
-                        break
-                    except Exception:
-                        continue
-            except Exception:
-                continue
-
-        if not email_filled:
-            print("✗ Gagal mengisi email")
-            return False, {"gagal_masuk_akun": False, "count": 0}
-
-        # Langsung cari dan isi PIN
-        print("🔑 Mencari dan mengisi field PIN...")
-        pin_filled = False
-
-        # Coba berbagai selector untuk PIN field
-        pin_selectors = [
-            'input[type="password"]',
-            'input[name="password"]',
-            'input[name="pin"]',
-            'input[placeholder*="PIN"]',
-            'input[placeholder*="Password"]',
-        ]
-
-        for selector in pin_selectors:
-            try:
-                pin_input = page.locator(selector).first
-                if pin_input.count() > 0:
-                    try:
-                        pin_input.wait_for(state="visible", timeout=2000)
-                        pin_input.clear()
-                        pin_input.fill(pin)
-                        print(f"✓ PIN berhasil diisi: {pin}")
-                        pin_filled = True
-                        break
-                    except Exception:
-                        continue
-            except Exception:
-                continue
-        if not pin_filled:
-            print("✗ Gagal mengisi PIN")
-            return False, {"gagal_masuk_akun": False, "count": 0}
-
-        # Langsung cari dan klik tombol login
-        print("Jeda 2.0 detik sebelum klik tombol login...")
-        time.sleep(2.0)
-        print("Mencari dan mengklik tombol login...")
-        login_clicked = False
-
-        # Coba berbagai selector untuk tombol login
-        login_selectors = [
-            'button:has-text("MASUK")',
-            'button:has-text("Masuk")',
-            'button:has-text("LOGIN")',
-            'button:has-text("Login")',
-            'button[type="submit"]',
-        ]
-
-        for selector in login_selectors:
-            try:
-                login_button = page.locator(selector).first
-                if login_button.count() > 0:
-                    try:
-                        login_button.wait_for(state="visible", timeout=2000)
-                        if login_button.is_enabled():
-                            # Gunakan force=True untuk memastikan klik terjadi meskipun ada overlay
-                            login_button.click(force=True)
-                            print("✓ Tombol login berhasil diklik")
-                            time.sleep(1.0)  # Beri waktu untuk event click diproses
-                            login_clicked = True
-                            break
-                    except Exception:
-                        continue
-            except Exception:
-                continue
-
-        if not login_clicked:
-            print("✗ Gagal mengklik tombol login")
-            return False, {"gagal_masuk_akun": False, "count": 0}
-
-        # Tunggu proses login - beri waktu untuk modal muncul
-        print("⏳ Menunggu proses login...")
-        time.sleep(5.0)
+    timings = {}
+    info = {
+        "gagal_masuk_akun": False,
+        "count": 0,
+        "timings": timings,
+        "outcome": None,
+        "auth_status": None,
+        "retry_after": None,
+    }
+
+    def finish(success):
+        _record_login_timings(timings)
+        total = sum(timings.values())
+        print(
+            "   Durasi login: "
+            + ", ".join(f"{phase} {duration:.2f}s" for phase, duration in timings.items())
+            + f" (total {total:.2f}s)"
+        )
+        return success, info
 
-        # === DETEKSI PESAN "GAGAL MASUK AKUN" ===
-        gagal_masuk_detected = False
+    try:
+        # === FASE 1: NAVIGASI ===
+        phase_start = time.time()
+        if not (prewarmed and "merchant-login" in page.url):
+            print(f"Navigasi ke {LOGIN_URL}...")
+            page.goto(LOGIN_URL, wait_until="domcontentloaded")
+        else:
+            # Halaman login sudah dimuat di background saat akun sebelumnya diproses
+            print("Halaman login sudah di-prewarm, lanjut isi form...")
 
-        print("Memeriksa apakah ada pesan 'Gagal Masuk Akun'...")
+        email_input = _any_of(page, EMAIL_TARGET)
+        wait_start = time.perf_counter()
         try:
-            # Cek apakah ada pesan "Gagal Masuk Akun" dengan berbagai selector
-            error_selectors = [
-                # Title/Header selectors
-                "h5:has-text('Gagal Masuk Akun')",
-                "h4:has-text('Gagal Masuk Akun')",
-                "h3:has-text('Gagal Masuk Akun')",
-                ".mantine-Title-root:has-text('Gagal Masuk Akun')",
-                # Text content selectors
-                "text=Gagal Masuk Akun",
-                "text=Akun anda tidak dapat melakukan login",
-                "text=salah PIN 5 kali",
-                "text=Login kembali setelah",
-                # Modal/Dialog selectors
-                "[role='dialog']:has-text('Gagal Masuk Akun')",
-                ".modal:has-text('Gagal Masuk Akun')",
-                ".dialog:has-text('Gagal Masuk Akun')",
-                # Generic container selectors
-                "div:has-text('Gagal Masuk Akun')",
-                "div:has-text('salah PIN 5 kali')",
-                "p:has-text('Akun anda tidak dapat melakukan login')",
-            ]
-
-            for selector in error_selectors:
-                try:
-                    print(f"   Mencoba selector: {selector}")
-                    error_element = page.locator(selector).first
-                    if error_element.count() > 0:
-                        try:
-                            error_element.wait_for(state="visible", timeout=2000)
-                            gagal_masuk_detected = True
-                            print("✗ PESAN 'GAGAL MASUK AKUN' TERDETEKSI!")
-                            print("   Akun tidak dapat login karena salah PIN 5 kali")
-
-                            # Coba ambil text lengkap pesan
-                            try:
-                                full_text = error_element.text_content()
-                                if full_text:
-                                    print(f"   Pesan lengkap: {full_text[:100]}...")
-                            except Exception:
-                                pass
-
-                            break
-                        except Exception:
-                            continue
-                except Exception as e:
-                    print(f"   ✗ Selector gagal: {str(e)[:50]}")
-                    continue
-
-            if not gagal_masuk_detected:
-                print("✓ Tidak ada pesan 'Gagal Masuk Akun'")
-        except Exception as e:
-            print(f"⚠ Error saat cek pesan error: {str(e)}")
+            email_input.wait_for(state="visible", timeout=LOGIN_FORM_TIMEOUT)
+        except PlaywrightTimeoutError:
+            timings["navigate"] = time.time() - phase_start
+            print("✗ Gagal mengisi email (field tidak muncul)")
+            return finish(False)
+        timings["navigate"] = time.time() - phase_start
+        get_selector_registry().record_match(
+            page, EMAIL_TARGET, time.perf_counter() - wait_start
+        )
+
+        # === FASE 2: ISI FORM ===
+        phase_start = time.time()
+        email_input.fill(username)
+        print(f"✓ Email berhasil diisi: {username}")
+
+        pin_input = _any_of(page, PIN_TARGET)
+        wait_start = time.perf_counter()
+        try:
+            pin_input.wait_for(state="visible", timeout=LOGIN_FORM_TIMEOUT)
+        except PlaywrightTimeoutError:
+            timings["fill"] = time.time() - phase_start
+            print("✗ Gagal mengisi PIN (field tidak muncul)")
+            return finish(False)
+        get_selector_registry().record_match(
+            page, PIN_TARGET, time.perf_counter() - wait_start
+        )
+        pin_input.fill(pin)
+        print("✓ PIN berhasil diisi")
+        timings["fill"] = time.time() - phase_start
+
+        # === FASE 3: SUBMIT (status XHR autentikasi dicatat di background) ===
+        phase_start = time.time()
+        try:
+            auth_watch = _submit_login(page)
+        except _LoginClickError as e:
+            timings["submit"] = time.time() - phase_start
+            print(f"✗ Gagal mengklik tombol login: {str(e)}")
+            return finish(False)
+        timings["submit"] = time.time() - phase_start
+        print("✓ Tombol login diklik")
+
+        # === FASE 4: TUNGGU HASIL (satu detektor, sinyal pertama menang) ===
+        phase_start = time.time()
+        result = detect_login_outcome(page)
+        info["auth_status"] = auth_watch.close()
+        timings["outcome"] = time.time() - phase_start
+        print(f"   Auth status: {info['auth_status']}")
+        outcome = result["type"]
+        info["outcome"] = outcome
 
         # === HANDLE GAGAL MASUK AKUN ===
-        if gagal_masuk_detected:
-            print("=== PROSES RETRY LOGIN SETELAH GAGAL MASUK AKUN ===")
-            print("Menunggu 2 menit (120 detik)...")
+        if outcome == "gagal_masuk":
+            info["gagal_masuk_akun"] = True
+            info["count"] = 1
+            print("✗ PESAN 'GAGAL MASUK AKUN' TERDETEKSI!")
+            print("   Akun tidak dapat login karena salah PIN 5 kali")
 
-            # Tunggu 120 detik
-            time.sleep(120)
-            print("✓ Tunggu 2 menit selesai!")
+            if not wait_on_lockout:
+                # Pemanggil yang menjadwalkan retry (deferred retry queue)
+                info["retry_after"] = GAGAL_MASUK_AKUN_TIMEOUT
+                print(f"Akun diparkir, retry setelah {GAGAL_MASUK_AKUN_TIMEOUT} detik")
+                return finish(False)
+
+            print(f"Menunggu {GAGAL_MASUK_AKUN_TIMEOUT} detik sebelum retry...")
+
+            phase_start = time.time()
+            # Cooldown lockout dari server (bukan menunggu UI), tetap sleep
+            time.sleep(GAGAL_MASUK_AKUN_TIMEOUT)
+            timings["lockout_wait"] = time.time() - phase_start
 
             # Langsung klik tombol MASUK lagi tanpa reload
             print("Mengklik tombol MASUK lagi tanpa refresh halaman...")
-
-            retry_clicked = False
-            for selector in login_selectors:
-                try:
-                    login_button = page.locator(selector).first
-                    if login_button.count() > 0:
-                        try:
-                            login_button.wait_for(state="visible", timeout=2000)
-                            if login_button.is_enabled():
-                                login_button.click()
-                                print("✓ Tombol MASUK berhasil diklik lagi!")
-                                retry_clicked = True
-                                break
-                        except Exception:
-                            continue
-                except Exception:
-                    continue
-
-            if not retry_clicked:
+            phase_start = time.time()
+            try:
+                auth_watch = _submit_login(page)
+            except _LoginClickError:
+                timings["retry"] = time.time() - phase_start
                 print("✗ Gagal mengklik tombol MASUK lagi")
-                return False, {"gagal_masuk_akun": gagal_masuk_detected, "count": 1}
+                return finish(False)
+            result = detect_login_outcome(page)
+            info["auth_status"] = auth_watch.close()
+            timings["retry"] = time.time() - phase_start
+            outcome = result["type"]
+            info["outcome"] = outcome
 
-            # Tunggu proses login kedua
-            print("⏳ Menunggu proses login kedua...")
-            time.sleep(3.0)
+        if outcome == "success":
+            print("✓ Login berhasil!")
+            return finish(True)
 
-        # Tunggu dan verifikasi dashboard muncul
-        print("Memverifikasi login berhasil...")
-        dashboard_loaded = wait_for_dashboard(page, timeout=15000)
+        if outcome == "network_error":
+            print(f"✗ Login gagal - error jaringan auth: {result['detail']}")
+            return finish(False)
 
-        # Cek URL sebagai fallback
-        current_url = page.url
-        is_not_login_page = "merchant-login" not in current_url
-
-        if dashboard_loaded or is_not_login_page:
-            if dashboard_loaded:
-                print("✓ Login berhasil!")
-            else:
-                print("✓ Login berhasil! (URL sudah berubah dari halaman login)")
-            return True, {
-                "gagal_masuk_akun": gagal_masuk_detected,
-                "count": 1 if gagal_masuk_detected else 0,
-            }
-        else:
-            print("✗ Login gagal - masih di halaman login")
-            print(f"   Current URL: {current_url}")
-            return False, {
-                "gagal_masuk_akun": gagal_masuk_detected,
-                "count": 1 if gagal_masuk_detected else 0,
-            }
+        if outcome == "auth_rejected":
+            print(f"✗ Login gagal - ditolak server ({result['detail']}), cek username/PIN")
+            return finish(False)
+
+        if outcome == "error":
+            print(f"✗ Login gagal - halaman tidak bisa dibaca: {result['detail']}")
+            return finish(False)
+
+        print("✗ Login gagal - masih di halaman login")
+        print(f"   Current URL: {page.url}")
+        return finish(False)
 
     except Exception as e:
         print(f"✗ Error dalam login: {str(e)}")
         logger.error(f"Error dalam login: {str(e)}", exc_info=True)
-        return False, {"gagal_masuk_akun": False, "count": 0}
+        return finish(False)
 
 
 def wait_for_dashboard(page: Page, timeout: int = 20000):
@@ -308,29 +602,10 @@ def wait_for_dashboard(page: Page, timeout: int = 20000):
         # Tunggu hingga URL berubah dari halaman login
         page.wait_for_url(lambda url: "merchant-login" not in url, timeout=timeout)
 
-        # Verifikasi beberapa elemen dashboard
-        dashboard_indicators = [
-            "text=Dashboard",
-            "text=Laporan Penjualan",
-            "text=Atur Produk",
-            "text=Catat Penjualan",
-            "text=Atur Stok",
-            "[class*='dashboard']",
-            "[class*='sidebar']",
-        ]
-
-        for selector in dashboard_indicators:
-            try:
-                element = page.locator(selector).first
-                if element.count() > 0:
-                    try:
-                        element.wait_for(state="visible", timeout=2000)
-                        print("✓ Dashboard berhasil dimuat")
-                        return True
-                    except Exception:
-                        continue
-            except Exception:
-                continue
+        # Verifikasi elemen dashboard (indikator tercepat dicoba dulu)
+        if get_selector_registry().first_visible(page, DASHBOARD_TARGET) is not None:
+            print("✓ Dashboard berhasil dimuat")
+            return True
 
         # Jika tidak ada elemen dashboard yang ditemukan tapi URL sudah berubah
         if "merchant-login" not in page.url:
@@ -402,6 +677,137 @@ def is_logged_in(page: Page):
         return False
 
 
+# Hasil cek session: "dashboard" (predicate dashboard siap), "login"
+# (dilempar ke halaman login), null selama belum ada keduanya
+SESSION_CHECK_JS = """
+(loginPath) => {
+    if (location.href.includes(loginPath)) return "login";
+    return (%s)() ? "dashboard" : null;
+}
+""" % READY_PREDICATES["dashboard"].strip()
+
+
+def restore_session(page: Page, timeout: int = None):
+    """
+    Validasi session yang dipulihkan dari storage_state secara murah:
+    buka halaman terproteksi (dashboard) dan selesai pada sinyal pertama,
+    dashboard siap (session valid) atau dilempar ke halaman login (expired)
+
+    Args:
+        page (Page): Playwright Page object (context sudah berisi storage_state)
+        timeout (int): Batas tunggu (ms). Default SESSION_CHECK_TIMEOUT
+
+    Returns:
+        bool: True jika session masih valid (sudah login)
+    """
+    timeout = SESSION_CHECK_TIMEOUT if timeout is None else timeout
+    # Path dashboard dari route table; tanpa itu root portal (SPA mengarahkan
+    # user yang sudah login ke dashboard dan yang belum ke halaman login)
+    dashboard_url = urljoin(LOGIN_URL, get_route_table().get("dashboard") or "/")
+    deadline = time.time() + timeout / 1000
+
+    try:
+        page.goto(dashboard_url, wait_until="commit", timeout=timeout)
+        while True:
+            remaining = int((deadline - time.time()) * 1000)
+            if remaining <= 0:
+                return False
+            try:
+                result = page.wait_for_function(
+                    SESSION_CHECK_JS, arg="merchant-login", timeout=remaining
+                ).json_value()
+                return result == "dashboard"
+            except PlaywrightTimeoutError:
+                return False
+            except Exception as e:
+                # Redirect ke halaman login menghancurkan execution context
+                if page.is_closed() or is_page_closed_error(e):
+                    raise
+                if "merchant-login" in page.url:
+                    return False
+                if not is_navigation_error(e):
+                    raise
+
+    except Exception as e:
+        print(f"⚠ Error validasi session: {str(e)}")
+        return False
+
+
+# Token login SPA disimpan di Web Storage origin portal (ikut storage_state)
+CLEAR_WEB_STORAGE_JS = """
+() => {
+    try { window.localStorage.clear(); } catch (e) {}
+    try { window.sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+def _clear_session_storage(page: Page):
+    """
+    Hapus sisa session expired (cookies + localStorage/sessionStorage) supaya
+    token lama dari storage_state tidak tercampur dengan login baru.
+    Page harus berada di origin portal (setelah restore_session).
+    """
+    try:
+        page.context.clear_cookies()
+    except Exception:
+        pass
+    try:
+        page.evaluate(CLEAR_WEB_STORAGE_JS)
+    except Exception as e:
+        logger.debug(f"Gagal membersihkan Web Storage: {e}")
+
+
+def login_with_session(
+    page: Page,
+    username: str,
+    pin: str,
+    session_cache=None,
+    session_restored=False,
+    prewarmed=False,
+    wait_on_lockout=True,
+):
+    """
+    Login dengan memakai session tersimpan jika masih valid.
+    Fallback ke login_direct hanya jika session tidak ada/expired,
+    lalu simpan session baru setelah login berhasil.
+
+    Args:
+        page (Page): Playwright Page object
+        username (str): Username merchant
+        pin (str): PIN merchant
+        session_cache (SessionCache): Cache session, None untuk menonaktifkan
+        session_restored (bool): True jika context dibuat dengan storage_state
+        prewarmed (bool): True jika halaman login sudah dibuka lebih dulu
+        wait_on_lockout (bool): Diteruskan ke login_direct
+
+    Returns:
+        tuple: (success, dict) - Sama dengan login_direct, ditambah key
+               'session_reused' (bool)
+    """
+    if session_restored:
+        if restore_session(page):
+            print(f"✓ Session tersimpan masih valid, skip login ({username})")
+            return True, {"gagal_masuk_akun": False, "count": 0, "session_reused": True}
+
+        print(f"⚠ Session tersimpan expired, login ulang ({username})")
+        if session_cache:
+            session_cache.invalidate(username)
+        _clear_session_storage(page)
+        # Halaman sekarang bukan lagi hasil prewarm yang bersih
+        prewarmed = False
+
+    success, info = login_direct(
+        page, username, pin, prewarmed=prewarmed, wait_on_lockout=wait_on_lockout
+    )
+    info["session_reused"] = False
+
+    if success and session_cache:
+        session_cache.save(username, page.context)
+
+    return success, info
+
+
 def logout(page: Page):
     """
     Logout dari akun merchant
@@ -430,9 +836,11 @@ def logout(page: Page):
                 if logout_button.count() > 0:
                     try:
                         logout_button.wait_for(state="visible", timeout=2000)
-                        logout_button.click()
+                        wait_until(
+                            page, "redirect ke halaman login", url_contains("merchant-login"),
+                            replaces=1.0, action=logout_button.click,
+                        )
                         print("✓ Tombol logout berhasil diklik")
-                        time.sleep(1.0)
 
                         # Verifikasi logout berhasil
                         if "merchant-login" in page.url:
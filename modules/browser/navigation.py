@@ -4,13 +4,44 @@ File ini menangani proses navigasi menggunakan Playwright
 """
 
 import logging
+import re
 import time
 from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 from playwright.sync_api import Page
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from datetime import datetime
 
+from modules.browser.page_routes import is_page_ready, navigate_to
+from modules.browser.selector_registry import get_selector_registry, register_selectors
+from modules.browser.waits import (
+    all_of,
+    dom_quiet,
+    loader_hidden,
+    predicate,
+    selector_state,
+    wait_until,
+)
+
+try:
+    from modules.core.config import (
+        CALENDAR_STEP_TIMEOUT,
+        DATE_FILTER_URL_FORMAT,
+        DATE_FILTER_URL_PARAMS,
+        NAVIGATION_READY_TIMEOUT,
+    )
+except ImportError:
+    CALENDAR_STEP_TIMEOUT = 3000
+    DATE_FILTER_URL_FORMAT = "%Y-%m-%d"
+    DATE_FILTER_URL_PARAMS = None
+    NAVIGATION_READY_TIMEOUT = 5000
+
+try:
+    from modules.core.telemetry import get_telemetry_manager
+except ImportError:
+    get_telemetry_manager = None
+
 # Import constants dari local module
 try:
     from modules.core.constants import DEFAULT_DELAY
@@ -22,14 +53,39 @@ except ImportError:
 
 logger = logging.getLogger("playwright_automation")
 
+# Selector kandidat (dipakai bersama oleh flow sync dan async)
+LAPORAN_PENJUALAN_SELECTORS = [
+    # Selector utama yang berhasil
+    "div:has(img[alt*='sale']):has-text('Laporan Penjualan')",
+    # Backup selectors jika yang utama gagal
+    "div:has(img[src*='icon-saleReport']):has-text('Laporan Penjualan')",
+    "text=Laporan Penjualan",
+    "[href*='laporan-penjualan']",
+]
+
+DATE_RANGE_BUTTON_SELECTORS = [
+    "button:has-text('Atur Rentang Waktu')",
+    "div:has-text('Atur Rentang Waktu')",
+    ".date-range-picker",
+]
+
+# Target selector registry (urutan dipelajari dari statistik antar run)
+LAPORAN_PENJUALAN_TARGET = register_selectors(
+    "nav.laporan_penjualan", LAPORAN_PENJUALAN_SELECTORS
+)
+DATE_RANGE_BUTTON_TARGET = register_selectors(
+    "nav.date_range_button", DATE_RANGE_BUTTON_SELECTORS
+)
+
 
 def click_laporan_penjualan_direct(page: Page) -> bool:
     """
     ============================================
-    FUNGSI KLIK MENU LAPORAN PENJUALAN - DIRECT
+    FUNGSI BUKA LAPORAN PENJUALAN - DIRECT
     ============================================
 
-    Mencari dan mengklik menu "Laporan Penjualan" di sidebar/menu
+    Membuka halaman "Laporan Penjualan" langsung lewat route table
+    (pushState/goto), klik menu sidebar sebagai fallback
 
     Args:
         page (Page): Playwright Page object
@@ -37,24 +93,18 @@ def click_laporan_penjualan_direct(page: Page) -> bool:
     Returns:
         bool: True jika berhasil, False jika gagal
     """
+    return navigate_to(page, "laporan-penjualan", _click_laporan_penjualan_menu) is not None
+
+
+def _click_laporan_penjualan_menu(page: Page) -> bool:
+    """Klik menu "Laporan Penjualan" di sidebar (fallback navigate_to)"""
     print("Mencari dan mengklik menu Laporan Penjualan...")
 
     try:
-        # Tunggu halaman stabil
-        time.sleep(0.5)
-
-        # Coba berbagai selector untuk menu Laporan Penjualan
         # Coba selector yang terbukti berhasil untuk menu Laporan Penjualan
-        menu_selectors = [
-            # Selector utama yang berhasil
-            "div:has(img[alt*='sale']):has-text('Laporan Penjualan')",
-            # Backup selectors jika yang utama gagal
-            "div:has(img[src*='icon-saleReport']):has-text('Laporan Penjualan')",
-            "text=Laporan Penjualan",
-            "[href*='laporan-penjualan']",
-        ]
-
-        for selector in menu_selectors:
+        registry = get_selector_registry()
+        for selector in registry.candidates(LAPORAN_PENJUALAN_TARGET):
+            started_at = time.perf_counter()
             try:
                 print(f"   Mencoba selector: {selector}")
                 menu_item = page.locator(selector).first
@@ -62,12 +112,17 @@ def click_laporan_penjualan_direct(page: Page) -> bool:
                 # Cek apakah elemen ada dengan count
                 if menu_item.count() == 0:
                     print(f"   ✗ Elemen tidak ditemukan")
+                    registry.record(
+                        LAPORAN_PENJUALAN_TARGET,
+                        selector,
+                        False,
+                        time.perf_counter() - started_at,
+                    )
                     continue
 
                 # Scroll ke elemen jika ada
                 try:
                     menu_item.scroll_into_view_if_needed()
-                    time.sleep(0.5)
                 except Exception:
                     pass
 
@@ -76,15 +131,32 @@ def click_laporan_penjualan_direct(page: Page) -> bool:
                     menu_item.wait_for(state="visible", timeout=3000)
                 except Exception:
                     print(f"   ✗ Elemen tidak visible")
+                    registry.record(
+                        LAPORAN_PENJUALAN_TARGET,
+                        selector,
+                        False,
+                        time.perf_counter() - started_at,
+                    )
                     continue
 
                 print(f"   ✓ Elemen ditemukan, mengklik...")
                 menu_item.click(force=True)
+                registry.record(
+                    LAPORAN_PENJUALAN_TARGET,
+                    selector,
+                    True,
+                    time.perf_counter() - started_at,
+                )
                 print("✓ Menu Laporan Penjualan berhasil diklik")
-                time.sleep(0.5)
                 return True
             except Exception as e:
                 print(f"   ✗ Selector gagal: {str(e)[:50]}")
+                registry.record(
+                    LAPORAN_PENJUALAN_TARGET,
+                    selector,
+                    False,
+                    time.perf_counter() - started_at,
+                )
                 continue
 
         print("✗ Gagal menemukan menu Laporan Penjualan dengan semua selector")
@@ -92,7 +164,7 @@ def click_laporan_penjualan_direct(page: Page) -> bool:
 
     except Exception as e:
         print(f"✗ Error klik Laporan Penjualan: {str(e)}")
-        logger.error(f"Error click_laporan_penjualan_direct: {str(e)}", exc_info=True)
+        logger.error(f"Error _click_laporan_penjualan_menu: {str(e)}", exc_info=True)
         return False
 
 
@@ -102,7 +174,8 @@ def navigate_to_atur_produk(page: Page) -> bool:
     FUNGSI NAVIGASI KE ATUR PRODUK
     ============================================
 
-    Mencari dan mengklik menu "Atur Produk" untuk cek stok
+    Membuka halaman "Atur Produk" untuk cek stok lewat route table,
+    klik menu sebagai fallback
 
     Args:
         page (Page): Playwright Page object
@@ -110,12 +183,14 @@ def navigate_to_atur_produk(page: Page) -> bool:
     Returns:
         bool: True jika berhasil, False jika gagal
     """
+    return navigate_to(page, "atur-produk", _click_atur_produk_menu) is not None
+
+
+def _click_atur_produk_menu(page: Page) -> bool:
+    """Klik menu "Atur Produk" (fallback navigate_to)"""
     print("Mencari dan mengklik menu Atur Produk...")
 
     try:
-        # Tunggu halaman stabil
-        time.sleep(1.0)
-
         # Coba berbagai selector untuk menu Atur Produk
         menu_selectors = [
             "text=Atur Produk",
@@ -135,7 +210,6 @@ def navigate_to_atur_produk(page: Page) -> bool:
                         menu_item.wait_for(state="visible", timeout=2000)
                         menu_item.click()
                         print("✓ Menu Atur Produk berhasil diklik")
-                        time.sleep(1.5)
                         return True
                     except Exception:
                         continue
@@ -147,17 +221,18 @@ def navigate_to_atur_produk(page: Page) -> bool:
 
     except Exception as e:
         print(f"✗ Error navigasi ke Atur Produk: {str(e)}")
-        logger.error(f"Error navigate_to_atur_produk: {str(e)}", exc_info=True)
+        logger.error(f"Error _click_atur_produk_menu: {str(e)}", exc_info=True)
         return False
 
 
 def click_rekap_penjualan_direct(page: Page) -> bool:
     """
     ============================================
-    FUNGSI KLIK REKAP PENJUALAN - DIRECT
+    FUNGSI BUKA REKAP PENJUALAN - DIRECT
     ============================================
 
-    Mencari dan mengklik menu/tab "Rekap Penjualan" di halaman Laporan Penjualan
+    Membuka "Rekap Penjualan" langsung lewat route table, klik menu/tab di
+    halaman Laporan Penjualan sebagai fallback
 
     Args:
         page (Page): Playwright Page object
@@ -165,12 +240,14 @@ def click_rekap_penjualan_direct(page: Page) -> bool:
     Returns:
         bool: True jika berhasil, False jika gagal
     """
+    return navigate_to(page, "rekap-penjualan", _click_rekap_penjualan_menu) is not None
+
+
+def _click_rekap_penjualan_menu(page: Page) -> bool:
+    """Klik menu/tab "Rekap Penjualan" (fallback navigate_to)"""
     print("Mencari dan mengklik Rekap Penjualan...")
 
     try:
-        # Tunggu halaman stabil
-        time.sleep(0.5)
-
         # Coba berbagai selector untuk Rekap Penjualan
         rekap_selectors = [
             ".mantine-Text-root:has-text('Rekap Penjualan')",
@@ -191,7 +268,6 @@ def click_rekap_penjualan_direct(page: Page) -> bool:
                         rekap_item.wait_for(state="visible", timeout=2000)
                         rekap_item.click()
                         print("✓ Rekap Penjualan berhasil diklik")
-                        time.sleep(0.5)
                         return True
                     except Exception:
                         continue
@@ -203,7 +279,7 @@ def click_rekap_penjualan_direct(page: Page) -> bool:
 
     except Exception as e:
         print(f"✗ Error klik Rekap Penjualan: {str(e)}")
-        logger.error(f"Error click_rekap_penjualan_direct: {str(e)}", exc_info=True)
+        logger.error(f"Error _click_rekap_penjualan_menu: {str(e)}", exc_info=True)
         return False
 
 
@@ -224,8 +300,7 @@ def click_catat_penjualan_direct(page: Page) -> bool:
     print("📝 Mencari dan mengklik menu Catat Penjualan...")
 
     try:
-        # Tunggu halaman stabil
-        time.sleep(1.0)
+        wait_until(page, "halaman stabil sebelum menu Catat Penjualan", dom_quiet(), replaces=1.0)
 
         # Coba berbagai selector untuk menu Catat Penjualan
         menu_selectors = [
@@ -245,7 +320,7 @@ def click_catat_penjualan_direct(page: Page) -> bool:
                         menu_item.wait_for(state="visible", timeout=2000)
                         menu_item.click()
                         print("✓ Menu Catat Penjualan berhasil diklik")
-                        time.sleep(1.5)
+                        wait_until(page, "form Catat Penjualan", dom_quiet(), replaces=1.5)
                         return True
                     except Exception:
                         continue
@@ -285,10 +360,375 @@ def get_indo_month(month_int: int) -> tuple:
     return months.get(month_int, ("", ""))
 
 
+# ============================================
+# DATE RANGE FILTER
+# ============================================
+
+# Elemen kalender Mantine (DatePicker type="range")
+CALENDAR_HEADER_SELECTOR = "[class*='calendarHeaderLevel']"
+CALENDAR_PREV_SELECTOR = (
+    "[class*='calendarHeaderControl'][data-direction='previous'], "
+    "[class*='calendarHeaderControl']:first-child"
+)
+CALENDAR_NEXT_SELECTOR = (
+    "[class*='calendarHeaderControl'][data-direction='next'], "
+    "[class*='calendarHeaderControl']:last-child"
+)
+# Tombol hari di bulan yang tampil saja (bukan tanggal bulan sebelum/sesudah)
+CALENDAR_DAY_SELECTOR = (
+    "button[class*='day']:not([data-outside]):not([class*='outside']):not([disabled])"
+)
+CALENDAR_MONTH_SELECTOR = "button[class*='monthsList']"
+
+# True jika text header kalender sudah berbeda dari sebelumnya
+CALENDAR_HEADER_CHANGED_JS = """
+(arg) => {
+    const el = document.querySelector(arg.selector);
+    return !!el && el.textContent.trim() !== arg.before;
+}
+"""
+
+# True jika ada hari yang terpilih (klik pertama range tercatat)
+CALENDAR_DAY_SELECTED_JS = """
+() => !!document.querySelector("[data-selected], [data-first-in-range], [data-in-range]")
+"""
+
+
+
+def _build_month_lookup() -> dict:
+    """Nama bulan di header kalender (Indonesia + Inggris, lengkap + singkat) -> nomor"""
+    english = [
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+        ("may", "may"), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+        ("september", "sep"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ]
+    lookup = {"agu": 8}
+    for month in range(1, 13):
+        for name in get_indo_month(month) + english[month - 1]:
+            lookup[name.lower()] = month
+    return lookup
+
+
+MONTH_NAME_TO_NUMBER = _build_month_lookup()
+
+HEADER_MONTH_YEAR_REGEX = re.compile(r"([A-Za-z]+)\s+(\d{4})")
+
+
+def parse_calendar_header(text: Optional[str]) -> Optional[tuple]:
+    """
+    Parse header kalender level hari
+
+    Args:
+        text (str): Mis. "November 2025" atau "Agt 2025"
+
+    Returns:
+        tuple: (year, month), None jika header bukan level hari (mis. "2025")
+    """
+    match = HEADER_MONTH_YEAR_REGEX.search(text or "")
+    if not match:
+        return None
+    month = MONTH_NAME_TO_NUMBER.get(match.group(1).lower())
+    return (int(match.group(2)), month) if month else None
+
+
+def calendar_click_plan(shown: tuple, target: tuple) -> tuple:
+    """
+    Hitung jalur klik minimal dari bulan yang tampil ke bulan target
+
+    Args:
+        shown (tuple): (year, month) yang tampil di kalender
+        target (tuple): (year, month) tujuan
+
+    Returns:
+        tuple: ("month", n) = n klik prev/next per bulan (negatif = mundur), atau
+               ("year", n) = klik header, n klik prev/next per tahun, klik bulan
+    """
+    month_steps = (target[0] - shown[0]) * 12 + (target[1] - shown[1])
+    year_steps = target[0] - shown[0]
+    # Lewat level tahun butuh 2 klik tambahan (header + bulan)
+    if abs(month_steps) <= abs(year_steps) + 2:
+        return ("month", month_steps)
+    return ("year", year_steps)
+
+
+def _calendar_header_text(page: Page) -> Optional[str]:
+    header = page.locator(CALENDAR_HEADER_SELECTOR).first
+    if header.count() == 0:
+        return None
+    return (header.text_content() or "").strip()
+
+
+def _click_and_wait_header(page: Page, locator, timeout: int) -> bool:
+    """Klik elemen kalender lalu tunggu header berubah (bukan sleep)"""
+    before = _calendar_header_text(page)
+    locator.click()
+    try:
+        page.wait_for_function(
+            CALENDAR_HEADER_CHANGED_JS,
+            arg={"selector": CALENDAR_HEADER_SELECTOR, "before": before},
+            timeout=timeout,
+        )
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def _calendar_go_to_month(page: Page, year: int, month: int, timeout: int) -> bool:
+    """
+    Pindahkan kalender ke bulan target lewat jalur klik minimal
+
+    Returns:
+        bool: True jika header kalender menampilkan bulan target
+    """
+    shown = parse_calendar_header(_calendar_header_text(page))
+    if shown is None:
+        return False
+    if shown == (year, month):
+        return True
+
+    level, steps = calendar_click_plan(shown, (year, month))
+    control = page.locator(CALENDAR_NEXT_SELECTOR if steps > 0 else CALENDAR_PREV_SELECTOR).first
+
+    if level == "month":
+        for _ in range(abs(steps)):
+            if not _click_and_wait_header(page, control, timeout):
+                return False
+    else:
+        # Header -> grid bulan (header menampilkan tahun)
+        header = page.locator(CALENDAR_HEADER_SELECTOR).first
+        if not _click_and_wait_header(page, header, timeout):
+            return False
+        for _ in range(abs(steps)):
+            if not _click_and_wait_header(page, control, timeout):
+                return False
+
+        month_names = [name for name, number in MONTH_NAME_TO_NUMBER.items() if number == month]
+        month_btn = page.locator(CALENDAR_MONTH_SELECTOR).filter(
+            has_text=re.compile(rf"^\s*({'|'.join(month_names)})\s*$", re.IGNORECASE)
+        ).first
+        if month_btn.count() == 0 or not _click_and_wait_header(page, month_btn, timeout):
+            return False
+
+    return parse_calendar_header(_calendar_header_text(page)) == (year, month)
+
+
+def _calendar_click_day(page: Page, day: int) -> bool:
+    """Klik tanggal di bulan yang tampil (tanggal bulan lain diabaikan)"""
+    day_btn = page.locator(CALENDAR_DAY_SELECTOR).filter(
+        has_text=re.compile(rf"^\s*{day}\s*$")
+    ).first
+    if day_btn.count() == 0:
+        return False
+    day_btn.click()
+    return True
+
+
+def _open_date_range_picker(page: Page, timeout: int) -> bool:
+    """Klik "Atur Rentang Waktu" lalu tunggu kalender muncul"""
+    registry = get_selector_registry()
+    for selector in registry.candidates(DATE_RANGE_BUTTON_TARGET):
+        started_at = time.perf_counter()
+        success = False
+        try:
+            elem = page.locator(selector).first
+            if elem.count() > 0 and elem.is_visible():
+                elem.click()
+                page.locator(CALENDAR_HEADER_SELECTOR).first.wait_for(
+                    state="visible", timeout=timeout
+                )
+                success = True
+        except Exception:
+            pass
+        registry.record(
+            DATE_RANGE_BUTTON_TARGET, selector, success, time.perf_counter() - started_at
+        )
+        if success:
+            return True
+    return False
+
+
+def _apply_date_range_calendar(
+    page: Page, start_date: datetime, end_date: datetime, timeout: int
+) -> bool:
+    """
+    Pilih rentang tanggal di kalender: buka picker, pindah ke bulan awal lewat
+    jalur klik minimal, klik tanggal awal, (pindah bulan) klik tanggal akhir.
+    Setiap langkah menunggu perubahan state UI.
+    """
+    if not _open_date_range_picker(page, timeout):
+        return False
+
+    for index, target in enumerate((start_date, end_date)):
+        if not _calendar_go_to_month(page, target.year, target.month, timeout):
+            print(f"   ✗ Kalender tidak bisa dipindah ke {target.strftime('%m/%Y')}")
+            return False
+        if not _calendar_click_day(page, target.day):
+            print(f"   ✗ Tanggal {target.day} tidak ditemukan di kalender")
+            return False
+        if index == 0:
+            try:
+                page.wait_for_function(CALENDAR_DAY_SELECTED_JS, timeout=timeout)
+            except PlaywrightTimeoutError:
+                return False
+
+    # Picker biasanya menutup setelah range lengkap
+    try:
+        page.locator(CALENDAR_HEADER_SELECTOR).first.wait_for(state="hidden", timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+    return True
+
+
+def date_filter_url(url: str, start_date: datetime, end_date: datetime) -> Optional[str]:
+    """
+    URL halaman dengan query param filter tanggal (DATE_FILTER_URL_PARAMS)
+
+    Returns:
+        str: URL berfilter, None jika portal tidak dikonfigurasi untuk deep link
+    """
+    if not DATE_FILTER_URL_PARAMS:
+        return None
+
+    start_param, end_param = DATE_FILTER_URL_PARAMS
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query[start_param] = start_date.strftime(DATE_FILTER_URL_FORMAT)
+    query[end_param] = end_date.strftime(DATE_FILTER_URL_FORMAT)
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def date_range_label(start_date: datetime, end_date: datetime) -> str:
+    """Label rentang tanggal untuk log ("dd/mm/YYYY" atau "awal - akhir")"""
+    label = start_date.strftime("%d/%m/%Y")
+    if end_date.date() != start_date.date():
+        label += f" - {end_date.strftime('%d/%m/%Y')}"
+    return label
+
+
+def _apply_date_range_url(
+    page: Page, start_date: datetime, end_date: datetime, page_name: str, timeout: int
+) -> bool:
+    """Terapkan filter lewat query param URL (DATE_FILTER_URL_PARAMS)"""
+    url = date_filter_url(page.url, start_date, end_date)
+    if not url:
+        return False
+
+    page.goto(url, wait_until="domcontentloaded")
+    return is_page_ready(page, page_name, timeout)
+
+
+def apply_date_range(
+    page: Page,
+    start_date: datetime,
+    end_date: Optional[datetime] = None,
+    page_name: str = "laporan-penjualan",
+    timeout: Optional[int] = None,
+) -> Optional[str]:
+    """
+    ============================================
+    FUNGSI FILTER RENTANG TANGGAL
+    ============================================
+
+    Terapkan filter tanggal di Laporan/Rekap Penjualan dengan cara termurah:
+    1. Hari ini -> tidak perlu apa-apa (default website)
+    2. Query param URL (jika DATE_FILTER_URL_PARAMS diisi)
+    3. Kalender dengan jalur klik minimal dari bulan yang tampil
+
+    Args:
+        page (Page): Page di halaman Laporan/Rekap Penjualan
+        start_date (datetime): Tanggal awal
+        end_date (datetime): Tanggal akhir. Default = start_date
+        page_name (str): Nama halaman (predicate siap untuk metode URL)
+        timeout (int): Batas tunggu per langkah (ms). Default CALENDAR_STEP_TIMEOUT
+
+    Returns:
+        str: Metode yang berhasil ("default", "url", "calendar"), None jika gagal
+    """
+    end_date = end_date or start_date
+    if end_date < start_date:
+        start_date, end_date = end_date, start_date
+    timeout = CALENDAR_STEP_TIMEOUT if timeout is None else timeout
+
+    today = datetime.now().date()
+    if start_date.date() == today and end_date.date() == today:
+        return record_date_filter("default")
+
+    print(f"📅 Menerapkan filter tanggal: {date_range_label(start_date, end_date)}...")
+
+    try:
+        if _apply_date_range_url(page, start_date, end_date, page_name, NAVIGATION_READY_TIMEOUT):
+            print("   ✓ Filter tanggal diterapkan lewat URL")
+            return record_date_filter("url")
+    except Exception as e:
+        logger.debug(f"Filter tanggal via URL gagal: {e}")
+
+    try:
+        if _apply_date_range_calendar(page, start_date, end_date, timeout):
+            print("   ✓ Filter tanggal diterapkan lewat kalender")
+            return record_date_filter("calendar")
+    except Exception as e:
+        logger.debug(f"Filter tanggal via kalender gagal: {e}")
+
+    record_date_filter("failed")
+    return None
+
+
+def record_date_filter(method: str) -> str:
+    """Catat metode filter tanggal ke TelemetryManager (jika tersedia)"""
+    if get_telemetry_manager is not None:
+        get_telemetry_manager().increment_counter(f"date_filter_{method}")
+    return method
+
+
+def _month_button_ready(month_short: str):
+    """Kondisi grid bulan kalender tampil (tombol bulan singkat, Agt/Agu)"""
+    names = ("Agt", "Agu") if month_short in ("Agt", "Agu") else (month_short,)
+    selector = ", ".join(f"button:text-is('{name}')" for name in names)
+    return selector_state(selector)
+
+
+def _day_selected_ready():
+    return predicate("calendar_day_selected", CALENDAR_DAY_SELECTED_JS)
+
+
+def _click_range_end(page: Page, date_btn) -> None:
+    """Klik kedua (akhir range) lalu tunggu kalender tertutup dan UI tenang"""
+    wait_until(
+        page,
+        "filter tanggal diterapkan",
+        all_of(selector_state(CALENDAR_HEADER_SELECTOR, "hidden"), dom_quiet()),
+        replaces=1.5,
+        timeout=CALENDAR_STEP_TIMEOUT,
+        action=date_btn.click,
+    )
+
+
 def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
     """
     ============================================
-    FUNGSI FILTER TANGGAL - DIRECT (4 STEPS)
+    FUNGSI FILTER TANGGAL - DIRECT
+    ============================================
+
+    Terapkan filter satu tanggal di Laporan Penjualan lewat apply_date_range
+    (URL / kalender jalur minimal), alur 4 langkah lama sebagai fallback
+
+    Args:
+        page (Page): Playwright Page object
+        target_date (datetime): Tanggal yang dipilih
+
+    Returns:
+        bool: True jika berhasil, False jika gagal
+    """
+    if apply_date_range(page, target_date, page_name="laporan-penjualan"):
+        return True
+    print("   ⚠ Filter tanggal cepat gagal, memakai alur 4 langkah...")
+    return _click_date_elements_4step(page, target_date)
+
+
+def _click_date_elements_4step(page: Page, target_date: datetime) -> bool:
+    """
+    ============================================
+    FUNGSI FILTER TANGGAL - 4 STEPS (FALLBACK)
     ============================================
     
     Alur:
@@ -312,28 +752,29 @@ def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
     print(f"📅 Memilih tanggal: {target_date.strftime('%d/%m/%Y')} (4 Steps)...")
 
     try:
-        # Tunggu halaman stabil
-        time.sleep(1.0)
+        wait_until(page, "halaman stabil sebelum filter tanggal", dom_quiet(), replaces=1.0)
 
         # === STEP 1: Klik Button "Atur Rentang Waktu" ===
         print("   Step 1: Klik 'Atur Rentang Waktu'...")
-        step1_selectors = [
-            "button:has-text('Atur Rentang Waktu')",
-            "div:has-text('Atur Rentang Waktu')",
-            ".date-range-picker", 
-        ]
-        
         step1_success = False
-        for selector in step1_selectors:
+        registry = get_selector_registry()
+        for selector in registry.candidates(DATE_RANGE_BUTTON_TARGET):
+            started_at = time.perf_counter()
             try:
                 elem = page.locator(selector).first
                 if elem.count() > 0 and elem.is_visible():
                     elem.click()
                     step1_success = True
-                    time.sleep(1.0)
-                    break
             except:
-                continue
+                pass
+            registry.record(
+                DATE_RANGE_BUTTON_TARGET,
+                selector,
+                step1_success,
+                time.perf_counter() - started_at,
+            )
+            if step1_success:
+                break
         
         if not step1_success:
             print("   ⚠ Tidak menemukan tombol 'Atur Rentang Waktu', mencoba lanjut...")
@@ -343,6 +784,12 @@ def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
         month = target_date.month
         year = target_date.year
         month_full, month_short = get_indo_month(month)
+
+        if step1_success:
+            wait_until(
+                page, "kalender terbuka", selector_state(f"button:has-text('{year}')"),
+                replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT,
+            )
         
         # Format header biasanya "Bulan Tahun" (e.g., "November 2025")
         # Kita cari tombol yang text-nya ADALAH "Bulan Tahun" saat ini
@@ -377,7 +824,10 @@ def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
                 print(f"      -> Menemukan header: '{header_text}'")
                 header_btn.click()
                 step2_success = True
-                time.sleep(1.0) # Tunggu grid bulan muncul
+                wait_until(
+                    page, "grid bulan kalender", _month_button_ready(month_short),
+                    replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT,
+                )
             else:
                 print(f"      ⚠ Tidak menemukan tombol header dengan tahun {year}")
                 
@@ -404,7 +854,10 @@ def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
                 month_btn.click()
                 step3_success = True
                 print(f"      -> Berhasil klik bulan {month_short}")
-                time.sleep(1.0) # Tunggu grid tanggal muncul
+                wait_until(
+                    page, "grid tanggal kalender", selector_state(CALENDAR_DAY_SELECTOR),
+                    replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT,
+                )
             else:
                 print(f"      ⚠ Tidak menemukan tombol bulan '{month_short}'")
                 
@@ -420,24 +873,25 @@ def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
             
             # Locator spesifik untuk tanggal di kalender (hindari tanggal dari bulan lain jika mungkin)
             # Menggunakan text exact match untuk angka
-            date_btn = page.locator(f"button:text-is('{day}')").first
+            date_btn = page.locator(f"{CALENDAR_DAY_SELECTOR}:text-is('{day}')").first
             
             if date_btn.count() == 0:
                  # Fallback: contains text
-                 date_btn = page.locator(f"button:has-text('{day}')").first
+                 date_btn = page.locator(f"button:text-is('{day}')").first
             
             if date_btn.count() > 0:
-                # Klik pertama
-                date_btn.click()
+                # Klik pertama, tunggu tanggal tercatat (bukan double-click instan)
+                wait_until(
+                    page, "klik pertama tanggal tercatat", _day_selected_ready(),
+                    replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT, action=date_btn.click,
+                )
                 print(f"      -> Klik pertama tanggal {day}")
-                time.sleep(1.0) # Delay diperlama agar tidak dianggap double-click instan
                 
                 # Klik kedua
-                date_btn.click()
+                _click_range_end(page, date_btn)
                 print(f"      -> Klik kedua tanggal {day}")
                 
                 print(f"   ✓ Berhasil klik tanggal {day} (2x)")
-                time.sleep(1.5) # Tunggu efek UI selesai
                 return True
             else:
                 print(f"   ✗ Gagal menemukan tombol tanggal {day}")
@@ -449,14 +903,31 @@ def click_date_elements_direct(page: Page, target_date: datetime) -> bool:
 
     except Exception as e:
         print(f"✗ Error set tanggal (4-step): {str(e)}")
-        logger.error(f"Error click_date_elements_direct: {str(e)}", exc_info=True)
+        logger.error(f"Error _click_date_elements_4step: {str(e)}", exc_info=True)
         return False
 
 
 def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bool:
     """
     ============================================
-    FUNGSI FILTER TANGGAL REKAP PENJUALAN (4 STEPS)
+    FUNGSI FILTER TANGGAL REKAP PENJUALAN
+    ============================================
+
+    Sama seperti click_date_elements_direct untuk halaman Rekap Penjualan
+
+    Returns:
+        bool: True jika berhasil, False jika gagal
+    """
+    if apply_date_range(page, target_date, page_name="rekap-penjualan"):
+        return True
+    print("   ⚠ Filter tanggal cepat gagal, memakai alur 4 langkah...")
+    return _click_date_elements_rekap_4step(page, target_date)
+
+
+def _click_date_elements_rekap_4step(page: Page, target_date: datetime) -> bool:
+    """
+    ============================================
+    FUNGSI FILTER TANGGAL REKAP PENJUALAN (4 STEPS, FALLBACK)
     ============================================
     
     Implementasi logika 4 langkah untuk halaman Rekap Penjualan
@@ -476,7 +947,7 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
     print(f"📅 Memilih tanggal Rekap: {target_date.strftime('%d/%m/%Y')} (4 Steps)...")
 
     try:
-        time.sleep(1.0)
+        wait_until(page, "halaman stabil sebelum filter tanggal", dom_quiet(), replaces=1.0)
         
         # === STEP 1: Klik Button "Atur Rentang Waktu" ===
         # Di rekap penjualan mungkin labelnya berbeda atau sama
@@ -494,7 +965,6 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
                 if elem.count() > 0:
                     elem.click()
                     step1_success = True
-                    time.sleep(1.0)
                     break
             except:
                 continue
@@ -509,6 +979,12 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
         month_full, month_short = get_indo_month(month)
         target_month_year = f"{month_full} {year}"
 
+        if step1_success:
+            wait_until(
+                page, "kalender terbuka", selector_state(f"button:has-text('{year}')"),
+                replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT,
+            )
+
         # === STEP 2: Klik Header "Bulan Tahun" ===
         print(f"   Step 2: Klik Header (Mencari tombol dengan tahun '{year}')...")
         try:
@@ -516,7 +992,10 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
             if header_btn.count() > 0:
                 print(f"      -> Menemukan header: '{header_btn.text_content()}'")
                 header_btn.click()
-                time.sleep(1.0)
+                wait_until(
+                    page, "grid bulan kalender", _month_button_ready(month_short),
+                    replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT,
+                )
             else:
                 print(f"      ⚠ Tidak menemukan tombol header tahun {year}")
         except Exception:
@@ -534,7 +1013,10 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
             if month_btn.count() > 0:
                 month_btn.click()
                 print(f"      -> Berhasil klik bulan {month_short}")
-                time.sleep(1.0)
+                wait_until(
+                    page, "grid tanggal kalender", selector_state(CALENDAR_DAY_SELECTOR),
+                    replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT,
+                )
             else:
                 print(f"      ⚠ Tidak menemukan tombol bulan '{month_short}'")
         except Exception:
@@ -543,20 +1025,21 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
         # === STEP 4: Klik "Tanggal" (2x) ===
         print(f"   Step 4: Klik Tanggal '{day}' (2x)...")
         try:
-            date_btn = page.locator(f"button:text-is('{day}')").first
+            date_btn = page.locator(f"{CALENDAR_DAY_SELECTOR}:text-is('{day}')").first
             if date_btn.count() == 0:
-                 date_btn = page.locator(f"button:has-text('{day}')").first
+                 date_btn = page.locator(f"button:text-is('{day}')").first
             
             if date_btn.count() > 0:
-                date_btn.click()
+                wait_until(
+                    page, "klik pertama tanggal tercatat", _day_selected_ready(),
+                    replaces=1.0, timeout=CALENDAR_STEP_TIMEOUT, action=date_btn.click,
+                )
                 print(f"      -> Klik pertama tanggal {day}")
-                time.sleep(1.0) # Delay diperlama
                 
-                date_btn.click()
+                _click_range_end(page, date_btn)
                 print(f"      -> Klik kedua tanggal {day}")
                 
                 print(f"   ✓ Berhasil klik tanggal {day} (2x)")
-                time.sleep(1.5) # Tunggu efek UI
                 return True
             else:
                 print(f"   ✗ Gagal menemukan tombol tanggal {day}")
@@ -567,7 +1050,7 @@ def click_date_elements_rekap_penjualan(page: Page, target_date: datetime) -> bo
 
     except Exception as e:
         print(f"✗ Error set tanggal rekap (4-step): {str(e)}")
-        logger.error(f"Error click_date_elements_rekap_penjualan: {str(e)}", exc_info=True)
+        logger.error(f"Error _click_date_elements_rekap_4step: {str(e)}", exc_info=True)
         return False
 
 
@@ -600,7 +1083,7 @@ def find_and_click_element_by_text(
                         element.wait_for(state="visible", timeout=2000)
                         element.click()
                         print(f"✓ Element '{text}' berhasil diklik")
-                        time.sleep(1.0)
+                        wait_until(page, f"efek klik '{text}'", dom_quiet(), replaces=1.0)
                         return True
                     except Exception:
                         continue
@@ -625,18 +1108,15 @@ def wait_for_page_load(page: Page, timeout: int = 10000) -> bool:
     Returns:
         bool: True jika berhasil, False jika timeout
     """
-    try:
-        # Tunggu network idle
-        page.wait_for_load_state("networkidle", timeout=timeout)
+    # Loader hilang + DOM tenang (networkidle ikut menunggu beacon analytics)
+    if wait_until(
+        page, "halaman selesai loading", all_of(loader_hidden(), dom_quiet()), timeout=timeout
+    ):
         print("✓ Halaman selesai loading")
         return True
 
-    except PlaywrightTimeoutError:
-        print("Timeout menunggu halaman load")
-        return False
-    except Exception as e:
-        print(f"⚠ Error wait for page load: {str(e)}")
-        return False
+    print("Timeout menunggu halaman load")
+    return False
 
 
 def scroll_to_element(page: Page, selector: str) -> bool:
@@ -654,7 +1134,7 @@ def scroll_to_element(page: Page, selector: str) -> bool:
         element = page.locator(selector).first
         element.scroll_into_view_if_needed()
         print(f"✓ Scroll ke elemen berhasil")
-        time.sleep(0.5)
+        wait_until(page, "konten setelah scroll", dom_quiet(), replaces=0.5)
         return True
 
     except Exception as e:
@@ -664,7 +1144,8 @@ def scroll_to_element(page: Page, selector: str) -> bool:
 
 def go_back_to_home(page: Page) -> bool:
     """
-    Kembali ke halaman utama/dashboard
+    Kembali ke halaman utama/dashboard lewat route table, klik menu Home/
+    Dashboard atau browser back sebagai fallback
 
     Args:
         page (Page): Playwright Page object
@@ -672,8 +1153,13 @@ def go_back_to_home(page: Page) -> bool:
     Returns:
         bool: True jika berhasil, False jika gagal
     """
+    print("🏠 Kembali ke halaman utama...")
+    return navigate_to(page, "dashboard", _click_home_menu) is not None
+
+
+def _click_home_menu(page: Page) -> bool:
+    """Klik menu Home/Dashboard, browser back jika tidak ada (fallback navigate_to)"""
     try:
-        print("🏠 Kembali ke halaman utama...")
 
         # Coba klik menu Home/Dashboard
         home_selectors = [
@@ -696,7 +1182,6 @@ def go_back_to_home(page: Page) -> bool:
                         home_item.wait_for(state="visible", timeout=2000)
                         home_item.click()
                         print("✓ Berhasil kembali ke halaman utama")
-                        time.sleep(1.5)
                         return True
                     except Exception:
                         continue
@@ -706,10 +1191,9 @@ def go_back_to_home(page: Page) -> bool:
         # Alternatif: gunakan browser back
         print("⚠ Mencoba browser back...")
         page.go_back()
-        time.sleep(1.5)
         return True
 
     except Exception as e:
         print(f"✗ Error kembali ke home: {str(e)}")
-        logger.error(f"Error go_back_to_home: {str(e)}", exc_info=True)
+        logger.error(f"Error _click_home_menu: {str(e)}", exc_info=True)
         return False
@@ -0,0 +1,310 @@
+"""
+Route table halaman SPA portal merchant
+File ini memetakan halaman logis (dashboard, laporan-penjualan,
+rekap-penjualan, atur-produk) ke path SPA beserta predicate "halaman siap",
+sehingga navigasi bisa langsung lewat history.pushState atau goto. Klik menu
+sidebar hanya dipakai sebagai fallback, dan path hasil klik menu disimpan
+supaya run berikutnya bisa langsung.
+
+Usage:
+    method = navigate_to(page, "laporan-penjualan", menu_fallback=_click_menu)
+    # "current" | "pushstate" | "goto" | "menu" | None (gagal)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from modules.browser.strategy_stats import get_strategy_stats
+
+try:
+    from modules.core.constants import LOGIN_URL, STATS_DIR
+except ImportError:
+    LOGIN_URL = "https://subsiditepatlpg.mypertamina.id/merchant-login"
+    STATS_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "cache",
+        "stats",
+    )
+
+try:
+    from modules.core.config import (
+        ADAPTIVE_STRATEGY_ORDER,
+        NAVIGATION_METHODS,
+        NAVIGATION_READY_TIMEOUT,
+        PAGE_ROUTE_PATHS,
+    )
+except ImportError:
+    ADAPTIVE_STRATEGY_ORDER = True
+    NAVIGATION_METHODS = ("pushstate", "goto")
+    NAVIGATION_READY_TIMEOUT = 5000
+    PAGE_ROUTE_PATHS = {}
+
+try:
+    from modules.core.telemetry import get_telemetry_manager
+except ImportError:
+    get_telemetry_manager = None
+
+logger = logging.getLogger("playwright_automation")
+
+# Predicate "halaman siap" per halaman (dievaluasi di browser, true = siap)
+READY_PREDICATES = {
+    "dashboard": r"""
+        () => /Stok[\s\S]{0,40}?\d+\s*Tabung/i.test(document.body.innerText || "")
+    """,
+    "laporan-penjualan": r"""
+        () => /Total Tabung LPG 3 Kg Terjual|Atur Rentang Waktu/i.test(
+            document.body.innerText || "")
+    """,
+    "rekap-penjualan": r"""
+        () => !!document.querySelector("div.mantine-hpmcve")
+            || /(tidak|belum) ada (data|transaksi)/i.test(document.body.innerText || "")
+    """,
+    "atur-produk": r"""
+        () => Array.from(document.querySelectorAll("h1, h2, h3, .mantine-Title-root"))
+            .some((el) => /Atur Produk/i.test(el.textContent || ""))
+    """,
+}
+
+# Navigasi client-side: router SPA mendengarkan popstate
+PUSHSTATE_JS = """
+(path) => {
+    window.history.pushState({}, "", path);
+    window.dispatchEvent(new PopStateEvent("popstate", { state: {} }));
+}
+"""
+
+
+class RouteTable:
+    """
+    Path SPA per halaman: dari config (PAGE_ROUTE_PATHS) atau dipelajari dari
+    URL setelah klik menu berhasil. Path yang dipelajari disimpan ke JSON.
+    """
+
+    def __init__(self, path=None, configured=None):
+        """
+        Args:
+            path (str): File JSON path yang dipelajari. Default STATS_DIR/page_routes.json
+            configured (dict): Path dari config. Default PAGE_ROUTE_PATHS
+        """
+        self.path = path or os.path.join(STATS_DIR, "page_routes.json")
+        self.configured = dict(PAGE_ROUTE_PATHS if configured is None else configured)
+        self._lock = threading.Lock()
+        self._learned = self._load()
+        # Perubahan yang belum ditulis ke disk: {name: path, None = dilupakan}
+        self._changes = {}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, name):
+        """
+        Returns:
+            str: Path halaman (config lebih diutamakan), None jika belum diketahui
+        """
+        with self._lock:
+            return self.configured.get(name) or self._learned.get(name)
+
+    def learn(self, name, url, previous_url=None):
+        """
+        Simpan path halaman dari URL setelah klik menu berhasil. Diabaikan jika
+        URL tidak berubah (mis. tab di halaman yang sama) atau halaman login.
+
+        Returns:
+            bool: True jika path baru disimpan
+        """
+        parsed = urlparse(url)
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        if not parsed.path or parsed.path == urlparse(LOGIN_URL).path:
+            return False
+        if previous_url and urlparse(previous_url)._replace(fragment="") == parsed._replace(
+            fragment=""
+        ):
+            return False
+
+        with self._lock:
+            if self.configured.get(name) or self._learned.get(name) == path:
+                return False
+            # Path yang sama dengan halaman lain berarti halaman ini bukan route sendiri
+            if path in [p for n, p in self._learned.items() if n != name]:
+                return False
+            self._learned[name] = path
+            self._changes[name] = path
+
+        self.save()
+        logger.info(f"Route {name} dipelajari: {path}")
+        return True
+
+    def forget(self, name):
+        """Hapus path yang dipelajari (mis. setelah path tidak lagi valid)"""
+        with self._lock:
+            removed = self._learned.pop(name, None)
+            if removed:
+                self._changes[name] = None
+        if removed:
+            self.save()
+
+    def save(self):
+        """
+        Tulis path yang dipelajari ke disk secara atomic. File dibaca ulang dan
+        hanya perubahan proses ini yang diterapkan (proses shard lain bisa
+        menulis file yang sama), lalu ditulis lewat temp file per proses + os.replace.
+        """
+        with self._lock:
+            merged = self._load()
+            for name, path in self._changes.items():
+                if path is None:
+                    merged.pop(name, None)
+                else:
+                    merged[name] = path
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, indent=2)
+                os.replace(tmp_path, self.path)
+                self._learned = merged
+                self._changes = {}
+            except OSError as e:
+                logger.warning(f"Gagal menyimpan route table: {str(e)}")
+
+
+_route_table = None
+_route_table_lock = threading.Lock()
+
+
+def get_route_table():
+    """
+    Returns:
+        RouteTable: Instance bersama
+    """
+    global _route_table
+
+    with _route_table_lock:
+        if _route_table is None:
+            _route_table = RouteTable()
+        return _route_table
+
+
+def is_page_ready(page: Page, name, timeout=0):
+    """
+    Cek (atau tunggu hingga timeout) predicate halaman siap
+
+    Args:
+        page (Page): Playwright Page object
+        name (str): Nama halaman di READY_PREDICATES
+        timeout (int): 0 = cek sekali, > 0 = tunggu (milliseconds)
+
+    Returns:
+        bool: True jika halaman siap
+    """
+    predicate = READY_PREDICATES[name]
+    try:
+        if timeout <= 0:
+            return bool(page.evaluate(predicate))
+        page.wait_for_function(predicate, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+    except Exception as e:
+        logger.debug(f"Predicate {name} gagal: {e}")
+        return False
+
+
+def _on_route(page: Page, path):
+    return urlparse(page.url).path == urlparse(path).path
+
+
+def _navigate_by_url(page: Page, name, path, method, timeout):
+    """Navigasi langsung ke path lewat pushState atau goto, lalu tunggu siap"""
+    if method == "pushstate":
+        page.evaluate(PUSHSTATE_JS, path)
+    else:
+        page.goto(urljoin(page.url, path), wait_until="domcontentloaded")
+    return _on_route(page, path) and is_page_ready(page, name, timeout)
+
+
+def _record_navigation(name, method, duration):
+    """Catat metode navigasi yang dipakai ke TelemetryManager (jika tersedia)"""
+    if get_telemetry_manager is None:
+        return
+    telemetry = get_telemetry_manager()
+    telemetry.increment_counter(f"nav_{method}")
+    telemetry.increment_counter(f"nav_{name}_{method}")
+    telemetry.record_duration(f"nav_{method}", duration)
+
+
+def navigate_to(page: Page, name, menu_fallback=None, timeout=None):
+    """
+    Buka halaman logis: langsung via URL jika path diketahui (pushState/goto,
+    urutan sesuai statistik group "nav:<halaman>"), klik menu sebagai fallback
+
+    Args:
+        page (Page): Playwright Page object (sudah login)
+        name (str): "dashboard", "laporan-penjualan", "rekap-penjualan", "atur-produk"
+        menu_fallback (callable): fungsi(page) -> bool yang mengklik menu
+        timeout (int): Batas tunggu halaman siap (ms). Default NAVIGATION_READY_TIMEOUT
+
+    Returns:
+        str: Metode yang berhasil ("current", "pushstate", "goto", "menu"),
+             None jika semua gagal
+    """
+    timeout = NAVIGATION_READY_TIMEOUT if timeout is None else timeout
+    routes = get_route_table()
+    path = routes.get(name)
+    started_at = time.perf_counter()
+
+    if path and _on_route(page, path) and is_page_ready(page, name):
+        _record_navigation(name, "current", time.perf_counter() - started_at)
+        return "current"
+
+    if path:
+        stats = get_strategy_stats()
+        group = f"nav:{name}"
+        methods = list(NAVIGATION_METHODS)
+        if ADAPTIVE_STRATEGY_ORDER:
+            methods = stats.order(group, methods)
+
+        for method in methods:
+            attempt_at = time.perf_counter()
+            try:
+                success = _navigate_by_url(page, name, path, method, timeout)
+            except Exception as e:
+                logger.debug(f"Navigasi {method} ke {name} gagal: {e}")
+                success = False
+            stats.record(group, method, success, time.perf_counter() - attempt_at)
+
+            if success:
+                print(f"✓ Halaman {name} dibuka langsung ({method})")
+                _record_navigation(name, method, time.perf_counter() - started_at)
+                return method
+
+    if menu_fallback is None:
+        return None
+
+    previous_url = page.url
+    if menu_fallback(page):
+        # Path hanya dipelajari jika predicate memastikan halaman benar;
+        # klik menu yang berhasil tetap dianggap sukses seperti sebelumnya
+        if is_page_ready(page, name, timeout):
+            if path and not routes.configured.get(name):
+                # Path yang dipelajari tidak bisa dibuka langsung: pelajari ulang
+                routes.forget(name)
+            routes.learn(name, page.url, previous_url)
+        else:
+            logger.debug(f"Predicate {name} tidak terpenuhi setelah klik menu")
+        _record_navigation(name, "menu", time.perf_counter() - started_at)
+        return "menu"
+
+    _record_navigation(name, "failed", time.perf_counter() - started_at)
+    return None
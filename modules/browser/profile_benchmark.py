@@ -0,0 +1,192 @@
+"""
+Measurement mode untuk launch profile Chromium
+File ini mengukur setiap profile di LAUNCH_PROFILES: waktu launch, RSS per
+context, dan time-to-dashboard (jika kredensial diberikan), lalu menyimpan
+laporan JSON ke folder metrics.
+
+Usage:
+    python -m modules.browser.profile_benchmark --contexts 5
+    python -m modules.browser.profile_benchmark --profiles default low_memory \
+        --username 08xxxx --pin 123456 --memory-budget-mb 2048
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from modules.browser.login import login_direct
+from modules.browser.setup import LAUNCH_PROFILES, BrowserPool, psutil
+
+try:
+    from modules.core.constants import LOGIN_URL
+except ImportError:
+    LOGIN_URL = "https://subsiditepatlpg.mypertamina.id/merchant-login"
+
+logger = logging.getLogger("profile_benchmark")
+
+
+def measure_profile(profile, contexts=3, username=None, pin=None, headless=True):
+    """
+    Ukur satu launch profile
+
+    Args:
+        profile (str): Nama profile di LAUNCH_PROFILES
+        contexts (int): Jumlah context yang dibuka bersamaan
+        username (str): Username untuk ukur time-to-dashboard (opsional)
+        pin (str): PIN untuk ukur time-to-dashboard (opsional)
+        headless (bool): Mode headless
+
+    Returns:
+        dict: Hasil pengukuran profile
+    """
+    # Recycling dimatikan supaya pengukuran tidak terganggu restart
+    pool = BrowserPool(
+        headless=headless,
+        profile=profile,
+        max_contexts=0,
+        max_age_minutes=0,
+        max_rss_mb=0,
+    )
+    result = {
+        "profile": profile,
+        "contexts": contexts,
+        "launch_seconds": None,
+        "baseline_rss_mb": None,
+        "rss_after_contexts_mb": [],
+        "per_context_rss_mb": None,
+        "time_to_dashboard_seconds": None,
+        "error": None,
+    }
+
+    leases = []
+    try:
+        started_at = time.time()
+        if not pool.start():
+            result["error"] = "launch gagal"
+            return result
+        result["launch_seconds"] = round(time.time() - started_at, 3)
+        baseline = pool.get_rss_mb()
+        result["baseline_rss_mb"] = round(baseline, 1) if baseline is not None else None
+
+        for _ in range(contexts):
+            lease = pool.acquire()
+            if lease is None:
+                result["error"] = "gagal membuat context"
+                break
+            leases.append(lease)
+            lease.page.goto(LOGIN_URL, wait_until="domcontentloaded")
+            rss = pool.get_rss_mb()
+            result["rss_after_contexts_mb"].append(
+                round(rss, 1) if rss is not None else None
+            )
+
+        last_rss = result["rss_after_contexts_mb"][-1] if leases else None
+        if baseline is not None and last_rss is not None:
+            result["per_context_rss_mb"] = round((last_rss - baseline) / len(leases), 1)
+
+        if username and pin and leases:
+            login_started = time.time()
+            success, _ = login_direct(leases[0].page, username, pin)
+            if success:
+                result["time_to_dashboard_seconds"] = round(
+                    time.time() - login_started, 3
+                )
+            else:
+                result["error"] = "login gagal"
+
+    except Exception as e:
+        result["error"] = str(e)
+        logger.error(f"Error mengukur profile {profile}: {str(e)}", exc_info=True)
+
+    finally:
+        for lease in leases:
+            lease.close()
+        pool.close()
+
+    return result
+
+
+def estimate_capacity(result, memory_budget_mb):
+    """
+    Estimasi jumlah context bersamaan yang muat dalam budget memori
+
+    Returns:
+        int: Estimasi jumlah context, None jika data RSS tidak lengkap
+    """
+    baseline = result.get("baseline_rss_mb")
+    per_context = result.get("per_context_rss_mb")
+    if not memory_budget_mb or baseline is None or not per_context or per_context <= 0:
+        return None
+    return max(0, int((memory_budget_mb - baseline) // per_context))
+
+
+def run_benchmark(
+    profiles=None,
+    contexts=3,
+    username=None,
+    pin=None,
+    headless=True,
+    memory_budget_mb=None,
+    metrics_dir="metrics",
+):
+    """
+    Ukur beberapa profile dan simpan laporan JSON
+
+    Returns:
+        str: Path laporan JSON
+    """
+    if psutil is None:
+        print("⚠ psutil tidak terinstall: RSS tidak bisa diukur (hanya waktu)")
+
+    profiles = profiles or list(LAUNCH_PROFILES.keys())
+    results = []
+    for profile in profiles:
+        print(f"\n=== MENGUKUR PROFILE '{profile}' ===")
+        result = measure_profile(profile, contexts, username, pin, headless)
+        result["estimated_max_contexts"] = estimate_capacity(result, memory_budget_mb)
+        results.append(result)
+        print(
+            f"   Launch: {result['launch_seconds']}s | "
+            f"RSS/context: {result['per_context_rss_mb']} MB | "
+            f"Time-to-dashboard: {result['time_to_dashboard_seconds']}s"
+        )
+
+    os.makedirs(metrics_dir, exist_ok=True)
+    report_path = os.path.join(
+        metrics_dir,
+        f"profile_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+    )
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "contexts": contexts,
+        "memory_budget_mb": memory_budget_mb,
+        "results": results,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✓ Laporan disimpan: {report_path}")
+    return report_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur launch profile Chromium")
+    parser.add_argument("--profiles", nargs="*", choices=list(LAUNCH_PROFILES.keys()))
+    parser.add_argument("--contexts", type=int, default=3)
+    parser.add_argument("--username", default=os.environ.get("SNAPFLUX_BENCH_USERNAME"))
+    parser.add_argument("--pin", default=os.environ.get("SNAPFLUX_BENCH_PIN"))
+    parser.add_argument("--memory-budget-mb", type=float, default=None)
+    parser.add_argument("--show-browser", action="store_true")
+    args = parser.parse_args()
+
+    run_benchmark(
+        profiles=args.profiles,
+        contexts=args.contexts,
+        username=args.username,
+        pin=args.pin,
+        headless=not args.show_browser,
+        memory_budget_mb=args.memory_budget_mb,
+    )
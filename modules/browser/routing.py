@@ -0,0 +1,254 @@
+"""
+Request routing policy untuk Playwright context
+File ini mengatur request mana yang diteruskan, diblokir, atau di-stub
+berdasarkan pola URL, tipe resource, dan fase (sebelum/sesudah login).
+
+Blokir resource secara global pernah membuat login gagal (lihat
+PlaywrightBrowserManager._handle_route), jadi policy ini membedakan fase:
+aturan agresif hanya dipasang untuk fase post_login yang sudah terbukti aman.
+"""
+
+import fnmatch
+import logging
+import threading
+
+from playwright.sync_api import BrowserContext, Route
+
+logger = logging.getLogger("browser_routing")
+
+try:
+    from modules.core.config import ROUTE_POLICY_ENABLED, ROUTE_POLICY_RULES
+except ImportError:
+    ROUTE_POLICY_ENABLED = False
+    ROUTE_POLICY_RULES = []
+
+# Fase yang dikenali policy
+PHASE_PRE_LOGIN = "pre_login"
+PHASE_POST_LOGIN = "post_login"
+PHASE_ANY = "any"
+
+# Aksi yang didukung rule
+ACTION_ALLOW = "allow"
+ACTION_BLOCK = "block"
+ACTION_STUB = "stub"
+
+# Estimasi ukuran (bytes) per tipe resource jika ukuran asli belum pernah terlihat
+DEFAULT_SIZE_ESTIMATES = {
+    "image": 40 * 1024,
+    "media": 500 * 1024,
+    "font": 60 * 1024,
+    "script": 80 * 1024,
+    "stylesheet": 30 * 1024,
+    "xhr": 2 * 1024,
+    "fetch": 2 * 1024,
+}
+
+# Body pengganti untuk aksi stub per tipe resource: (content_type, body)
+STUB_RESPONSES = {
+    "script": ("application/javascript", ""),
+    "stylesheet": ("text/css", ""),
+    "xhr": ("application/json", "{}"),
+    "fetch": ("application/json", "{}"),
+}
+
+# Ukuran response yang sudah pernah terlihat (dibagi semua context/policy)
+_observed_sizes = {}
+_observed_sizes_lock = threading.Lock()
+
+
+class RouteRule:
+    """
+    Satu aturan routing. Semua kriteria yang diisi harus cocok.
+    """
+
+    def __init__(self, action, url_pattern=None, resource_types=None, phase=PHASE_ANY):
+        """
+        Args:
+            action (str): "allow", "block", atau "stub"
+            url_pattern (str): Glob URL (fnmatch), None = semua URL
+            resource_types (list): Tipe resource Playwright, None = semua tipe
+            phase (str): "pre_login", "post_login", atau "any"
+        """
+        if action not in (ACTION_ALLOW, ACTION_BLOCK, ACTION_STUB):
+            raise ValueError(f"Aksi routing tidak dikenal: {action}")
+
+        self.action = action
+        self.url_pattern = url_pattern
+        self.resource_types = set(resource_types) if resource_types else None
+        self.phase = phase
+
+    @classmethod
+    def from_dict(cls, data):
+        """Buat RouteRule dari dict config"""
+        return cls(
+            action=data["action"],
+            url_pattern=data.get("url_pattern"),
+            resource_types=data.get("resource_types"),
+            phase=data.get("phase", PHASE_ANY),
+        )
+
+    def matches(self, url, resource_type, phase):
+        """
+        Returns:
+            bool: True jika request cocok dengan rule ini
+        """
+        if self.phase != PHASE_ANY and self.phase != phase:
+            return False
+        if self.resource_types and resource_type not in self.resource_types:
+            return False
+        if self.url_pattern and not fnmatch.fnmatch(url, self.url_pattern):
+            return False
+        return True
+
+
+class RoutePolicy:
+    """
+    Policy routing per akun (satu instance per BrowserContext).
+    Rule dievaluasi berurutan, rule pertama yang cocok menang.
+    Request tanpa rule yang cocok diteruskan (allow).
+
+    Usage:
+        policy = RoutePolicy.from_config()
+        policy.attach(context)
+        ...                                   # login
+        policy.set_phase(PHASE_POST_LOGIN)
+        ...
+        stats = policy.report()
+    """
+
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules (list): List RouteRule
+        """
+        self.rules = list(rules or [])
+        self.phase = PHASE_PRE_LOGIN
+        self.requests_total = 0
+        self.requests_blocked = 0
+        self.requests_stubbed = 0
+        self.bytes_saved = 0
+        self.blocked_by_type = {}
+
+    @classmethod
+    def from_config(cls, rules=None):
+        """
+        Buat policy dari ROUTE_POLICY_RULES (list dict) di config
+
+        Returns:
+            RoutePolicy: Policy siap pakai
+        """
+        rule_dicts = ROUTE_POLICY_RULES if rules is None else rules
+        return cls([RouteRule.from_dict(rule) for rule in rule_dicts])
+
+    def set_phase(self, phase):
+        """Pindah fase (pre_login -> post_login setelah login berhasil)"""
+        self.phase = phase
+
+    def attach(self, context: BrowserContext):
+        """
+        Pasang policy ke context (berlaku untuk semua page di context)
+
+        Args:
+            context (BrowserContext): Context milik akun
+        """
+        context.route("**/*", self._handle_route)
+        context.on("response", self._observe_response)
+
+    def _match(self, url, resource_type):
+        for rule in self.rules:
+            if rule.matches(url, resource_type, self.phase):
+                return rule
+        return None
+
+    def _estimate_size(self, url, resource_type):
+        with _observed_sizes_lock:
+            size = _observed_sizes.get(url)
+        if size is None:
+            size = DEFAULT_SIZE_ESTIMATES.get(resource_type, 0)
+        return size
+
+    def _observe_response(self, response):
+        """Simpan ukuran response (content-length) untuk estimasi bytes saved"""
+        try:
+            content_length = response.headers.get("content-length")
+            if content_length:
+                with _observed_sizes_lock:
+                    _observed_sizes[response.url] = int(content_length)
+        except Exception:
+            pass
+
+    def _handle_route(self, route: Route):
+        """
+        Handler route: allow -> fallback ke handler lain / jaringan,
+        block -> abort, stub -> fulfill dengan body kosong
+        """
+        try:
+            request = route.request
+            url = request.url
+            resource_type = request.resource_type
+            self.requests_total += 1
+
+            rule = self._match(url, resource_type)
+            if rule is None or rule.action == ACTION_ALLOW:
+                route.fallback()
+                return
+
+            self.bytes_saved += self._estimate_size(url, resource_type)
+            self.blocked_by_type[resource_type] = (
+                self.blocked_by_type.get(resource_type, 0) + 1
+            )
+
+            if rule.action == ACTION_BLOCK:
+                self.requests_blocked += 1
+                route.abort("blockedbyclient")
+            else:
+                self.requests_stubbed += 1
+                content_type, body = STUB_RESPONSES.get(
+                    resource_type, ("text/plain", "")
+                )
+                route.fulfill(status=200, content_type=content_type, body=body)
+
+        except Exception:
+            # Page/context sudah ditutup, abaikan
+            try:
+                route.fallback()
+            except Exception:
+                pass
+
+    def report(self):
+        """
+        Returns:
+            dict: Statistik routing untuk akun ini
+        """
+        return {
+            "requests_total": self.requests_total,
+            "requests_blocked": self.requests_blocked,
+            "requests_stubbed": self.requests_stubbed,
+            "bytes_saved": self.bytes_saved,
+            "blocked_by_type": dict(self.blocked_by_type),
+        }
+
+    def record_to_telemetry(self, telemetry, username):
+        """
+        Kirim statistik routing akun ke TelemetryManager
+
+        Args:
+            telemetry (TelemetryManager): Instance telemetry
+            username (str): Username akun
+        """
+        stats = self.report()
+        telemetry.record_account_stats(username, "routing", stats)
+        telemetry.increment_counter("requests_blocked", self.requests_blocked)
+        telemetry.increment_counter("requests_stubbed", self.requests_stubbed)
+        telemetry.increment_counter("bytes_saved", self.bytes_saved)
+        return stats
+
+
+def create_route_policy():
+    """
+    Returns:
+        RoutePolicy: Policy dari config jika ROUTE_POLICY_ENABLED, None jika tidak
+    """
+    if not ROUTE_POLICY_ENABLED:
+        return None
+    return RoutePolicy.from_config()
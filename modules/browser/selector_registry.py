@@ -0,0 +1,216 @@
+"""
+Registry selector kandidat untuk login, navigasi dan ekstraksi
+File ini menyimpan daftar selector fallback per target (mis. "login.email")
+dan mencatat keberhasilan + latency setiap selector antar run (lewat
+StrategyStats), sehingga selector yang terbukti cepat dicoba lebih dulu dan
+selector yang tidak pernah cocok bisa dilaporkan.
+
+Usage:
+    register_selectors("nav.laporan_penjualan", LAPORAN_PENJUALAN_SELECTORS)
+    registry = get_selector_registry()
+    locator = registry.first_visible(page, "nav.laporan_penjualan")
+
+    python -m modules.browser.selector_registry      # laporan selector mati
+"""
+
+import importlib
+import json
+import threading
+import time
+
+from playwright.sync_api import Page
+
+from modules.browser.strategy_stats import get_strategy_stats
+
+try:
+    from modules.core.config import ADAPTIVE_STRATEGY_ORDER
+except ImportError:
+    ADAPTIVE_STRATEGY_ORDER = True
+
+# Minimal percobaan sebelum selector tanpa hit dianggap mati
+DEAD_SELECTOR_MIN_ATTEMPTS = 20
+
+# Module yang mendaftarkan selector (di-load untuk laporan CLI)
+SELECTOR_MODULES = ("modules.browser.login", "modules.browser.navigation")
+
+
+class SelectorRegistry:
+    """
+    Selector kandidat per target beserta urutan adaptifnya.
+    Statistik disimpan di StrategyStats dengan group "selector:<target>".
+    """
+
+    def __init__(self, stats=None, adaptive=None):
+        """
+        Args:
+            stats (StrategyStats): Default get_strategy_stats()
+            adaptive (bool): Default ADAPTIVE_STRATEGY_ORDER
+        """
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._stats = stats
+        self.adaptive = ADAPTIVE_STRATEGY_ORDER if adaptive is None else adaptive
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = get_strategy_stats()
+        return self._stats
+
+    @staticmethod
+    def _group(target):
+        return f"selector:{target}"
+
+    def register(self, target, selectors):
+        """
+        Daftarkan selector kandidat untuk target (urutan = prioritas awal)
+
+        Returns:
+            str: Nama target
+        """
+        with self._lock:
+            self._targets[target] = list(selectors)
+        return target
+
+    def candidates(self, target):
+        """
+        Returns:
+            list: Selector target sesuai urutan percobaan saat ini
+        """
+        with self._lock:
+            selectors = list(self._targets[target])
+        if not self.adaptive:
+            return selectors
+        return self.stats.order(self._group(target), selectors)
+
+    def record(self, target, selector, success, duration):
+        """Catat hasil satu percobaan selector"""
+        self.stats.record(self._group(target), selector, success, duration)
+
+    def first_visible(self, page: Page, target, timeout=2000):
+        """
+        Coba selector satu per satu (count lalu wait visible) sesuai urutan
+        adaptif dan catat hasil setiap percobaan
+
+        Args:
+            page (Page): Playwright Page object
+            target (str): Nama target terdaftar
+            timeout (int): Timeout wait visible per selector (ms)
+
+        Returns:
+            Locator: Locator pertama yang visible, None jika tidak ada
+        """
+        for selector in self.candidates(target):
+            started_at = time.perf_counter()
+            try:
+                locator = page.locator(selector).first
+                if locator.count() > 0:
+                    locator.wait_for(state="visible", timeout=timeout)
+                    self.record(target, selector, True, time.perf_counter() - started_at)
+                    return locator
+            except Exception:
+                pass
+            self.record(target, selector, False, time.perf_counter() - started_at)
+        return None
+
+    def record_match(self, page: Page, target, duration):
+        """
+        Catat selector mana yang cocok setelah locator gabungan (locator.or_)
+        berhasil menunggu elemen. Berhenti di selector visible pertama,
+        biasanya selector teratas jadi cukup satu cek.
+
+        Args:
+            page (Page): Playwright Page object
+            target (str): Nama target terdaftar
+            duration (float): Lama wait locator gabungan (detik)
+
+        Returns:
+            str: Selector yang cocok, None jika tidak bisa ditentukan
+        """
+        for selector in self.candidates(target):
+            try:
+                visible = page.locator(selector).first.is_visible()
+            except Exception:
+                visible = False
+            self.record(target, selector, visible, duration if visible else 0.0)
+            if visible:
+                return selector
+        return None
+
+    def dead_selectors(self, min_attempts=DEAD_SELECTOR_MIN_ATTEMPTS):
+        """
+        Returns:
+            list: [{target, selector, attempts}] selector yang sudah dicoba
+                  minimal min_attempts kali tanpa pernah cocok
+        """
+        with self._lock:
+            targets = {name: list(selectors) for name, selectors in self._targets.items()}
+
+        dead = []
+        for target, selectors in targets.items():
+            for selector in selectors:
+                entry = self.stats.get(self._group(target), selector)
+                attempts = entry["hits"] + entry["misses"]
+                if entry["hits"] == 0 and attempts >= min_attempts:
+                    dead.append(
+                        {"target": target, "selector": selector, "attempts": attempts}
+                    )
+        return dead
+
+    def report(self):
+        """
+        Returns:
+            dict: {target: [{selector, hits, misses, hit_rate, avg_ms}]} sesuai
+                  urutan percobaan saat ini
+        """
+        with self._lock:
+            targets = list(self._targets)
+
+        report = {}
+        for target in targets:
+            group_stats = self.stats.report(self._group(target)).get(
+                self._group(target), {}
+            )
+            report[target] = [
+                dict({"selector": selector}, **group_stats.get(selector, {}))
+                for selector in self.candidates(target)
+            ]
+        return report
+
+
+_selector_registry = SelectorRegistry()
+
+
+def get_selector_registry():
+    """
+    Returns:
+        SelectorRegistry: Registry bersama
+    """
+    return _selector_registry
+
+
+def register_selectors(target, selectors):
+    """
+    Daftarkan selector ke registry bersama
+
+    Returns:
+        str: Nama target (dipakai sebagai key saat mencari elemen)
+    """
+    return _selector_registry.register(target, selectors)
+
+
+if __name__ == "__main__":
+    # Load module yang mendaftarkan selector (efek samping import)
+    for module_name in SELECTOR_MODULES:
+        importlib.import_module(module_name)
+
+    registry = get_selector_registry()
+    print(json.dumps(registry.report(), indent=2, ensure_ascii=False))
+
+    dead = registry.dead_selectors()
+    if dead:
+        print(f"\n⚠ {len(dead)} selector tidak pernah cocok:")
+        for item in dead:
+            print(f"   [{item['target']}] {item['selector']} ({item['attempts']}x dicoba)")
+    else:
+        print("\n✓ Tidak ada selector mati")
@@ -0,0 +1,233 @@
+"""
+Session cache untuk login Playwright
+File ini menyimpan storage_state (cookies + localStorage) per username ke disk
+supaya context baru bisa langsung dipulihkan tanpa login ulang.
+
+File disimpan dengan nama hash username (tidak menyimpan username/PIN dalam
+nama file), di folder dengan permission 0700 dan file 0600.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from playwright.sync_api import BrowserContext
+
+logger = logging.getLogger("session_cache")
+
+try:
+    from modules.core.constants import SESSIONS_DIR
+except ImportError:
+    SESSIONS_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "sessions",
+    )
+
+try:
+    from modules.core.config import SESSION_CACHE_ENABLED, SESSION_TTL_HOURS
+except ImportError:
+    SESSION_CACHE_ENABLED = True
+    SESSION_TTL_HOURS = 6
+
+
+def _jwt_expiry(value):
+    """
+    Returns:
+        float: Klaim "exp" jika value berupa JWT, None jika bukan
+    """
+    parts = value.split(".") if isinstance(value, str) else []
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+    except (ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def storage_state_expiry(state):
+    """
+    Waktu kedaluwarsa terakhir yang tercatat di storage_state: klaim "exp"
+    token JWT di localStorage (langsung atau satu level di dalam JSON) dan
+    "expires" cookie persisten. Cookie session (expires -1) diabaikan.
+
+    Returns:
+        float: Epoch seconds, None jika tidak ada informasi kedaluwarsa
+    """
+    expiries = [
+        cookie["expires"]
+        for cookie in state.get("cookies", [])
+        if isinstance(cookie.get("expires"), (int, float)) and cookie["expires"] > 0
+    ]
+    for origin in state.get("origins", []):
+        for item in origin.get("localStorage", []):
+            values = [item.get("value")]
+            try:
+                parsed = json.loads(item.get("value") or "")
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict):
+                values.extend(parsed.values())
+            expiries.extend(exp for exp in map(_jwt_expiry, values) if exp is not None)
+    return max(expiries) if expiries else None
+
+
+class SessionCache:
+    """
+    Cache storage_state per username dengan eviction berbasis TTL
+
+    Usage:
+        cache = SessionCache()
+        state = cache.load(username)          # None jika tidak ada / expired
+        context = browser.new_context(storage_state=state)
+        ...
+        cache.save(username, context)         # setelah login berhasil
+    """
+
+    def __init__(self, cache_dir=None, ttl_hours=None):
+        """
+        Args:
+            cache_dir (str): Folder penyimpanan session. Default SESSIONS_DIR
+            ttl_hours (float): Umur maksimal session. Default SESSION_TTL_HOURS
+        """
+        self.cache_dir = cache_dir or SESSIONS_DIR
+        self.ttl_seconds = (
+            ttl_hours if ttl_hours is not None else SESSION_TTL_HOURS
+        ) * 3600
+
+    def _ensure_dir(self):
+        """Buat folder cache dengan permission 0700 jika belum ada"""
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        try:
+            os.chmod(self.cache_dir, 0o700)
+        except OSError:
+            # Windows tidak mendukung chmod penuh, abaikan
+            pass
+
+    def _path(self, username):
+        """Path file session untuk username (nama file = sha256 username)"""
+        digest = hashlib.sha256(username.strip().lower().encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _is_expired(self, saved_at):
+        return (time.time() - saved_at) > self.ttl_seconds
+
+    def load(self, username):
+        """
+        Ambil storage_state tersimpan untuk username
+
+        Args:
+            username (str): Username akun
+
+        Returns:
+            dict: storage_state untuk browser.new_context, None jika tidak ada/expired
+        """
+        path = self._path(username)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+
+            if self._is_expired(entry.get("saved_at", 0)):
+                self.invalidate(username)
+                return None
+
+            # Token/cookie sudah kedaluwarsa: tidak perlu dicek ke portal
+            state = entry.get("storage_state") or {}
+            expiry = storage_state_expiry(state)
+            if expiry is not None and expiry <= time.time():
+                logger.info(f"Token session {username} sudah kedaluwarsa, login ulang")
+                self.invalidate(username)
+                return None
+
+            return entry.get("storage_state")
+
+        except Exception as e:
+            logger.warning(f"Session cache rusak untuk {username}: {str(e)}")
+            self.invalidate(username)
+            return None
+
+    def save(self, username, context: BrowserContext):
+        """
+        Simpan storage_state context untuk username (atomic write, permission 0600)
+
+        Args:
+            username (str): Username akun
+            context (BrowserContext): Context yang sudah login
+
+        Returns:
+            bool: True jika berhasil disimpan
+        """
+        try:
+            self._ensure_dir()
+            entry = {"saved_at": time.time(), "storage_state": context.storage_state()}
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                os.chmod(tmp_path, 0o600)
+            except OSError:
+                pass
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(username))
+            return True
+
+        except Exception as e:
+            logger.warning(f"Gagal menyimpan session {username}: {str(e)}")
+            return False
+
+    def invalidate(self, username):
+        """Hapus session tersimpan untuk username"""
+        try:
+            os.remove(self._path(username))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Gagal menghapus session {username}: {str(e)}")
+
+    def evict_expired(self):
+        """
+        Hapus semua file session yang sudah melewati TTL
+
+        Returns:
+            int: Jumlah file yang dihapus
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    saved_at = json.load(f).get("saved_at", 0)
+            except Exception:
+                saved_at = 0
+
+            if self._is_expired(saved_at):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+
+        return removed
+
+
+def get_session_cache():
+    """
+    Returns:
+        SessionCache: Instance baru jika session cache diaktifkan, None jika tidak
+    """
+    if not SESSION_CACHE_ENABLED:
+        return None
+    return SessionCache()
@@ -3,15 +3,23 @@ Setup dan konfigurasi browser Playwright untuk automation
 File ini mengatur Playwright Browser dengan optimasi performa maksimal
 """
 
+import hashlib
+import json
 import logging
 import os
+import re
 import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
 
 from playwright.sync_api import (
     Browser,
     BrowserContext,
     Page,
     Playwright,
+    Route,
     sync_playwright,
 )
 
@@ -42,9 +50,210 @@ except ImportError:
         return True
 
 
+try:
+    from modules.core.telemetry import get_telemetry_manager
+except ImportError:
+    get_telemetry_manager = None
+
+try:
+    from modules.core.config import (
+        ASSET_CACHE_ENABLED,
+        ASSET_CACHE_HOSTS,
+        ASSET_CACHE_MAX_MB,
+    )
+except ImportError:
+    ASSET_CACHE_ENABLED = False
+    ASSET_CACHE_HOSTS = ["subsiditepatlpg.mypertamina.id"]
+    ASSET_CACHE_MAX_MB = 200
+
+try:
+    from modules.core.config import BROWSER_LAUNCH_PROFILE
+except ImportError:
+    BROWSER_LAUNCH_PROFILE = "default"
+
+try:
+    from modules.core.config import (
+        BROWSER_RECYCLE_MAX_AGE_MINUTES,
+        BROWSER_RECYCLE_MAX_CONTEXTS,
+        BROWSER_RECYCLE_MAX_RSS_MB,
+    )
+except ImportError:
+    BROWSER_RECYCLE_MAX_CONTEXTS = 0
+    BROWSER_RECYCLE_MAX_AGE_MINUTES = 0
+    BROWSER_RECYCLE_MAX_RSS_MB = 0
+
+# psutil opsional: tanpa psutil, recycle berbasis RSS dinonaktifkan
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from modules.core.constants import ASSET_CACHE_DIR
+except ImportError:
+    ASSET_CACHE_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "cache",
+        "assets",
+    )
+
+from modules.browser.session_cache import get_session_cache
+
+# Tipe resource yang dianggap aset statis
+ASSET_CACHE_RESOURCE_TYPES = {"script", "stylesheet", "font", "image"}
+
+
 # Konfigurasi path Chrome binary (fallback)
 CHROME_BINARY = r"D:\edi\Programing\PlayWRight\chrome\Chromium\bin\chrome.exe"
 
+# Argumen dasar Chromium yang dipakai semua profile.
+# Flag yang saling menimpa digabung: --disable-features hanya boleh muncul sekali
+# (Chromium hanya memakai yang terakhir) dan batas heap V8 harus lewat --js-flags
+# (--max_old_space_size adalah flag Node, diabaikan oleh Chromium).
+BASE_BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-plugins",
+    "--disable-web-security",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-field-trial-config",
+    "--disable-ipc-flooding-protection",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--hide-scrollbars",
+    "--mute-audio",
+    "--disable-gpu-sandbox",
+    "--disable-software-rasterizer",
+    "--disable-gpu-process-crash-limit",
+    "--disable-gpu-memory-buffer-video-frames",
+    "--disable-gpu-rasterization",
+    "--disable-zero-copy",
+    "--disable-accelerated-2d-canvas",
+    "--disable-accelerated-jpeg-decoding",
+    "--disable-accelerated-mjpeg-decode",
+    "--disable-accelerated-video-decode",
+    "--disable-webgl",
+    "--disable-webgl2",
+    "--disable-3d-apis",
+    "--disable-client-side-phishing-detection",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-domain-reliability",
+    "--disable-hang-monitor",
+    "--disable-prompt-on-repost",
+    "--disable-web-resources",
+    "--disable-logging",
+    "--disable-permissions-api",
+    "--window-size=1366,768",
+]
+
+# Profile launch bernama. Setiap profile menambahkan flag, daftar fitur yang
+# dimatikan (digabung ke satu --disable-features) dan flag V8 (satu --js-flags).
+LAUNCH_PROFILES = {
+    # Setara konfigurasi lama (tanpa flag yang konflik/diabaikan)
+    "default": {
+        "args": ["--memory-pressure-off", "--aggressive-cache-discard"],
+        "disable_features": ["VizDisplayCompositor", "TranslateUI"],
+        "js_flags": ["--max-old-space-size=1024"],
+    },
+    # Muat sebanyak mungkin context di VM kecil
+    "low_memory": {
+        "args": [
+            "--aggressive-cache-discard",
+            "--process-per-site",
+            "--renderer-process-limit=4",
+            "--disk-cache-size=1",
+            "--media-cache-size=1",
+            # Site isolation mati (satu renderer bisa dipakai lintas site)
+            "--disable-site-isolation-trials",
+        ],
+        "disable_features": [
+            "VizDisplayCompositor",
+            "TranslateUI",
+            "SitePerProcess",
+            "IsolateOrigins",
+            "BackForwardCache",
+            "OptimizationHints",
+        ],
+        "js_flags": ["--max-old-space-size=256", "--lite-mode"],
+    },
+    # Prioritas kecepatan, memori lebih longgar
+    "max_throughput": {
+        "args": ["--memory-pressure-off"],
+        "disable_features": ["VizDisplayCompositor", "TranslateUI"],
+        "js_flags": ["--max-old-space-size=2048"],
+    },
+}
+
+
+def get_launch_args(profile=None):
+    """
+    Susun argumen Chromium untuk profile launch
+
+    Args:
+        profile (str): Nama profile di LAUNCH_PROFILES. Default BROWSER_LAUNCH_PROFILE
+
+    Returns:
+        list: Argumen Chromium tanpa flag duplikat/konflik
+    """
+    profile = profile or BROWSER_LAUNCH_PROFILE
+    if profile not in LAUNCH_PROFILES:
+        logger.warning(f"Launch profile '{profile}' tidak dikenal, pakai 'default'")
+        profile = "default"
+
+    spec = LAUNCH_PROFILES[profile]
+    args = list(BASE_BROWSER_ARGS) + list(spec.get("args", []))
+    if spec.get("disable_features"):
+        args.append("--disable-features=" + ",".join(spec["disable_features"]))
+    if spec.get("js_flags"):
+        args.append("--js-flags=" + " ".join(spec["js_flags"]))
+    return args
+
+
+# Argumen profile aktif (kompatibilitas untuk kode yang memakai BROWSER_ARGS)
+BROWSER_ARGS = get_launch_args()
+
+
+# Konfigurasi context (viewport, user agent) yang dipakai semua akun
+DEFAULT_VIEWPORT = {"width": 1366, "height": 768}
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Script untuk hide automation
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+
+    // Override the permissions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+
+    // Chrome runtime
+    window.chrome = {
+        runtime: {}
+    };
+
+    // Plugins
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+
+    // Languages
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en', 'id-ID']
+    });
+"""
+
 
 # Docker environment detection
 def is_docker_environment():
@@ -105,6 +314,429 @@ def get_chrome_binary():
     return CHROME_BINARY
 
 
+def _resolve_executable_path():
+    """
+    Tentukan executable path Chrome yang akan digunakan
+
+    Returns:
+        str or None: Path Chrome binary, atau None untuk default Chromium
+    """
+    chrome_binary_path = get_chrome_binary()
+
+    if chrome_binary_path and os.path.exists(chrome_binary_path):
+        print(f"✓ Menggunakan Chrome binary: {chrome_binary_path}")
+        return chrome_binary_path
+
+    print("⚠ Chrome binary tidak ditemukan, menggunakan default Chromium")
+    return None
+
+
+def _launch_chromium(
+    playwright: Playwright, headless: bool, profile=None, extra_args=None
+) -> Browser:
+    """
+    Launch Chromium dengan argumen optimasi performa
+
+    Args:
+        playwright (Playwright): Playwright instance yang sudah di-start
+        headless (bool): Mode headless
+        profile (str): Nama launch profile. Default BROWSER_LAUNCH_PROFILE
+        extra_args (list): Argumen tambahan (mis. penanda proses BrowserPool)
+
+    Returns:
+        Browser: Browser instance
+    """
+    executable_path = _resolve_executable_path()
+    launch_args = get_launch_args(profile) + list(extra_args or [])
+
+    # Launch browser dengan Chromium
+    if executable_path:
+        return playwright.chromium.launch(
+            headless=headless,
+            args=launch_args,
+            executable_path=executable_path,
+            timeout=30000,  # 30 detik timeout
+        )
+
+    return playwright.chromium.launch(
+        headless=headless, args=launch_args, timeout=30000
+    )
+
+
+def _chromium_processes():
+    """
+    Returns:
+        dict: {pid: psutil.Process} semua proses Chromium turunan proses ini
+    """
+    if psutil is None:
+        return {}
+    processes = {}
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                name = child.name().lower()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            if "chrom" in name or "headless_shell" in name:
+                processes[child.pid] = child
+    except psutil.Error:
+        pass
+    return processes
+
+
+def _find_browser_root_pids(marker):
+    """
+    Cari proses browser utama dari cmdline-nya. Chromium tidak meneruskan
+    switch yang tidak dikenal ke proses anak (renderer, GPU), jadi penanda
+    unik per launch hanya ada di proses browser milik pool ini.
+
+    Args:
+        marker (str): Switch penanda yang diberikan saat launch
+
+    Returns:
+        list: PID proses browser utama, kosong jika psutil tidak tersedia
+    """
+    matched = {}
+    for pid, process in _chromium_processes().items():
+        try:
+            if marker in process.cmdline():
+                matched[pid] = process
+        except psutil.Error:
+            continue
+
+    root_pids = []
+    for pid, process in matched.items():
+        try:
+            if process.ppid() not in matched:
+                root_pids.append(pid)
+        except psutil.Error:
+            continue
+    return root_pids
+
+
+def _process_tree_rss_mb(root_pids):
+    """
+    Hitung total RSS (MB) dari proses root beserta semua turunannya
+
+    Args:
+        root_pids (list): PID proses browser utama
+
+    Returns:
+        float: Total RSS dalam MB, None jika psutil tidak tersedia
+    """
+    if psutil is None or not root_pids:
+        return None
+
+    total = 0
+    for pid in root_pids:
+        try:
+            root = psutil.Process(pid)
+            for process in [root] + root.children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+def _new_configured_context(browser: Browser, storage_state=None) -> BrowserContext:
+    """
+    Buat browser context baru (fresh, terisolasi) dengan viewport, user agent,
+    timeout dan init script standar
+
+    Args:
+        browser (Browser): Browser instance
+        storage_state (dict): Session tersimpan (cookies + localStorage), opsional
+
+    Returns:
+        BrowserContext: Context yang sudah dikonfigurasi
+    """
+    context = browser.new_context(
+        viewport=DEFAULT_VIEWPORT,
+        user_agent=DEFAULT_USER_AGENT,
+        ignore_https_errors=True,
+        java_script_enabled=True,
+        bypass_csp=True,
+        permissions=[],
+        storage_state=storage_state,
+    )
+
+    # Set default timeouts (dari config)
+    context.set_default_timeout(DEFAULT_TIMEOUT)
+    context.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
+
+    # Inject script untuk hide automation (berlaku untuk semua page di context)
+    context.add_init_script(STEALTH_INIT_SCRIPT)
+
+    return context
+
+
+class StaticAssetCache:
+    """
+    Cache on-disk untuk aset statis (JS/CSS/font/gambar) situs merchant,
+    disajikan lewat route.fulfill supaya context baru tidak download ulang.
+
+    - Key: URL. Validator (ETag / Last-Modified) disimpan bersama entry.
+    - Aset "immutable" / max-age yang masih berlaku langsung disajikan dari disk.
+    - Aset yang sudah stale divalidasi ulang dengan request kondisional
+      (If-None-Match / If-Modified-Since); 304 -> body dari disk.
+    - Total ukuran dibatasi, entry paling lama tidak dipakai dibuang (LRU).
+    - Hit/miss/revalidate dicatat ke TelemetryManager sebagai counter.
+
+    Satu instance dipakai bersama oleh semua context (thread-safe). Folder
+    cache juga dibagi antar proses (sharded runner): file ditulis lewat temp
+    file per proses + os.replace, dan index di disk di-merge ulang sebelum
+    ditulis supaya entry dari proses lain tidak tertimpa.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None, hosts=None):
+        """
+        Args:
+            cache_dir (str): Folder cache. Default ASSET_CACHE_DIR
+            max_bytes (int): Batas total ukuran cache. Default ASSET_CACHE_MAX_MB
+            hosts (list): Host yang asetnya boleh di-cache. Default ASSET_CACHE_HOSTS
+        """
+        self.cache_dir = cache_dir or ASSET_CACHE_DIR
+        self.max_bytes = max_bytes or ASSET_CACHE_MAX_MB * 1024 * 1024
+        self.hosts = set(hosts or ASSET_CACHE_HOSTS)
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.telemetry = get_telemetry_manager() if get_telemetry_manager else None
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        # Entry yang dibuang proses ini sejak index terakhir ditulis: {url: stored_at}
+        self._removed = {}
+
+    def _tmp_path(self, path):
+        """Temp file per proses, supaya proses lain tidak menulis file yang sama"""
+        return f"{path}.{os.getpid()}.tmp"
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _merge_index(self, disk_index):
+        """
+        Gabungkan index di disk (mungkin sudah ditulis proses lain) dengan
+        index proses ini. Per URL entry yang stored_at-nya lebih baru menang;
+        entry yang dibuang proses ini ikut dibuang kecuali proses lain sudah
+        menyimpan versi yang lebih baru.
+        """
+        merged = dict(disk_index)
+        for url, stored_at in self._removed.items():
+            entry = merged.get(url)
+            if entry and entry.get("stored_at", 0) <= stored_at:
+                del merged[url]
+
+        for url, entry in self._index.items():
+            other = merged.get(url)
+            if other is None or entry["stored_at"] > other.get("stored_at", 0):
+                merged[url] = entry
+            else:
+                merged[url] = dict(
+                    other, last_access=max(entry["last_access"], other.get("last_access", 0))
+                )
+        return merged
+
+    def _save_index(self):
+        """
+        Merge index di disk, jalankan LRU pada hasil merge, lalu tulis secara
+        atomic (dipanggil dengan lock dipegang)
+        """
+        self._index = self._merge_index(self._load_index())
+        self._evict()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._tmp_path(self.index_path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self.index_path)
+            self._removed.clear()
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan index asset cache: {str(e)}")
+
+    def _count(self, counter_name):
+        if self.telemetry:
+            self.telemetry.increment_counter(counter_name)
+
+    def attach(self, context: BrowserContext):
+        """
+        Pasang cache ke context. Daftarkan SEBELUM RoutePolicy supaya policy
+        (handler terakhir didaftarkan = dijalankan pertama) tetap memutuskan
+        blokir/stub lebih dulu dan cache hanya melihat request yang di-allow.
+        """
+        context.route("**/*", self._handle_route)
+
+    def _is_cacheable_request(self, request):
+        if request.method != "GET":
+            return False
+        if request.resource_type not in ASSET_CACHE_RESOURCE_TYPES:
+            return False
+        return urlparse(request.url).hostname in self.hosts
+
+    @staticmethod
+    def _cache_control(headers):
+        return (headers.get("cache-control") or "").lower()
+
+    def _is_fresh(self, entry):
+        cache_control = entry.get("cache_control", "")
+        if "immutable" in cache_control:
+            return True
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match and "no-cache" not in cache_control:
+            return time.time() - entry["stored_at"] < int(match.group(1))
+        return False
+
+    def _lookup(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+            if entry and not os.path.exists(entry["path"]):
+                # File dibuang (mis. LRU proses lain)
+                self._index.pop(url, None)
+                self._removed[url] = entry["stored_at"]
+                return None
+            if entry:
+                entry["last_access"] = time.time()
+            return dict(entry) if entry else None
+
+    def _store(self, url, response, body):
+        headers = response.headers
+        cache_control = self._cache_control(headers)
+        if response.status != 200 or "no-store" in cache_control:
+            return
+        if not (headers.get("etag") or headers.get("last-modified")) and (
+            "max-age" not in cache_control and "immutable" not in cache_control
+        ):
+            # Tanpa validator dan tanpa umur cache -> tidak aman disimpan
+            return
+        if len(body) > self.max_bytes:
+            return
+
+        path = os.path.join(
+            self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()
+        )
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._tmp_path(path)
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Gagal menulis asset cache: {str(e)}")
+            return
+
+        with self._lock:
+            self._index[url] = {
+                "path": path,
+                "size": len(body),
+                "content_type": headers.get("content-type", ""),
+                "cache_control": cache_control,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "stored_at": time.time(),
+                "last_access": time.time(),
+            }
+            self._save_index()
+
+    def _evict(self):
+        """Buang entry LRU sampai total ukuran di bawah batas (lock dipegang)"""
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        for url, entry in sorted(
+            self._index.items(), key=lambda item: item[1]["last_access"]
+        ):
+            try:
+                os.remove(entry["path"])
+            except OSError:
+                pass
+            del self._index[url]
+            self._removed[url] = entry["stored_at"]
+            total -= entry["size"]
+            self._count("asset_cache_evictions")
+            if total <= self.max_bytes:
+                break
+
+    def _fulfill_from_cache(self, route: Route, entry):
+        headers = {"content-type": entry["content_type"]} if entry["content_type"] else {}
+        if entry.get("etag"):
+            headers["etag"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["last-modified"] = entry["last_modified"]
+        route.fulfill(status=200, path=entry["path"], headers=headers)
+
+    def _handle_route(self, route: Route):
+        """Handler route: sajikan dari cache, validasi ulang, atau fetch + simpan"""
+        try:
+            request = route.request
+            if not self._is_cacheable_request(request):
+                route.fallback()
+                return
+
+            url = request.url
+            entry = self._lookup(url)
+
+            if entry and self._is_fresh(entry):
+                self._count("asset_cache_hits")
+                self._fulfill_from_cache(route, entry)
+                return
+
+            if entry and (entry.get("etag") or entry.get("last_modified")):
+                conditional = dict(request.headers)
+                if entry.get("etag"):
+                    conditional["if-none-match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    conditional["if-modified-since"] = entry["last_modified"]
+                response = route.fetch(headers=conditional)
+                if response.status == 304:
+                    self._count("asset_cache_revalidated")
+                    self._fulfill_from_cache(route, entry)
+                    return
+            else:
+                response = route.fetch()
+
+            self._count("asset_cache_misses")
+            body = response.body()
+            self._store(url, response, body)
+            route.fulfill(response=response, body=body)
+
+        except Exception:
+            # Page/context sudah ditutup atau fetch gagal -> biarkan jaringan
+            try:
+                route.fallback()
+            except Exception:
+                pass
+
+    def flush(self):
+        """Simpan index (last_access terbaru) ke disk"""
+        with self._lock:
+            self._save_index()
+
+
+_static_asset_cache = None
+_static_asset_cache_lock = threading.Lock()
+
+
+def get_static_asset_cache():
+    """
+    Returns:
+        StaticAssetCache: Instance bersama jika ASSET_CACHE_ENABLED, None jika tidak
+    """
+    global _static_asset_cache
+
+    if not ASSET_CACHE_ENABLED:
+        return None
+    with _static_asset_cache_lock:
+        if _static_asset_cache is None:
+            _static_asset_cache = StaticAssetCache()
+        return _static_asset_cache
+
+
 class PlaywrightBrowserManager:
     """
     Manager class untuk mengelola Playwright browser instance
@@ -137,8 +769,8 @@ class PlaywrightBrowserManager:
         Args:
             headless (bool): Jika True, browser akan berjalan tanpa GUI untuk performa lebih cepat
                            Jika None, akan menggunakan config default
-            username (str): Tidak digunakan lagi (legacy parameter)
-            use_session (bool): Tidak digunakan lagi (legacy parameter)
+            username (str): Username akun, dipakai untuk memulihkan session tersimpan
+            use_session (bool): Jika True, restore storage_state dari SessionCache
 
         Returns:
             Page: Object Page Playwright yang sudah dikonfigurasi
@@ -165,93 +797,24 @@ class PlaywrightBrowserManager:
             # Inisialisasi Playwright
             self.playwright = sync_playwright().start()
 
-            # Argumen untuk browser optimasi performa
-            browser_args = [
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-gpu",
-                "--disable-extensions",
-                "--disable-plugins",
-                "--disable-web-security",
-                "--disable-features=VizDisplayCompositor",
-                "--disable-background-timer-throttling",
-                "--disable-backgrounding-occluded-windows",
-                "--disable-renderer-backgrounding",
-                "--disable-field-trial-config",
-                "--disable-ipc-flooding-protection",
-                "--disable-blink-features=AutomationControlled",
-                "--disable-background-networking",
-                "--disable-default-apps",
-                "--disable-sync",
-                "--disable-translate",
-                "--hide-scrollbars",
-                "--mute-audio",
-                "--disable-java",
-                "--disable-flash",
-                "--aggressive-cache-discard",
-                "--disable-gpu-sandbox",
-                "--disable-software-rasterizer",
-                "--disable-gpu-process-crash-limit",
-                "--disable-gpu-memory-buffer-video-frames",
-                "--disable-gpu-rasterization",
-                "--disable-zero-copy",
-                "--disable-accelerated-2d-canvas",
-                "--disable-accelerated-jpeg-decoding",
-                "--disable-accelerated-mjpeg-decode",
-                "--disable-accelerated-video-decode",
-                "--disable-webgl",
-                "--disable-webgl2",
-                "--disable-3d-apis",
-                "--disable-client-side-phishing-detection",
-                "--disable-component-extensions-with-background-pages",
-                "--disable-domain-reliability",
-                "--disable-features=TranslateUI",
-                "--disable-hang-monitor",
-                "--disable-prompt-on-repost",
-                "--disable-web-resources",
-                "--disable-logging",
-                "--disable-permissions-api",
-                "--memory-pressure-off",
-                "--max_old_space_size=1024",
-                "--window-size=1366,768",
-            ]
-
-            # Tentukan executable path
-            chrome_binary_path = get_chrome_binary()
-            executable_path = None
-
-            if os.path.exists(chrome_binary_path):
-                executable_path = chrome_binary_path
-                print(f"✓ Menggunakan Chrome binary: {chrome_binary_path}")
-            else:
-                print("⚠ Chrome binary tidak ditemukan, menggunakan default Chromium")
-
             # Launch browser dengan Chromium
-            if executable_path:
-                self.browser = self.playwright.chromium.launch(
-                    headless=headless,
-                    args=browser_args,
-                    executable_path=executable_path,
-                    timeout=30000,  # 30 detik timeout
-                )
-            else:
-                self.browser = self.playwright.chromium.launch(
-                    headless=headless, args=browser_args, timeout=30000
-                )
+            self.browser = _launch_chromium(self.playwright, headless)
 
-            # Buat browser context dengan konfigurasi (Fresh context)
-            self.context = self.browser.new_context(
-                viewport={"width": 1366, "height": 768},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                ignore_https_errors=True,
-                java_script_enabled=True,
-                bypass_csp=True,
-                permissions=[],
-            )
+            # Restore session tersimpan jika diminta (None = fresh context)
+            storage_state = None
+            if use_session and username:
+                session_cache = get_session_cache()
+                storage_state = session_cache.load(username) if session_cache else None
+                if storage_state:
+                    print(f"✓ Session tersimpan ditemukan untuk {username}")
 
-            # Set default timeouts (dari config)
-            self.context.set_default_timeout(DEFAULT_TIMEOUT)
-            self.context.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
+            # Buat browser context dengan konfigurasi
+            self.context = _new_configured_context(
+                self.browser, storage_state=storage_state
+            )
+            asset_cache = get_static_asset_cache()
+            if asset_cache:
+                asset_cache.attach(self.context)
 
             # Buat page baru
             self.page = self.context.new_page()
@@ -259,36 +822,7 @@ class PlaywrightBrowserManager:
             # OPTIMIZATION: Block heavy resources (Images, Fonts, Media)
             # DISABLED TEMPORARILY: Menyebabkan gagal login (terdeteksi bot/missing assets)
             # self.page.route("**/*", lambda route: self._handle_route(route))
-
-            # Inject script untuk hide automation
-            self.page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-
-                // Override the permissions
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: Notification.permission }) :
-                        originalQuery(parameters)
-                );
-
-                // Chrome runtime
-                window.chrome = {
-                    runtime: {}
-                };
-
-                // Plugins
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-
-                // Languages
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en', 'id-ID']
-                });
-            """)
+            # Gunakan RoutePolicy (modules/browser/routing.py) untuk blokir per fase login
 
             print(
                 "✓ Playwright Browser berhasil di-setup dengan optimasi performa maksimal!"
@@ -331,6 +865,327 @@ class PlaywrightBrowserManager:
             logger.warning(f"Warning saat menutup browser: {str(e)}")
 
 
+class PooledContext:
+    """
+    Satu BrowserContext terisolasi milik satu akun, dipinjam dari BrowserPool.
+    Interface-nya sengaja mirip PlaywrightBrowserManager (atribut page/context
+    dan method close) supaya pemanggil tidak perlu tahu browser-nya di-share.
+    """
+
+    def __init__(self, pool, context: BrowserContext, page: Page, browser=None):
+        self.pool = pool
+        self.context: BrowserContext = context
+        self.page: Page = page
+        self.browser: Browser = browser
+
+    def close(self):
+        """
+        Kembalikan context ke pool (context ditutup, browser tetap hidup)
+        """
+        if self.context is None:
+            return
+        self.pool.release(self)
+
+
+class BrowserPool:
+    """
+    Pool yang menjaga satu Playwright driver dan satu Chromium tetap hidup
+    selama satu run, lalu memberikan BrowserContext baru per akun.
+
+    Catatan: Playwright sync API terikat ke thread yang membuatnya,
+    jadi satu BrowserPool hanya boleh dipakai dari satu thread.
+
+    Recycling: Chromium di-restart setelah max_contexts context, setelah
+    max_age_minutes menit, atau saat RSS process tree melewati max_rss_mb.
+    Browser lama di-drain: context yang masih aktif tetap jalan sampai
+    di-release, context baru dibuat di browser baru.
+
+    Usage:
+        pool = BrowserPool(headless=True)
+        lease = pool.acquire()
+        page = lease.page
+        ...
+        lease.close()
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        headless=None,
+        max_contexts=None,
+        max_age_minutes=None,
+        max_rss_mb=None,
+        profile=None,
+    ):
+        """
+        Args:
+            headless (bool): Mode headless. Jika None, gunakan config default
+            profile (str): Launch profile (LAUNCH_PROFILES). Default dari config
+            max_contexts (int): Restart setelah N context (0 = nonaktif)
+            max_age_minutes (float): Restart setelah M menit (0 = nonaktif)
+            max_rss_mb (float): Restart jika RSS browser > batas (0 = nonaktif)
+        """
+        self.headless = is_headless_mode() if headless is None else headless
+        self.profile = profile or BROWSER_LAUNCH_PROFILE
+        self.playwright: Playwright = None
+        self.browser: Browser = None
+        self.active_leases = []
+        self.contexts_created = 0
+        self.telemetry = get_telemetry_manager() if get_telemetry_manager else None
+        self.asset_cache = get_static_asset_cache()
+
+        # Recycling policy
+        self.max_contexts = (
+            BROWSER_RECYCLE_MAX_CONTEXTS if max_contexts is None else max_contexts
+        )
+        self.max_age_minutes = (
+            BROWSER_RECYCLE_MAX_AGE_MINUTES
+            if max_age_minutes is None
+            else max_age_minutes
+        )
+        self.max_rss_mb = BROWSER_RECYCLE_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+        self.browser_pids = []
+        self.launched_at = None
+        self.contexts_since_launch = 0
+        self.retired_browsers = []
+        self.recycle_count = 0
+
+    def _record_duration(self, operation_name, started_at):
+        """Catat durasi operasi pool ke telemetry (jika tersedia)"""
+        if self.telemetry:
+            self.telemetry.record_duration(operation_name, time.time() - started_at)
+
+    def is_running(self):
+        """
+        Returns:
+            bool: True jika browser masih hidup dan terkoneksi
+        """
+        try:
+            return self.browser is not None and self.browser.is_connected()
+        except Exception:
+            return False
+
+    def start(self):
+        """
+        Start Playwright driver dan launch Chromium (sekali per run)
+
+        Returns:
+            bool: True jika browser siap digunakan
+        """
+        if self.is_running():
+            return True
+
+        print("Menjalankan shared Chromium untuk BrowserPool...")
+        print(
+            f"   Mode: {'Headless (tidak terlihat)' if self.headless else 'GUI Visible (terlihat)'}"
+        )
+
+        started_at = time.time()
+        try:
+            if self.playwright is None:
+                self.playwright = sync_playwright().start()
+
+            # Penanda unik di cmdline: PID browser pool ini tetap bisa dikenali
+            # walau worker/shard lain meluncurkan Chromium bersamaan
+            marker = f"--snapflux-pool={uuid.uuid4().hex}"
+            self.browser = _launch_chromium(
+                self.playwright,
+                self.headless,
+                profile=self.profile,
+                extra_args=[marker],
+            )
+            self.browser_pids = _find_browser_root_pids(marker)
+            self.launched_at = time.time()
+            self.contexts_since_launch = 0
+            self._record_duration("browser_launch", started_at)
+
+            print(f"✓ Shared Chromium siap ({time.time() - started_at:.2f}s)")
+            return True
+
+        except Exception as e:
+            print(f"✗ Error launch shared Chromium: {str(e)}")
+            logger.error(f"Error launch BrowserPool: {str(e)}", exc_info=True)
+            self.close()
+            return False
+
+    def acquire(self, storage_state=None, route_policy=None):
+        """
+        Buat BrowserContext + Page baru yang terisolasi untuk satu akun
+
+        Args:
+            storage_state (dict): Session tersimpan untuk dipulihkan, opsional
+            route_policy (RoutePolicy): Policy routing request per akun, opsional
+
+        Returns:
+            PooledContext: Lease berisi context dan page, atau None jika gagal
+        """
+        if self.is_running():
+            self._maybe_recycle()
+
+        if not self.start():
+            return None
+
+        started_at = time.time()
+        context = None
+        try:
+            context = _new_configured_context(self.browser, storage_state=storage_state)
+            # Urutan penting: cache dulu, policy terakhir (policy dijalankan pertama)
+            if self.asset_cache:
+                self.asset_cache.attach(context)
+            if route_policy:
+                route_policy.attach(context)
+            page = context.new_page()
+            self._record_duration("context_create", started_at)
+
+            lease = PooledContext(self, context, page, browser=self.browser)
+            self.active_leases.append(lease)
+            self.contexts_created += 1
+            self.contexts_since_launch += 1
+            return lease
+
+        except Exception as e:
+            print(f"✗ Error membuat browser context: {str(e)}")
+            logger.error(f"Error acquire BrowserPool: {str(e)}", exc_info=True)
+            if context:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+            return None
+
+    def release(self, lease: PooledContext):
+        """
+        Tutup context milik lease. Browser tetap hidup untuk akun berikutnya.
+
+        Args:
+            lease (PooledContext): Lease yang dikembalikan
+        """
+        try:
+            if lease.context:
+                lease.context.close()
+        except Exception as e:
+            logger.warning(f"Warning saat menutup context: {str(e)}")
+        finally:
+            lease.context = None
+            lease.page = None
+            if lease in self.active_leases:
+                self.active_leases.remove(lease)
+
+        # Browser lama yang sedang di-drain ditutup saat context terakhirnya selesai
+        if lease.browser in self.retired_browsers and not self._has_leases(lease.browser):
+            self._close_browser(lease.browser)
+            self.retired_browsers.remove(lease.browser)
+
+    def _has_leases(self, browser):
+        return any(lease.browser is browser for lease in self.active_leases)
+
+    def _close_browser(self, browser):
+        try:
+            browser.close()
+        except Exception as e:
+            logger.warning(f"Warning saat menutup browser lama: {str(e)}")
+
+    def get_rss_mb(self):
+        """
+        Returns:
+            float: RSS process tree Chromium aktif (MB), None jika tidak bisa diukur
+        """
+        return _process_tree_rss_mb(self.browser_pids)
+
+    def _recycle_reason(self):
+        """
+        Cek apakah browser aktif perlu di-restart
+
+        Returns:
+            tuple: (reason, rss_mb) - reason None jika belum perlu recycle
+        """
+        rss_mb = self.get_rss_mb()
+
+        if self.max_contexts and self.contexts_since_launch >= self.max_contexts:
+            return "max_contexts", rss_mb
+        if (
+            self.max_age_minutes
+            and self.launched_at
+            and time.time() - self.launched_at >= self.max_age_minutes * 60
+        ):
+            return "max_age", rss_mb
+        if self.max_rss_mb and rss_mb is not None and rss_mb >= self.max_rss_mb:
+            return "max_rss", rss_mb
+        return None, rss_mb
+
+    def _maybe_recycle(self):
+        """
+        Restart Chromium jika policy terpenuhi. Context yang masih aktif di
+        browser lama tidak diganggu (drain), browser lama ditutup setelah
+        context terakhirnya di-release.
+        """
+        reason, rss_mb = self._recycle_reason()
+        if reason is None:
+            return
+
+        old_browser = self.browser
+        self.recycle_count += 1
+        message = (
+            f"♻ Recycle Chromium ({reason}): {self.contexts_since_launch} context, "
+            f"{(time.time() - self.launched_at) / 60:.1f} menit"
+        )
+        if rss_mb is not None:
+            message += f", RSS {rss_mb:.0f} MB"
+        print(message)
+
+        if self.telemetry:
+            self.telemetry.record_event(
+                "browser_recycle",
+                {
+                    "reason": reason,
+                    "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+                    "contexts": self.contexts_since_launch,
+                    "age_minutes": round((time.time() - self.launched_at) / 60, 1),
+                },
+            )
+
+        if self._has_leases(old_browser):
+            self.retired_browsers.append(old_browser)
+        else:
+            self._close_browser(old_browser)
+
+        # start() berikutnya akan launch browser baru
+        self.browser = None
+        self.browser_pids = []
+
+    def close(self):
+        """
+        Tutup semua context aktif, browser, dan Playwright driver
+        """
+        for lease in list(self.active_leases):
+            self.release(lease)
+
+        for browser in self.retired_browsers:
+            self._close_browser(browser)
+        self.retired_browsers = []
+
+        try:
+            if self.browser:
+                self.browser.close()
+        except Exception as e:
+            logger.warning(f"Warning saat menutup shared browser: {str(e)}")
+        finally:
+            self.browser = None
+
+        try:
+            if self.playwright:
+                self.playwright.stop()
+        except Exception as e:
+            logger.warning(f"Warning saat stop Playwright: {str(e)}")
+        finally:
+            self.playwright = None
+
+        if self.asset_cache:
+            self.asset_cache.flush()
+
+        print(f"✓ BrowserPool ditutup ({self.contexts_created} context dibuat)")
+
+
 def setup_browser(headless=False):
     """
     Fungsi helper untuk setup browser Playwright dengan mudah
@@ -0,0 +1,218 @@
+"""
+Statistik strategi fallback yang disimpan antar run
+File ini mencatat hit/miss/latency per strategi (rule ekstraksi, selector)
+ke JSON di folder cache, lalu dipakai untuk mengurutkan strategi: yang
+paling murah per keberhasilan dicoba lebih dulu.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+
+logger = logging.getLogger("strategy_stats")
+
+try:
+    from modules.core.constants import STATS_DIR
+except ImportError:
+    STATS_DIR = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "cache",
+        "stats",
+    )
+
+try:
+    from modules.core.config import STRATEGY_STATS_WINDOW
+except ImportError:
+    STRATEGY_STATS_WINDOW = 200
+
+# Simpan otomatis ke disk setiap sekian record
+AUTOSAVE_EVERY = 50
+
+
+class StrategyStats:
+    """
+    Hit/miss/latency per strategi, dikelompokkan per group
+    (mis. "extract:stock", "selector:email_input").
+
+    Usage:
+        stats = get_strategy_stats()
+        for name in stats.order("extract:stock", ["a", "b", "c"]):
+            ...
+            stats.record("extract:stock", name, success, duration)
+        stats.save()
+    """
+
+    def __init__(self, path=None, window=None):
+        """
+        Args:
+            path (str): File JSON statistik. Default STATS_DIR/strategy_stats.json
+            window (int): Jumlah percobaan sebelum statistik diperkecil setengah.
+                Default STRATEGY_STATS_WINDOW, 0 = tanpa decay
+        """
+        self.path = path or os.path.join(STATS_DIR, "strategy_stats.json")
+        self.window = STRATEGY_STATS_WINDOW if window is None else window
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._data = self._load()
+        # Percobaan yang belum ditulis ke disk: {group: {name: entry}}.
+        # Saat save, yang ditambahkan ke file adalah delta ini (bukan _data),
+        # supaya hitungan proses lain (shard) yang menulis file sama tidak hilang
+        self._pending = {}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _entry_in(data, group, name):
+        return data.setdefault(group, {}).setdefault(
+            name, {"hits": 0, "misses": 0, "total_seconds": 0.0}
+        )
+
+    def _entry(self, group, name):
+        return self._entry_in(self._data, group, name)
+
+    def _decay(self, entry):
+        """Decay: data lama tetap berpengaruh tapi bobotnya berkurang"""
+        if self.window and entry["hits"] + entry["misses"] >= self.window:
+            entry["hits"] //= 2
+            entry["misses"] //= 2
+            entry["total_seconds"] /= 2
+
+    def record(self, group, name, success, duration):
+        """
+        Catat satu percobaan strategi
+
+        Args:
+            group (str): Kelompok strategi
+            name (str): Nama strategi
+            success (bool): True jika strategi menghasilkan nilai
+            duration (float): Lama percobaan (detik)
+        """
+        with self._lock:
+            entry = self._entry(group, name)
+            pending = self._entry_in(self._pending, group, name)
+            for target in (entry, pending):
+                target["hits" if success else "misses"] += 1
+                target["total_seconds"] += duration
+            self._decay(entry)
+
+            self._dirty += 1
+            should_save = self._dirty >= AUTOSAVE_EVERY
+
+        if should_save:
+            self.save()
+
+    def get(self, group, name):
+        """
+        Returns:
+            dict: {hits, misses, total_seconds} (nol jika belum pernah dicoba)
+        """
+        with self._lock:
+            entry = self._data.get(group, {}).get(name)
+            return dict(entry) if entry else {"hits": 0, "misses": 0, "total_seconds": 0.0}
+
+    def expected_cost(self, group, name):
+        """
+        Perkiraan waktu yang dihabiskan per keberhasilan (latency rata-rata /
+        hit rate). Strategi yang belum pernah dicoba bernilai 0 (dicoba dulu
+        supaya terukur), yang tidak pernah berhasil bernilai tak hingga.
+
+        Returns:
+            float: Detik per keberhasilan
+        """
+        entry = self.get(group, name)
+        attempts = entry["hits"] + entry["misses"]
+        if attempts == 0:
+            return 0.0
+        if entry["hits"] == 0:
+            return math.inf
+        avg_seconds = entry["total_seconds"] / attempts
+        return avg_seconds / (entry["hits"] / attempts)
+
+    def order(self, group, names):
+        """
+        Urutkan nama strategi dari yang paling murah per keberhasilan.
+        Urutan asli dipakai sebagai tie-breaker.
+
+        Returns:
+            list: Nama strategi terurut
+        """
+        indexed = list(enumerate(names))
+        indexed.sort(key=lambda item: (self.expected_cost(group, item[1]), item[0]))
+        return [name for _, name in indexed]
+
+    def report(self, group=None):
+        """
+        Returns:
+            dict: {group: {name: {hits, misses, hit_rate, avg_ms}}}
+        """
+        with self._lock:
+            groups = {group: self._data.get(group, {})} if group else dict(self._data)
+            report = {}
+            for group_name, entries in groups.items():
+                report[group_name] = {}
+                for name, entry in entries.items():
+                    attempts = entry["hits"] + entry["misses"]
+                    report[group_name][name] = {
+                        "hits": entry["hits"],
+                        "misses": entry["misses"],
+                        "hit_rate": round(entry["hits"] / attempts, 3) if attempts else None,
+                        "avg_ms": round(entry["total_seconds"] / attempts * 1000, 2)
+                        if attempts
+                        else None,
+                    }
+            return report
+
+    def _merge_pending(self, disk_data):
+        """Tambahkan percobaan yang belum tersimpan ke statistik di disk"""
+        for group, entries in self._pending.items():
+            for name, pending in entries.items():
+                entry = self._entry_in(disk_data, group, name)
+                entry["hits"] += pending["hits"]
+                entry["misses"] += pending["misses"]
+                entry["total_seconds"] += pending["total_seconds"]
+                self._decay(entry)
+        return disk_data
+
+    def save(self):
+        """
+        Tulis statistik ke disk secara atomic. File dibaca ulang dan digabung
+        dengan percobaan proses ini (proses shard lain bisa menulis file yang
+        sama), lalu ditulis lewat temp file per proses + os.replace.
+        """
+        with self._lock:
+            merged = self._merge_pending(self._load())
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, indent=2)
+                os.replace(tmp_path, self.path)
+                self._data = merged
+                self._pending = {}
+                self._dirty = 0
+            except OSError as e:
+                logger.warning(f"Gagal menyimpan statistik strategi: {str(e)}")
+
+
+_strategy_stats = None
+_strategy_stats_lock = threading.Lock()
+
+
+def get_strategy_stats():
+    """
+    Returns:
+        StrategyStats: Instance bersama (satu file statistik per proses)
+    """
+    global _strategy_stats
+
+    with _strategy_stats_lock:
+        if _strategy_stats is None:
+            _strategy_stats = StrategyStats()
+        return _strategy_stats
@@ -0,0 +1,390 @@
+"""
+Kondisi "siap" bernama untuk menggantikan time.sleep tetap
+File ini berisi kondisi tunggu yang dideklarasikan di call site (request API
+tertentu selesai, elemen ter-attach dengan text stabil, DOM tenang selama X ms,
+loader hilang, predicate halaman siap) dan WaitLedger yang mencatat berapa
+detik sleep tetap yang digantikan vs waktu tunggu sebenarnya per akun.
+
+Usage:
+    wait_until(page, "grid bulan kalender", selector_state("button:text-is('Nov')"),
+               replaces=1.0)
+    wait_until(page, "laporan penjualan dimuat", api_response(API_ENDPOINTS["sales"]),
+               action=lambda: date_btn.click(), replaces=1.5)
+
+    ledger = reset_wait_ledger()   # awal proses akun (per thread worker)
+    ...
+    ledger.record_to_telemetry(telemetry, username)
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from modules.browser.page_routes import READY_PREDICATES
+
+try:
+    from modules.core.config import (
+        WAIT_DEFAULT_TIMEOUT,
+        WAIT_DOM_QUIET_MS,
+        WAIT_STABLE_TEXT_MS,
+    )
+except ImportError:
+    WAIT_DEFAULT_TIMEOUT = 5000
+    WAIT_DOM_QUIET_MS = 300
+    WAIT_STABLE_TEXT_MS = 300
+
+logger = logging.getLogger("playwright_automation")
+
+# Indikator loading (dipakai bersama oleh wait_for_data_load)
+LOADER_SELECTORS = [
+    ".loading",
+    ".spinner",
+    "[class*='loading']",
+    "[class*='spinner']",
+    "[class*='Loader']",
+]
+
+# Interval polling predicate di browser (milliseconds)
+POLL_INTERVAL_MS = 100
+
+# True jika tidak ada mutasi DOM selama quietMs sejak mutasi terakhir (atau
+# sejak wait dimulai). Observer dipasang sekali per dokumen.
+DOM_QUIET_JS = """
+(arg) => {
+    const state = window.__sfxDomQuiet || (window.__sfxDomQuiet = (() => {
+        const s = { last: performance.now(), starts: {} };
+        new MutationObserver(() => { s.last = performance.now(); }).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true,
+        });
+        return s;
+    })());
+    const now = performance.now();
+    const start = state.starts[arg.key] || (state.starts[arg.key] = now);
+    if (now - Math.max(state.last, start) < arg.quietMs) return false;
+    delete state.starts[arg.key];
+    return true;
+}
+"""
+
+# True jika elemen ter-attach dan text-nya (tidak kosong) tidak berubah
+# selama stableMs
+STABLE_TEXT_JS = """
+(arg) => {
+    const store = window.__sfxStableText || (window.__sfxStableText = {});
+    const el = document.querySelector(arg.selector);
+    if (!el) { delete store[arg.key]; return false; }
+    const text = (el.textContent || "").trim();
+    const now = performance.now();
+    const prev = store[arg.key];
+    if (!prev || prev.text !== text) {
+        store[arg.key] = { text: text, since: now };
+        return false;
+    }
+    if (!text || now - prev.since < arg.stableMs) return false;
+    delete store[arg.key];
+    return true;
+}
+"""
+
+# True jika tidak ada indikator loading yang visible
+LOADER_HIDDEN_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).every(
+    (el) => el.offsetParent === null || getComputedStyle(el).visibility === "hidden"
+)
+"""
+
+# Key unik per wait supaya state polling di browser tidak tercampur
+_wait_keys = itertools.count(1)
+
+
+class WaitCondition:
+    """
+    Satu kondisi tunggu bernama. wait_fn(page, timeout_ms) menunggu hingga
+    kondisi terpenuhi dan melempar PlaywrightTimeoutError jika tidak.
+    Jika wrap_action diisi, action pemicu dijalankan di dalamnya (mis.
+    expect_event harus dipasang sebelum klik supaya response tidak terlewat).
+    """
+
+    def __init__(self, name, wait_fn, wrap_action=None):
+        """
+        Args:
+            name (str): Nama kondisi (untuk log & laporan)
+            wait_fn (callable): fungsi(page, timeout_ms)
+            wrap_action (callable): fungsi(page, action, timeout_ms), opsional
+        """
+        self.name = name
+        self.wait_fn = wait_fn
+        self.wrap_action = wrap_action
+
+    def run(self, page: Page, timeout, action=None):
+        if action is not None and self.wrap_action is not None:
+            self.wrap_action(page, action, timeout)
+            return
+        if action is not None:
+            action()
+        self.wait_fn(page, timeout)
+
+
+def api_response(url_part: str) -> WaitCondition:
+    """
+    Request API yang URL-nya mengandung url_part selesai (requestfinished).
+    Pakai bersama action di wait_until supaya request yang cepat tidak terlewat.
+    """
+
+    def matches(request):
+        return url_part in request.url
+
+    def wait_fn(page, timeout):
+        page.wait_for_event("requestfinished", predicate=matches, timeout=timeout)
+
+    def wrap_action(page, action, timeout):
+        with page.expect_event("requestfinished", predicate=matches, timeout=timeout):
+            action()
+
+    return WaitCondition(f"api:{url_part}", wait_fn, wrap_action)
+
+
+def stable_text(selector: str, stable_ms: Optional[int] = None) -> WaitCondition:
+    """Elemen (CSS selector) ter-attach dan text-nya stabil selama stable_ms"""
+    stable_ms = WAIT_STABLE_TEXT_MS if stable_ms is None else stable_ms
+
+    def wait_fn(page, timeout):
+        page.wait_for_function(
+            STABLE_TEXT_JS,
+            arg={"selector": selector, "stableMs": stable_ms, "key": next(_wait_keys)},
+            polling=POLL_INTERVAL_MS,
+            timeout=timeout,
+        )
+
+    return WaitCondition(f"stable_text:{selector}", wait_fn)
+
+
+def dom_quiet(quiet_ms: Optional[int] = None) -> WaitCondition:
+    """Tidak ada mutasi DOM selama quiet_ms (minimal quiet_ms sejak wait dimulai)"""
+    quiet_ms = WAIT_DOM_QUIET_MS if quiet_ms is None else quiet_ms
+
+    def wait_fn(page, timeout):
+        page.wait_for_function(
+            DOM_QUIET_JS,
+            arg={"quietMs": quiet_ms, "key": next(_wait_keys)},
+            polling=POLL_INTERVAL_MS,
+            timeout=timeout,
+        )
+
+    return WaitCondition(f"dom_quiet:{quiet_ms}ms", wait_fn)
+
+
+def loader_hidden(selectors=None) -> WaitCondition:
+    """Semua indikator loading (LOADER_SELECTORS) tidak visible"""
+    selector = ", ".join(selectors or LOADER_SELECTORS)
+
+    def wait_fn(page, timeout):
+        page.wait_for_function(
+            LOADER_HIDDEN_JS, arg=selector, polling=POLL_INTERVAL_MS, timeout=timeout
+        )
+
+    return WaitCondition("loader_hidden", wait_fn)
+
+
+def selector_state(selector: str, state: str = "visible") -> WaitCondition:
+    """Elemen pertama yang cocok selector (Playwright) mencapai state tertentu"""
+
+    def wait_fn(page, timeout):
+        page.locator(selector).first.wait_for(state=state, timeout=timeout)
+
+    return WaitCondition(f"{state}:{selector}", wait_fn)
+
+
+def page_ready(name: str) -> WaitCondition:
+    """Predicate halaman siap di page_routes.READY_PREDICATES terpenuhi"""
+    js = READY_PREDICATES[name]
+
+    def wait_fn(page, timeout):
+        page.wait_for_function(js, polling=POLL_INTERVAL_MS, timeout=timeout)
+
+    return WaitCondition(f"page:{name}", wait_fn)
+
+
+def predicate(name: str, js: str, arg=None) -> WaitCondition:
+    """Predicate JS bebas bernilai truthy"""
+
+    def wait_fn(page, timeout):
+        page.wait_for_function(js, arg=arg, polling=POLL_INTERVAL_MS, timeout=timeout)
+
+    return WaitCondition(name, wait_fn)
+
+
+def url_contains(url_part: str) -> WaitCondition:
+    """URL page mengandung url_part"""
+
+    def wait_fn(page, timeout):
+        page.wait_for_url(lambda url: url_part in url, timeout=timeout)
+
+    return WaitCondition(f"url:{url_part}", wait_fn)
+
+
+def all_of(*conditions: WaitCondition) -> WaitCondition:
+    """Semua kondisi terpenuhi berurutan, berbagi satu batas waktu"""
+
+    def wait_fn(page, timeout):
+        deadline = time.perf_counter() + timeout / 1000
+        for condition in conditions:
+            remaining = max(1, int((deadline - time.perf_counter()) * 1000))
+            condition.wait_fn(page, remaining)
+
+    def wrap_action(page, action, timeout):
+        started_at = time.perf_counter()
+        conditions[0].run(page, timeout, action)
+        remaining = max(1, int(timeout - (time.perf_counter() - started_at) * 1000))
+        all_of(*conditions[1:]).wait_fn(page, remaining)
+
+    return WaitCondition(
+        " + ".join(condition.name for condition in conditions), wait_fn, wrap_action
+    )
+
+
+class WaitLedger:
+    """
+    Catatan wait satu akun: sleep tetap yang digantikan vs waktu tunggu
+    sebenarnya, dikelompokkan per nama wait di call site.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits: Dict[str, Dict] = {}
+
+    def record(self, what, replaced, waited, met):
+        """
+        Args:
+            what (str): Nama wait di call site
+            replaced (float): Detik sleep tetap yang digantikan
+            waited (float): Detik tunggu sebenarnya
+            met (bool): Kondisi terpenuhi (False = timeout)
+        """
+        with self._lock:
+            entry = self.waits.setdefault(
+                what, {"count": 0, "replaced": 0.0, "waited": 0.0, "timeouts": 0}
+            )
+            entry["count"] += 1
+            entry["replaced"] += replaced
+            entry["waited"] += waited
+            if not met:
+                entry["timeouts"] += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: {"replaced", "waited", "saved", "timeouts", "waits": {what: entry}}
+                  dalam detik; saved negatif berarti wait lebih lama dari sleep lama
+        """
+        with self._lock:
+            waits = {what: dict(entry) for what, entry in self.waits.items()}
+        replaced = sum(entry["replaced"] for entry in waits.values())
+        waited = sum(entry["waited"] for entry in waits.values())
+        return {
+            "replaced": round(replaced, 3),
+            "waited": round(waited, 3),
+            "saved": round(replaced - waited, 3),
+            "timeouts": sum(entry["timeouts"] for entry in waits.values()),
+            "waits": waits,
+        }
+
+    def record_to_telemetry(self, telemetry, username):
+        """
+        Kirim ringkasan wait akun ke TelemetryManager
+
+        Args:
+            telemetry (TelemetryManager): Instance telemetry
+            username (str): Username akun
+
+        Returns:
+            dict: Ringkasan (lihat summary)
+        """
+        summary = self.summary()
+        telemetry.record_account_stats(username, "waits", summary)
+        telemetry.record_duration("sleep_saved", summary["saved"])
+        telemetry.increment_counter("wait_timeouts", summary["timeouts"])
+        return summary
+
+
+# Ledger per thread: satu worker memproses satu akun dalam satu waktu
+_thread_state = threading.local()
+
+
+def get_wait_ledger() -> WaitLedger:
+    """
+    Returns:
+        WaitLedger: Ledger akun yang sedang diproses di thread ini
+    """
+    ledger = getattr(_thread_state, "ledger", None)
+    if ledger is None:
+        ledger = _thread_state.ledger = WaitLedger()
+    return ledger
+
+
+def reset_wait_ledger() -> WaitLedger:
+    """
+    Mulai ledger baru untuk akun berikutnya di thread ini
+
+    Returns:
+        WaitLedger: Ledger baru
+    """
+    _thread_state.ledger = WaitLedger()
+    return _thread_state.ledger
+
+
+def wait_until(
+    page: Page,
+    what: str,
+    condition: WaitCondition,
+    replaces: float = 0.0,
+    timeout: Optional[int] = None,
+    action: Optional[Callable] = None,
+) -> bool:
+    """
+    Tunggu kondisi bernama (pengganti time.sleep tetap) dan catat ke ledger.
+    Timeout tidak dianggap error: pemanggil tetap lanjut seperti setelah sleep.
+
+    Args:
+        page (Page): Playwright Page object
+        what (str): Apa yang ditunggu (nama di laporan, mis. "grid bulan kalender")
+        condition (WaitCondition): Kondisi dari api_response/stable_text/dom_quiet/...
+        replaces (float): Detik time.sleep yang digantikan wait ini
+        timeout (int): Batas tunggu (ms). Default WAIT_DEFAULT_TIMEOUT
+        action (callable): Aksi pemicu (mis. klik) yang dijalankan di dalam wait.
+            Exception dari action diteruskan ke pemanggil
+
+    Returns:
+        bool: True jika kondisi terpenuhi, False jika timeout/error
+    """
+    timeout = WAIT_DEFAULT_TIMEOUT if timeout is None else timeout
+    action_errors = []
+
+    def guarded_action():
+        try:
+            action()
+        except Exception as e:
+            action_errors.append(e)
+            raise
+
+    started_at = time.perf_counter()
+    met = False
+    try:
+        condition.run(page, timeout, guarded_action if action else None)
+        met = True
+    except Exception as e:
+        if action_errors:
+            # Aksi pemicu (mis. klik) yang gagal tetap jadi error pemanggil
+            raise action_errors[0]
+        if isinstance(e, PlaywrightTimeoutError):
+            logger.debug(f"Wait '{what}' ({condition.name}) timeout setelah {timeout} ms")
+        else:
+            logger.debug(f"Wait '{what}' ({condition.name}) gagal: {e}")
+    finally:
+        get_wait_ledger().record(what, replaces, time.perf_counter() - started_at, met)
+    return met
@@ -0,0 +1,477 @@
+"""
+Async Process Manager Module
+============================
+Varian ProcessManager yang menjalankan semua akun di satu event loop asyncio
+dengan playwright.async_api. Konkurensi dibatasi oleh asyncio.Semaphore,
+sehingga banyak akun bisa berjalan bersamaan di satu Chromium tanpa
+membuat satu OS thread per akun.
+
+Akun yang kena lockout "Gagal Masuk Akun" diparkir di deferred retry queue
+(sama dengan ProcessManager) dan slot semaphore-nya dilepas selama cooldown.
+Multi-tanggal, aturan filter tanggal dan penyimpanan hasil memakai method
+ProcessManager yang sama. Fitur yang belum ada di engine async (session
+cache, response capture, routing policy, sync transaksi) ditolak di awal run
+dengan error yang jelas, bukan diabaikan diam-diam.
+"""
+
+import asyncio
+
+from modules.browser.async_engine import (
+    AsyncBrowserPool,
+    click_date_elements_async,
+    click_laporan_penjualan_async,
+    get_stock_value_async,
+    get_tabung_terjual_async,
+    login_direct_async,
+)
+from modules.browser.strategy_stats import get_strategy_stats
+from modules.core.config import (
+    HEADLESS_MODE,
+    MAX_LOCKOUT_RETRIES,
+    MAX_WORKERS,
+    RESPONSE_CAPTURE_ENABLED,
+    ROUTE_POLICY_ENABLED,
+    TRANSACTION_SYNC_ENABLED,
+)
+from modules.core.network import check_before_step
+from modules.core.process_manager import ProcessManager
+
+
+def unsupported_async_settings(settings):
+    """
+    Fitur yang diminta settings/config tetapi belum didukung engine async
+
+    Args:
+        settings (dict): Settings run
+
+    Returns:
+        list: Nama fitur yang tidak didukung, kosong jika semua didukung
+    """
+    unsupported = []
+    if settings.get("use_session"):
+        unsupported.append("use_session (session cache)")
+    if settings.get("response_capture", RESPONSE_CAPTURE_ENABLED):
+        unsupported.append("response_capture / RESPONSE_CAPTURE_ENABLED")
+    if ROUTE_POLICY_ENABLED:
+        unsupported.append("ROUTE_POLICY_ENABLED (routing policy)")
+    if TRANSACTION_SYNC_ENABLED:
+        unsupported.append("TRANSACTION_SYNC_ENABLED (sync transaksi)")
+    return unsupported
+
+
+class AsyncProcessManager(ProcessManager):
+    """
+    ProcessManager berbasis asyncio.
+    Interface (callbacks, stop/pause/resume, run) sama dengan ProcessManager
+    sehingga bisa dipakai langsung oleh GUI maupun CLI.
+    """
+
+    def run(self, accounts, settings):
+        """
+        Jalankan proses untuk list akun di event loop baru
+
+        Args:
+            accounts (list): List akun [{id, nama, username, pin}, ...]
+            settings (dict): Settings {headless, date, delay, max_workers, ...}
+                - max_workers (int): Jumlah akun yang diproses bersamaan
+                  (semua berbagi satu Chromium, context per akun)
+                - launch_profile (str): Launch profile Chromium (LAUNCH_PROFILES)
+                - dates (list/dict): Multi-tanggal, sama dengan ProcessManager
+
+        Returns:
+            list: List hasil proses
+
+        Raises:
+            ValueError: Settings meminta fitur yang belum didukung engine async
+        """
+        return asyncio.run(self.run_async(accounts, settings))
+
+    async def run_async(self, accounts, settings):
+        """
+        Versi coroutine dari run(), untuk pemanggil yang sudah punya event loop
+
+        Returns:
+            list: List hasil proses
+
+        Raises:
+            ValueError: Settings meminta fitur yang belum didukung engine async
+        """
+        unsupported = unsupported_async_settings(settings)
+        if unsupported:
+            raise ValueError(
+                "Engine async belum mendukung: "
+                + ", ".join(unsupported)
+                + ". Nonaktifkan fitur tersebut atau pakai engine sync."
+            )
+
+        self.stop_requested = False
+        self.results = []
+        self._completed = 0
+        self._deferred = []
+        self._deferred_seq = 0
+        self._lockout_attempts = {}
+        self.telemetry.reset()
+
+        headless_mode = settings.get("headless", HEADLESS_MODE)
+        delay = settings.get("delay", 2.0)
+        selected_date = settings.get("date_obj")  # Expecting datetime object or None
+        max_workers = max(1, int(settings.get("max_workers") or MAX_WORKERS))
+
+        dates = self._run_dates(settings, selected_date)
+
+        total_accounts = len(accounts)
+        max_workers = min(max_workers, total_accounts) or 1
+        self._log(
+            f"Memulai proses async untuk {total_accounts} akun "
+            f"({max_workers} bersamaan)...",
+            "info",
+        )
+
+        run_options = {
+            "headless": headless_mode,
+            "delay": delay,
+            "selected_date": dates[0],
+            "dates": dates,
+            "total": total_accounts,
+        }
+
+        semaphore = asyncio.Semaphore(max_workers)
+        browser_pool = AsyncBrowserPool(
+            headless=headless_mode, profile=settings.get("launch_profile")
+        )
+
+        try:
+            await self._run_all(accounts, browser_pool, semaphore, run_options)
+        finally:
+            await browser_pool.close()
+
+        if self.stop_requested:
+            self._fail_deferred_accounts(total_accounts)
+
+        # Statistik strategi ekstraksi & selector untuk urutan adaptif run berikutnya
+        get_strategy_stats().save()
+
+        if self.stop_requested:
+            self._log("Proses dihentikan oleh user", "error")
+
+        self._report_run_end(dates, total_accounts)
+        return self.results
+
+    async def _wait_if_paused_async(self):
+        """
+        Tahan task selama proses dipause tanpa memblok event loop
+
+        Returns:
+            bool: False jika stop diminta selama pause
+        """
+        while self.pause_requested:
+            await asyncio.sleep(0.5)
+            if self.stop_requested:
+                return False
+        return not self.stop_requested
+
+    async def _run_all(self, accounts, browser_pool, semaphore, run_options):
+        """
+        Jalankan task per akun dan jadwalkan ulang akun parkir (lockout)
+        begitu cooldown-nya selesai, sampai semua selesai atau stop diminta
+        """
+        tasks = {
+            asyncio.create_task(
+                self._run_slot(idx, account, browser_pool, semaphore, run_options)
+            )
+            for idx, account in enumerate(accounts)
+        }
+
+        while tasks or (self._deferred and not self.stop_requested):
+            ready = None if self.stop_requested else self._pop_ready_deferred()
+            if ready:
+                idx, account = ready
+                tasks.add(
+                    asyncio.create_task(
+                        self._run_slot(
+                            idx, account, browser_pool, semaphore, run_options, True
+                        )
+                    )
+                )
+                continue
+
+            # Bangun saat ada task selesai atau akun parkir berikutnya siap
+            wait = self._next_deferred_wait()
+            timeout = min(1.0, wait) if wait is not None else None
+            if not tasks:
+                await asyncio.sleep(timeout)
+                continue
+            done, tasks = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+
+    async def _run_slot(
+        self, idx, account, browser_pool, semaphore, run_options, resumed=False
+    ):
+        """
+        Proses satu akun setelah mendapat slot dari semaphore. Akun yang
+        diparkir karena lockout melepas slot tanpa dihitung selesai.
+        """
+        async with semaphore:
+            if not await self._wait_if_paused_async():
+                return
+
+            parked = await self._process_account_async(
+                idx, account, browser_pool, run_options, resumed
+            )
+            if parked:
+                return
+            self._mark_completed(run_options["total"])
+
+            # Jeda antar akun per slot agar tidak membanjiri server
+            if not self.stop_requested:
+                await asyncio.sleep(run_options["delay"])
+
+    async def _check_connection(self, step_name, username):
+        """Jalankan check_before_step (blocking) di thread executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: check_before_step(
+                step_name,
+                username,
+                max_wait=300,
+                log_callback=lambda m, l: self._log(m, l),
+            ),
+        )
+
+    async def _collect_sales_async(self, page, nama, dates):
+        """
+        Versi async dari ProcessManager._collect_sales: buka Laporan Penjualan
+        sekali lalu ambil tabung terjual untuk setiap tanggal
+
+        Returns:
+            list: [(tanggal, tabung_terjual)], None jika Laporan Penjualan
+                  tidak bisa dibuka
+        """
+        multi_date = len(dates) > 1
+
+        if not await click_laporan_penjualan_async(page):
+            return None
+
+        sales = []
+        for selected_date in dates:
+            if selected_date:
+                self._log(
+                    f"Menerapkan filter tanggal: {selected_date.strftime('%d/%m/%Y')}",
+                    "info",
+                )
+                applied = await click_date_elements_async(page, selected_date)
+                if not self._accept_date_filter(selected_date, applied, multi_date):
+                    continue
+
+            tabung_terjual = await get_tabung_terjual_async(page)
+            self._log_tabung_terjual(nama, tabung_terjual)
+            sales.append((selected_date, tabung_terjual))
+
+        return sales
+
+    async def _process_account_async(
+        self, idx, account, browser_pool, run_options, resumed=False
+    ):
+        """
+        Proses satu akun: context baru, login, ambil stok & penjualan, simpan hasil
+
+        Args:
+            idx (int): Index akun di list input
+            account (dict/tuple): Data akun
+            browser_pool (AsyncBrowserPool): Pool browser bersama
+            run_options (dict): Opsi run (headless, selected_date, ...)
+            resumed (bool): True jika akun diambil dari deferred retry queue
+
+        Returns:
+            bool: True jika akun diparkir (lockout) dan akan dicoba lagi nanti
+        """
+        dates = run_options["dates"]
+
+        account_id, nama, username, pin, pangkalan_id = self._parse_account(
+            idx, account
+        )
+
+        if resumed:
+            waited = self.telemetry.resume_account(username)
+            self._log(
+                f"Mencoba ulang {nama} setelah lockout ({waited:.0f} detik)", "info"
+            )
+        else:
+            self.telemetry.record_account_start(username)
+        self._update_status(account_id, "processing", 0)
+        self._log(f"Memproses: {nama} ({username})", "info")
+
+        lease = None
+
+        try:
+            # 1. Check Internet
+            if not await self._check_connection("setup browser", username):
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "connection_timeout",
+                    f"Timeout koneksi internet untuk {nama}",
+                )
+                return False
+
+            # 2. Setup Context
+            self._update_status(account_id, "processing", 10)
+            self._log(f"Setup browser untuk {nama}...", "info")
+
+            self.telemetry.start_operation("browser_setup", username)
+            lease = await browser_pool.acquire()
+            page = lease.page if lease else None
+            self.telemetry.end_operation("browser_setup", username)
+
+            if not page:
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "browser_setup_failed",
+                    f"Gagal setup browser untuk {nama}",
+                )
+                return False
+
+            # 3. Login
+            if not await self._check_connection("login", username):
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "connection_timeout_login",
+                    f"Timeout koneksi sebelum login untuk {nama}",
+                )
+                return False
+
+            self._update_status(account_id, "processing", 30)
+            self._log(f"Login untuk {nama}...", "info")
+
+            self.telemetry.start_operation("login", username)
+
+            max_retries = 1
+            success = False
+            gagal_info = {}
+            for attempt in range(max_retries + 1):
+                if attempt > 0:
+                    self._log(
+                        f"Login gagal, mencoba ulang proses login untuk {nama}...",
+                        "warning",
+                    )
+                    await asyncio.sleep(2.0)
+
+                success, gagal_info = await login_direct_async(
+                    page, username, pin, wait_on_lockout=False
+                )
+                # Lockout: retry langsung percuma sebelum cooldown selesai
+                if success or gagal_info.get("retry_after"):
+                    break
+
+            self.telemetry.end_operation("login", username)
+
+            retry_after = gagal_info.get("retry_after")
+            if not success and retry_after:
+                if self._park_account(idx, account, username, retry_after):
+                    self._update_status(account_id, "waiting", 30)
+                    self._log(
+                        f"{nama} terkunci (Gagal Masuk Akun), diparkir "
+                        f"{retry_after} detik; slot dipakai akun lain",
+                        "warning",
+                    )
+                    return True
+
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "gagal_masuk_akun",
+                    f"Akun {nama} masih terkunci setelah "
+                    f"{MAX_LOCKOUT_RETRIES}x retry",
+                )
+                return False
+
+            if not success:
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "login_failed",
+                    f"Login gagal untuk {nama}",
+                )
+                return False
+
+            self._log(f"Login berhasil untuk {nama}", "success")
+
+            # 4. Get Data
+            if not await self._check_connection("get data", username):
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "connection_timeout_data",
+                    f"Timeout koneksi sebelum ambil data untuk {nama}",
+                )
+                return False
+
+            self._update_status(account_id, "processing", 50)
+            self._log(f"Mengambil stok untuk {nama}...", "info")
+
+            self.telemetry.start_operation("get_stock", username)
+            stok_value = await get_stock_value_async(page)
+            self.telemetry.end_operation("get_stock", username)
+
+            if stok_value:
+                self._log(f"Stok {nama}: {stok_value} tabung", "success")
+            else:
+                self._log(f"Gagal ambil stok untuk {nama}", "warning")
+
+            self._update_status(account_id, "processing", 70)
+            self._log(f"Mengambil data penjualan untuk {nama}...", "info")
+
+            sales = await self._collect_sales_async(page, nama, dates)
+            if sales is None:
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "sales_navigation_failed",
+                    f"Gagal navigasi ke Laporan Penjualan untuk {nama}",
+                )
+                return False
+
+            # 5. Process Result (Excel + Supabase blocking -> executor)
+            self._update_status(account_id, "processing", 90)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None,
+                self._finalize_sales,
+                account_id,
+                username,
+                nama,
+                pangkalan_id,
+                stok_value,
+                sales,
+            )
+
+        except Exception as e:
+            self._handle_failure(
+                account_id,
+                username,
+                nama,
+                "exception",
+                f"Error untuk {nama}: {str(e)}",
+            )
+            self.logger.error(
+                f"Exception processing {nama}: {str(e)}", exc_info=True
+            )
+
+        finally:
+            if lease:
+                await lease.close()
+
+        return False
@@ -19,6 +19,10 @@ DEFAULT_TIMEOUT = 20000  # 20 deti
 NAVIGATION_TIMEOUT = 20000  # 20 detik
 ACTION_TIMEOUT = 10000  # 10 detik
 
+# Launch profile Chromium: "default", "low_memory", atau "max_throughput"
+# Ukur dengan: python -m modules.browser.profile_benchmark
+BROWSER_LAUNCH_PROFILE = "default"
+
 # ============================================
 # PERFORMANCE SETTINGS
 # ============================================
@@ -26,6 +30,23 @@ ACTION_TIMEOUT = 10000  # 10 detik
 # Delay antar akun (dalam detik)
 INTER_ACCOUNT_DELAY = 2.0
 
+# Jumlah akun yang diproses bersamaan (1 = sequential)
+# Setiap worker menjalankan Chromium sendiri, sesuaikan dengan RAM mesin
+MAX_WORKERS = 1
+
+# Jumlah akun berikutnya yang context + halaman login-nya disiapkan lebih dulu
+# per worker selagi akun saat ini diproses. Opsional: 0 = nonaktif (default),
+# 1 cukup untuk menutupi waktu muat halaman login
+PIPELINE_DEPTH = 0
+
+# Engine automation: "sync" (thread per worker), "async" (asyncio, satu event loop)
+# atau "api" (HTTP langsung ke backend portal, fallback ke Playwright per akun)
+AUTOMATION_ENGINE = "sync"
+
+# Jumlah proses shard untuk list akun sangat besar (1 = tanpa sharding)
+# Setiap shard menjalankan ProcessManager + MAX_WORKERS worker sendiri
+NUM_SHARDS = 1
+
 # Delay setelah login (dalam detik)
 POST_LOGIN_DELAY = 1.5
 
@@ -45,6 +66,146 @@ RETRY_DELAY = 2.0
 # Timeout untuk "Gagal Masuk Akun" (dalam detik)
 GAGAL_MASUK_AKUN_TIMEOUT = 120
 
+# Berapa kali akun yang kena "Gagal Masuk Akun" diparkir lalu dicoba ulang
+# setelah GAGAL_MASUK_AKUN_TIMEOUT. Worker memproses akun lain selama menunggu.
+MAX_LOCKOUT_RETRIES = 1
+
+# Batas waktu sinyal login (dalam milliseconds)
+LOGIN_FORM_TIMEOUT = 10000  # field form / tombol MASUK muncul
+LOGIN_OUTCOME_TIMEOUT = 15000  # dashboard atau modal "Gagal Masuk Akun"
+
+# ============================================
+# BROWSER RECYCLING SETTINGS
+# ============================================
+
+# Restart Chromium bersama (BrowserPool) untuk menahan kenaikan memori renderer.
+# 0 = kriteria dinonaktifkan. Kriteria RSS membutuhkan psutil.
+BROWSER_RECYCLE_MAX_CONTEXTS = 50
+BROWSER_RECYCLE_MAX_AGE_MINUTES = 60
+BROWSER_RECYCLE_MAX_RSS_MB = 1500
+
+# ============================================
+# SESSION SETTINGS
+# ============================================
+
+# Simpan storage_state per akun supaya run berikutnya bisa skip login
+SESSION_CACHE_ENABLED = True
+
+# Umur maksimal session tersimpan (dalam jam) sebelum wajib login ulang
+SESSION_TTL_HOURS = 6
+
+# Batas cek session tersimpan (ms): buka dashboard, selesai begitu dashboard
+# siap atau dilempar ke halaman login
+SESSION_CHECK_TIMEOUT = 3000
+
+# ============================================
+# NETWORK ROUTING SETTINGS
+# ============================================
+
+# Aktifkan policy routing request (lihat modules/browser/routing.py)
+# Default False: blokir resource global pernah membuat login gagal
+ROUTE_POLICY_ENABLED = False
+
+# Rule dievaluasi berurutan, rule pertama yang cocok menang.
+# action: "allow" | "block" | "stub"
+# phase: "pre_login" | "post_login" | "any"
+ROUTE_POLICY_RULES = [
+    # Analytics pihak ketiga tidak dibutuhkan automation
+    {"action": "block", "url_pattern": "*google-analytics.com*", "phase": "any"},
+    {"action": "block", "url_pattern": "*googletagmanager.com*", "phase": "any"},
+    {"action": "block", "url_pattern": "*doubleclick.net*", "phase": "any"},
+    # Aset berat hanya diblokir setelah login (halaman login butuh aset lengkap)
+    {
+        "action": "block",
+        "resource_types": ["image", "media", "font"],
+        "phase": "post_login",
+    },
+]
+
+# ============================================
+# STATIC ASSET CACHE SETTINGS
+# ============================================
+
+# Cache JS/CSS/font/gambar situs merchant di disk (opt-in)
+ASSET_CACHE_ENABLED = False
+
+# Batas total ukuran cache (MB), entry paling lama tidak dipakai dibuang (LRU)
+ASSET_CACHE_MAX_MB = 200
+
+# Hanya aset dari host ini yang di-cache
+ASSET_CACHE_HOSTS = ["subsiditepatlpg.mypertamina.id"]
+
+# ============================================
+# NAVIGATION SETTINGS
+# ============================================
+
+# Path SPA per halaman (relatif ke origin portal, cek di address bar).
+# None = dipelajari otomatis dari klik menu pertama yang berhasil
+# (disimpan di cache/stats/page_routes.json)
+PAGE_ROUTE_PATHS = {
+    "dashboard": None,
+    "laporan-penjualan": None,
+    "rekap-penjualan": None,
+    "atur-produk": None,
+}
+
+# Metode navigasi langsung: "pushstate" (client-side, tanpa reload) dan
+# "goto" (load URL). Urutannya menyesuaikan statistik; klik menu selalu
+# dipakai terakhir sebagai fallback.
+NAVIGATION_METHODS = ("pushstate", "goto")
+
+# Batas tunggu halaman siap setelah navigasi (milliseconds)
+NAVIGATION_READY_TIMEOUT = 5000
+
+# Query param filter tanggal di URL Laporan/Rekap Penjualan (awal, akhir),
+# isi jika portal mendukung deep link tanggal. None = pakai kalender
+DATE_FILTER_URL_PARAMS = None
+DATE_FILTER_URL_FORMAT = "%Y-%m-%d"
+
+# Batas tunggu perubahan state kalender per klik (milliseconds)
+CALENDAR_STEP_TIMEOUT = 3000
+
+# ============================================
+# WAIT SETTINGS
+# ============================================
+
+# Batas tunggu default kondisi siap di modules/browser/waits.py (milliseconds).
+# Kondisi yang tidak terpenuhi tidak menggagalkan langkah, hanya dilaporkan.
+WAIT_DEFAULT_TIMEOUT = 5000
+
+# DOM dianggap tenang jika tidak ada mutasi selama sekian milliseconds
+WAIT_DOM_QUIET_MS = 300
+
+# Text elemen dianggap stabil jika tidak berubah selama sekian milliseconds
+WAIT_STABLE_TEXT_MS = 300
+
+# ============================================
+# API ENGINE SETTINGS
+# ============================================
+
+# Backend yang dipanggil SPA portal merchant (cek di DevTools > Network).
+# Ganti API_BASE_URL ke server lokal untuk pengujian tanpa portal asli.
+API_BASE_URL = "https://api-map.my-pertamina.id"
+API_ENDPOINTS = {
+    "login": "/general/v1/users/login",
+    "stock": "/general/v2/products",
+    "sales": "/general/v1/transactions/report",
+}
+
+# Nama field body login dan field payload yang dibaca parser
+API_LOGIN_FIELDS = {"username": "username", "pin": "password"}
+API_TOKEN_KEYS = ("accessToken", "access_token", "token")
+API_STOCK_KEYS = ("stockAvailable", "stock", "stok")
+API_SALES_KEYS = ("totalSold", "total_sold", "tabungTerjual", "totalQuantity")
+
+# Query param tanggal laporan penjualan (awal, akhir) dan formatnya
+API_SALES_DATE_PARAMS = ("startDate", "endDate")
+API_DATE_FORMAT = "%Y-%m-%d"
+
+# Timeout request (detik) dan HTTP/2 (butuh httpx + h2)
+API_TIMEOUT = 15
+API_HTTP2 = True
+
 # ============================================
 # LOGGING SETTINGS
 # ============================================
@@ -102,6 +263,45 @@ MIN_TABUNG_FILTER = 2
 # Timeout untuk wait data load (dalam milliseconds)
 DATA_LOAD_TIMEOUT = 10000
 
+# Ambil stok/penjualan dari response XHR portal sebelum ekstraksi DOM.
+# Opsional (default nonaktif): jika payload tidak dikenali, setiap akun
+# menunggu RESPONSE_CAPTURE_TIMEOUT untuk stok dan untuk setiap tanggal
+# penjualan sebelum fallback ke DOM. Aktifkan setelah API_STOCK_KEYS /
+# API_SALES_KEYS cocok dengan payload portal.
+RESPONSE_CAPTURE_ENABLED = False
+
+# Batas tunggu payload stok/penjualan dari response XHR sebelum fallback ke
+# ekstraksi DOM (dalam milliseconds)
+RESPONSE_CAPTURE_TIMEOUT = 5000
+
+# Harvest kartu customer (Rekap Penjualan): batas tunggu kartu baru setelah
+# scroll (milliseconds) dan berapa putaran tanpa kartu baru sebelum berhenti
+CARD_SCROLL_SETTLE_TIMEOUT = 1500
+CARD_SCROLL_MAX_IDLE_ROUNDS = 2
+
+# Jumlah tab paralel untuk mengambil detail transaksi customer
+DETAIL_FETCH_MAX_TABS = 4
+
+# Urutkan strategi ekstraksi berdasarkan statistik run sebelumnya
+# (strategi tercepat yang berhasil dicoba dulu). False = urutan deklarasi.
+ADAPTIVE_STRATEGY_ORDER = True
+
+# Setelah sekian percobaan per strategi, statistik lama diperkecil setengah
+# supaya urutan cepat menyesuaikan jika tampilan situs berubah
+STRATEGY_STATS_WINDOW = 200
+
+# ============================================
+# TRANSACTION SYNC SETTINGS
+# ============================================
+
+# Sync riwayat transaksi per pangkalan ke SQLite lokal (lihat
+# modules/data/transaction_store.py). Hanya transaksi yang lebih baru dari
+# sync terakhir yang diambil detailnya.
+TRANSACTION_SYNC_ENABLED = False
+
+# Jumlah kartu yang diambil detailnya per putaran sebelum cek high-water mark
+TRANSACTION_SYNC_BATCH = 8
+
 # ============================================
 # EXCEL SETTINGS
 # ============================================
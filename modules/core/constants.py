@@ -18,6 +18,10 @@ BASE_DIR = os.path.dirname(os.path.dirname(CURRENT_DIR))
 AKUN_DIR = os.path.join(BASE_DIR, "akun")
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
 LOGS_DIR = os.path.join(BASE_DIR, "logs")
+SESSIONS_DIR = os.path.join(BASE_DIR, "sessions")
+ASSET_CACHE_DIR = os.path.join(BASE_DIR, "cache", "assets")
+STATS_DIR = os.path.join(BASE_DIR, "cache", "stats")
+TRANSACTION_DB_FILE = os.path.join(RESULTS_DIR, "transactions.sqlite3")
 LOG_FILE = os.path.join(LOGS_DIR, "playwright_automation.log")
 
 # ============================================
@@ -5,21 +5,78 @@ Module ini menangani logika inti dari proses bisnis SnapFlux.
 Memisahkan logika bisnis dari interface (GUI/CLI).
 """
 
+import heapq
 import logging
+import queue
+import threading
 import time
+from collections import deque
 from datetime import datetime
 
-from modules.browser.extractor import get_stock_value_direct, get_tabung_terjual_direct
-from modules.browser.login import login_direct
+from modules.browser.api_client import (
+    ApiAuthError,
+    ApiClientError,
+    create_api_client,
+)
+from modules.browser.extractor import (
+    ResponseCapture,
+    get_stock_value_direct,
+    get_tabung_terjual_direct,
+)
+from modules.browser.login import login_with_session
+from modules.browser.routing import PHASE_POST_LOGIN, create_route_policy
+from modules.browser.session_cache import get_session_cache
 from modules.browser.navigation import (
     click_date_elements_direct,
     click_laporan_penjualan_direct,
+    click_rekap_penjualan_direct,
+)
+from modules.browser.selector_registry import get_selector_registry
+from modules.browser.setup import BrowserPool
+from modules.browser.strategy_stats import get_strategy_stats
+from modules.browser.waits import reset_wait_ledger
+from modules.core.config import (
+    AUTOMATION_ENGINE,
+    HEADLESS_MODE,
+    MAX_LOCKOUT_RETRIES,
+    MAX_WORKERS,
+    PIPELINE_DEPTH,
+    RESPONSE_CAPTURE_ENABLED,
+    TRANSACTION_SYNC_ENABLED,
 )
-from modules.browser.setup import PlaywrightBrowserManager
-from modules.core.config import HEADLESS_MODE
+from modules.core.constants import LOGIN_URL
 from modules.core.network import check_before_step
 from modules.core.telemetry import get_telemetry_manager
+from modules.core.utils import parse_date_list
 from modules.data.excel import save_to_excel_pivot_format
+from modules.data.export import export_multi_date_results
+from modules.data.transaction_store import sync_transactions
+
+# File Excel master dipakai bersama oleh semua worker dalam satu proses.
+# Lock ini tidak berlaku lintas proses: pada mode shard hanya proses induk
+# yang menulis Excel (lihat ShardedRunner)
+_excel_lock = threading.Lock()
+
+
+def save_result_to_excel(result):
+    """
+    Simpan satu hasil (format _finalize_account) ke file master Excel
+
+    Args:
+        result (dict): Hasil akun dengan key pangkalan_id, nama, tanggal,
+            stok, tabung_terjual dan status
+    """
+    save_date = datetime.strptime(result["tanggal"], "%Y-%m-%d")
+    with _excel_lock:
+        save_to_excel_pivot_format(
+            pangkalan_id=result["pangkalan_id"],
+            nama_pangkalan=result["nama"],
+            tanggal_check=result["tanggal"],
+            stok_awal=result["stok"],
+            total_inputan=result["tabung_terjual"],
+            status=result["status"],
+            selected_date=save_date,
+        )
 
 
 class ProcessManager:
@@ -28,7 +85,7 @@ class ProcessManager:
     Dapat digunakan oleh GUI maupun CLI.
     """
 
-    def __init__(self, callbacks=None, supabase_client=None):
+    def __init__(self, callbacks=None, supabase_client=None, save_excel=True):
         """
         Inisialisasi ProcessManager
 
@@ -39,19 +96,43 @@ class ProcessManager:
                 - on_account_status(account_id, status, progress)
                 - on_result(result_data)
             supabase_client: Instance SupabaseManager untuk update database
+            save_excel (bool): Tulis hasil ke file master Excel. False jika
+                penulisan dilakukan pemanggil dari on_result (mode shard)
         """
         self.callbacks = callbacks or {}
         self.supabase_client = supabase_client
+        self.save_excel = save_excel
         self.stop_requested = False
         self.pause_requested = False
         self.logger = logging.getLogger("process_manager")
         self.telemetry = get_telemetry_manager()
         self.results = []
 
+        # Locks untuk state bersama saat akun diproses paralel
+        self._results_lock = threading.Lock()
+        self._callback_lock = threading.RLock()
+        self._supabase_lock = threading.Lock()
+        self._completed = 0
+        self.session_cache = None
+
+        # Deferred retry queue: akun yang kena lockout "Gagal Masuk Akun"
+        # diparkir di heap (not_before, seq, idx, account) selagi worker
+        # memproses akun lain
+        self._deferred = []
+        self._deferred_seq = 0
+        self._deferred_lock = threading.Lock()
+        self._lockout_attempts = {}
+
+    def _emit(self, name, *args):
+        """Panggil callback UI secara serial (aman dipanggil dari banyak worker)"""
+        callback = self.callbacks.get(name)
+        if callback:
+            with self._callback_lock:
+                callback(*args)
+
     def _log(self, message, level="info"):
         """Internal helper untuk logging ke callback dan file"""
-        if self.callbacks.get("on_log"):
-            self.callbacks["on_log"](message, level)
+        self._emit("on_log", message, level)
 
         # Log to file based on level
         if level == "error":
@@ -63,13 +144,11 @@ class ProcessManager:
 
     def _update_status(self, account_id, status, progress):
         """Update status akun di UI"""
-        if self.callbacks.get("on_account_status"):
-            self.callbacks["on_account_status"](account_id, status, progress)
+        self._emit("on_account_status", account_id, status, progress)
 
     def _update_progress(self, current, total, percent):
         """Update progress bar global"""
-        if self.callbacks.get("on_progress"):
-            self.callbacks["on_progress"](current, total, percent)
+        self._emit("on_progress", current, total, percent)
 
     def stop(self):
         """Request stop process"""
@@ -92,322 +171,1044 @@ class ProcessManager:
 
         Args:
             accounts (list): List akun [{id, nama, username, pin}, ...]
-            settings (dict): Settings {headless, date, delay, ...}
+            settings (dict): Settings {headless, date, delay, max_workers, ...}
+                - max_workers (int): Jumlah akun yang diproses bersamaan.
+                  Setiap worker punya Chromium sendiri dan context per akun.
+                - engine (str): "api" = ambil data lewat HTTP API tanpa Chromium,
+                  akun yang gagal lewat API diproses ulang dengan Playwright
+                - dates (list/dict): Multi-tanggal, list tanggal atau rentang
+                  {"start", "end"}. Setiap akun login sekali lalu filter tanggal
+                  diganti di Laporan Penjualan; satu hasil per (akun, tanggal)
+                - response_capture (bool): Ambil stok/penjualan dari response XHR
+                  sebelum DOM. Default RESPONSE_CAPTURE_ENABLED (nonaktif)
 
         Returns:
-            list: List hasil proses
+            list: List hasil proses (satu per akun per tanggal)
         """
         self.stop_requested = False
         self.results = []
+        self._completed = 0
+        self._deferred = []
+        self._deferred_seq = 0
+        self._lockout_attempts = {}
         self.telemetry.reset()
 
         headless_mode = settings.get("headless", HEADLESS_MODE)
         delay = settings.get("delay", 2.0)
         selected_date = settings.get("date_obj")  # Expecting datetime object or None
+        max_workers = max(1, int(settings.get("max_workers") or MAX_WORKERS))
+
+        dates = self._run_dates(settings, selected_date)
+
+        # Session cache (storage_state per akun) untuk skip login berulang
+        self.session_cache = (
+            get_session_cache() if settings.get("use_session", True) else None
+        )
+        if self.session_cache:
+            self.session_cache.evict_expired()
+
+        engine = settings.get("engine", AUTOMATION_ENGINE)
+        pipeline_depth = max(0, int(settings.get("pipeline_depth", PIPELINE_DEPTH)))
+        if engine == "api":
+            # Chromium hanya dipakai untuk fallback, prewarm tidak ada gunanya
+            pipeline_depth = 0
 
         total_accounts = len(accounts)
-        self._log(f"Memulai proses untuk {total_accounts} akun...", "info")
+        max_workers = min(max_workers, total_accounts) or 1
+        self._log(
+            f"Memulai proses untuk {total_accounts} akun ({max_workers} worker)...",
+            "info",
+        )
 
+        account_queue = queue.Queue()
         for idx, account in enumerate(accounts):
-            # Check stop
+            account_queue.put((idx, account))
+
+        run_options = {
+            "headless": headless_mode,
+            "delay": delay,
+            "selected_date": dates[0],
+            "dates": dates,
+            "total": total_accounts,
+            "pipeline_depth": pipeline_depth,
+            "launch_profile": settings.get("launch_profile"),
+            "engine": engine,
+            "response_capture": settings.get(
+                "response_capture", RESPONSE_CAPTURE_ENABLED
+            ),
+        }
+
+        if max_workers == 1:
+            # Mode sequential: jalan di thread pemanggil seperti sebelumnya
+            self._worker_loop(account_queue, run_options)
+        else:
+            workers = [
+                threading.Thread(
+                    target=self._worker_loop,
+                    args=(account_queue, run_options),
+                    name=f"snapflux-worker-{n + 1}",
+                    daemon=True,
+                )
+                for n in range(max_workers)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        if self.stop_requested:
+            self._log("Proses dihentikan oleh user", "error")
+            self._fail_deferred_accounts(total_accounts)
+
+        # Statistik strategi ekstraksi & selector untuk urutan adaptif run berikutnya
+        get_strategy_stats().save()
+        dead_selectors = get_selector_registry().dead_selectors()
+        if dead_selectors:
+            self._log(
+                f"{len(dead_selectors)} selector tidak pernah cocok "
+                "(cek: python -m modules.browser.selector_registry)",
+                "warning",
+            )
+
+        lockout_stats = self.telemetry.get_operation_stats("lockout_wait")
+        if lockout_stats["count"]:
+            self._log(
+                f"Akun diparkir karena lockout: {lockout_stats['count']}x, "
+                f"total tunggu {lockout_stats['total']:.0f} detik "
+                "(tidak dihitung sebagai waktu proses)",
+                "info",
+            )
+
+        self._report_run_end(dates, total_accounts)
+        return self.results
+
+    @staticmethod
+    def _run_dates(settings, selected_date):
+        """
+        Daftar tanggal yang diproses per akun. Multi-tanggal: hari ini
+        diproses dulu (default halaman, tanpa filter)
+
+        Returns:
+            list: datetime/None (None = hari ini), minimal satu elemen
+        """
+        dates = parse_date_list(settings.get("dates")) or [selected_date]
+        today = datetime.now().date()
+        dates.sort(key=lambda d: (d is not None and d.date() != today, d or datetime.min))
+        return dates
+
+    def _report_run_end(self, dates, total_accounts):
+        """Export hasil multi-tanggal (jika ada) dan log ringkasan akhir run"""
+        if len(dates) > 1 and self.results:
+            export_dates = [d or datetime.now() for d in dates]
+            export_path = export_multi_date_results(self.results_by_date(), export_dates)
+            if export_path:
+                self._log(f"Export multi-tanggal: {export_path}", "success")
+
+            self._log(
+                f"Proses selesai! Total: {len(self.results)} hasil "
+                f"({total_accounts} akun x {len(dates)} tanggal)",
+                "success",
+            )
+            return
+
+        self._log(
+            f"Proses selesai! Total: {len(self.results)} akun berhasil diproses",
+            "success",
+        )
+
+    def results_by_date(self):
+        """
+        Returns:
+            dict: {"YYYY-MM-DD": [hasil, ...]} - format input export_multi_date_results
+        """
+        grouped = {}
+        with self._results_lock:
+            for result in self.results:
+                grouped.setdefault(result["tanggal"], []).append(result)
+        return grouped
+
+    def _park_account(self, idx, account, username, retry_after):
+        """
+        Parkir akun yang kena lockout di deferred retry queue
+
+        Args:
+            idx (int): Index akun di list input
+            account (dict/tuple): Data akun
+            username (str): Username akun
+            retry_after (float): Detik sampai akun boleh dicoba lagi
+
+        Returns:
+            bool: True jika diparkir, False jika jatah retry lockout sudah habis
+        """
+        with self._deferred_lock:
+            attempts = self._lockout_attempts.get(idx, 0)
+            if attempts >= MAX_LOCKOUT_RETRIES:
+                return False
+            self._lockout_attempts[idx] = attempts + 1
+            self._deferred_seq += 1
+            heapq.heappush(
+                self._deferred,
+                (time.time() + retry_after, self._deferred_seq, idx, account),
+            )
+
+        self.telemetry.park_account(username)
+        return True
+
+    def _pop_ready_deferred(self):
+        """
+        Returns:
+            tuple: (idx, account) akun parkir yang sudah lewat cooldown,
+                   None jika belum ada
+        """
+        with self._deferred_lock:
+            if self._deferred and self._deferred[0][0] <= time.time():
+                _, _, idx, account = heapq.heappop(self._deferred)
+                return idx, account
+        return None
+
+    def _next_deferred_wait(self):
+        """
+        Returns:
+            float: Detik sampai akun parkir berikutnya siap, None jika kosong
+        """
+        with self._deferred_lock:
+            if not self._deferred:
+                return None
+            return max(0.0, self._deferred[0][0] - time.time())
+
+    def _fail_deferred_accounts(self, total_accounts):
+        """Tandai akun yang masih diparkir saat stop sebagai gagal"""
+        with self._deferred_lock:
+            parked = [(idx, account) for _, _, idx, account in self._deferred]
+            self._deferred = []
+
+        for idx, account in parked:
+            account_id, nama, username, _, _ = self._parse_account(idx, account)
+            self.telemetry.resume_account(username)
+            self._handle_failure(
+                account_id,
+                username,
+                nama,
+                "gagal_masuk_akun",
+                f"Akun {nama} masih terkunci saat proses dihentikan",
+            )
+            self._mark_completed(total_accounts)
+
+    def _wait_if_paused(self):
+        """
+        Tahan worker selama proses dipause
+
+        Returns:
+            bool: False jika stop diminta selama pause
+        """
+        while self.pause_requested:
+            time.sleep(0.5)
             if self.stop_requested:
-                self._log("Proses dihentikan oleh user", "error")
-                break
+                return False
+        return not self.stop_requested
+
+    def _mark_completed(self, total_accounts):
+        """Naikkan counter akun selesai dan update progress bar global"""
+        with self._results_lock:
+            self._completed += 1
+            completed = self._completed
+        percent = int((completed / total_accounts) * 100) if total_accounts else 100
+        self._update_progress(completed, total_accounts, percent)
 
-            # Check pause
-            while self.pause_requested:
-                time.sleep(0.5)
-                if self.stop_requested:
+    def _worker_loop(self, account_queue, run_options):
+        """
+        Loop satu worker: ambil akun dari queue sampai habis atau stop diminta.
+        Playwright sync API terikat ke thread, jadi setiap worker membuat
+        BrowserPool (Chromium) sendiri dan memakai context baru per akun.
+
+        Args:
+            account_queue (queue.Queue): Queue berisi (idx, account)
+            run_options (dict): Opsi run (headless, delay, selected_date, total)
+
+        Akun yang kena lockout tidak memblok worker: akun diparkir di deferred
+        retry queue dan worker lanjut ke akun lain sampai cooldown selesai.
+        """
+        # Chromium baru diluncurkan saat context pertama dibutuhkan, jadi run
+        # engine "api" yang semuanya berhasil tidak pernah membuka browser
+        browser_pool = BrowserPool(
+            headless=run_options["headless"], profile=run_options["launch_profile"]
+        )
+        api_client = create_api_client() if run_options["engine"] == "api" else None
+
+        # Look-ahead: akun berikutnya yang context + halaman login-nya sudah
+        # disiapkan selagi akun saat ini diproses
+        pipeline = deque()
+        pipeline_depth = run_options["pipeline_depth"]
+
+        try:
+            while not self.stop_requested:
+                if not self._wait_if_paused():
                     break
 
-            # Extract account info
-            # Handle both dictionary (GUI) and tuple/list (CLI) formats
-            if isinstance(account, dict):
-                account_id = account.get("id", idx)
-                nama = account["nama"]
-                username = account["username"]
-                pin = account["pin"]
-                pangkalan_id = account.get(
-                    "pangkalan_id", username
-                )  # Get Pangkalan_id or fallback to username
-            else:
-                # Assuming tuple format (nama, username, pin, pangkalan_id) or old format (nama, username, pin)
-                account_id = idx
-                if len(account) >= 4:
-                    nama = account[0]
-                    username = account[1]
-                    pin = account[2]
-                    pangkalan_id = account[3]
+                # Urutan: pipeline (sudah prewarm) -> akun parkir yang sudah
+                # lewat cooldown -> akun baru dari queue
+                resumed = False
+                prewarmed = None
+                if pipeline:
+                    idx, account, prewarmed = pipeline.popleft()
                 else:
-                    nama = account[0]
-                    username = account[1]
-                    pin = account[2]
-                    pangkalan_id = username  # Fallback to username for old format
+                    ready = self._pop_ready_deferred()
+                    if ready:
+                        idx, account = ready
+                        resumed = True
+                    else:
+                        try:
+                            idx, account = account_queue.get_nowait()
+                        except queue.Empty:
+                            wait = self._next_deferred_wait()
+                            if wait is None:
+                                break
+                            # Hanya tersisa akun parkir: tunggu sebentar lalu cek lagi
+                            time.sleep(min(1.0, wait))
+                            continue
+
+                # Isi pipeline sebelum akun ini mulai: browser memuat halaman
+                # login akun berikutnya di background selama akun ini login/ekstrak
+                while len(pipeline) < pipeline_depth and not self.stop_requested:
+                    try:
+                        next_idx, next_account = account_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    pipeline.append(
+                        (
+                            next_idx,
+                            next_account,
+                            self._prewarm_account(next_idx, next_account, browser_pool),
+                        )
+                    )
+
+                parked = self._process_account(
+                    idx,
+                    account,
+                    browser_pool,
+                    run_options,
+                    prewarmed=prewarmed,
+                    resumed=resumed,
+                    api_client=api_client,
+                )
+                if not parked:
+                    self._mark_completed(run_options["total"])
+
+                # Delay antar akun (per worker)
+                delay = run_options["delay"]
+                has_next = bool(pipeline) or not account_queue.empty()
+                if delay and has_next and not self.stop_requested:
+                    self._log(f"Delay {delay} detik...", "info")
+                    time.sleep(delay)
+        finally:
+            # Akun di pipeline yang tidak sempat diproses (stop diminta):
+            # tutup context prewarm dan tandai akun masih menunggu di UI
+            for pending_idx, pending_account, prewarmed in pipeline:
+                if prewarmed:
+                    prewarmed["lease"].close()
+                account_id, nama, _, _, _ = self._parse_account(
+                    pending_idx, pending_account
+                )
+                self._update_status(account_id, "waiting", 0)
+                self._log(f"{nama} belum diproses (dihentikan)", "warning")
+            if api_client:
+                api_client.close()
+            browser_pool.close()
+
+    def _prewarm_account(self, idx, account, browser_pool):
+        """
+        Siapkan context akun berikutnya dan mulai muat halaman login tanpa
+        menunggu selesai (wait_until="commit"), sehingga loading berjalan di
+        browser selagi akun sebelumnya masih diproses.
+
+        Args:
+            idx (int): Index akun di list input
+            account (dict/tuple): Data akun
+            browser_pool (BrowserPool): Pool browser milik worker ini
+
+        Returns:
+            dict: {lease, storage_state, route_policy}, None jika gagal
+                  (akun akan diproses tanpa prewarm)
+        """
+        _, _, username, _, _ = self._parse_account(idx, account)
+
+        try:
+            storage_state = (
+                self.session_cache.load(username) if self.session_cache else None
+            )
+            route_policy = create_route_policy()
+
+            started_at = time.time()
+            lease = browser_pool.acquire(
+                storage_state=storage_state, route_policy=route_policy
+            )
+            if lease is None:
+                return None
+
+            lease.page.goto(LOGIN_URL, wait_until="commit")
+            self.telemetry.record_duration("prewarm", time.time() - started_at)
+
+            return {
+                "lease": lease,
+                "storage_state": storage_state,
+                "route_policy": route_policy,
+            }
+
+        except Exception as e:
+            self.logger.warning(f"Prewarm gagal untuk {username}: {str(e)}")
+            return None
 
-            # Start processing account
+    def _process_account(
+        self,
+        idx,
+        account,
+        browser_pool,
+        run_options,
+        prewarmed=None,
+        resumed=False,
+        api_client=None,
+    ):
+        """
+        Proses satu akun: setup context, login, ambil stok & penjualan, simpan hasil
+
+        Args:
+            idx (int): Index akun di list input
+            account (dict/tuple): Data akun
+            browser_pool (BrowserPool): Pool browser milik worker ini
+            run_options (dict): Opsi run (headless, selected_date, ...)
+            prewarmed (dict): Hasil _prewarm_account (context + halaman login
+                sudah disiapkan), None untuk setup normal
+            resumed (bool): True jika akun diambil dari deferred retry queue
+            api_client (MerchantApiClient): Client engine "api" milik worker;
+                jika diisi, akun dicoba lewat API dulu sebelum Playwright
+
+        Returns:
+            bool: True jika akun diparkir (lockout) dan akan dicoba lagi nanti
+        """
+        headless_mode = run_options["headless"]
+        dates = run_options.get("dates") or [run_options["selected_date"]]
+
+        account_id, nama, username, pin, pangkalan_id = self._parse_account(
+            idx, account
+        )
+
+        # Start processing account
+        if resumed:
+            waited = self.telemetry.resume_account(username)
+            self._log(
+                f"Mencoba ulang {nama} setelah lockout ({waited:.0f} detik)", "info"
+            )
+        else:
             self.telemetry.record_account_start(username)
-            progress_percent = int((idx / total_accounts) * 100)
-            self._update_progress(idx, total_accounts, progress_percent)
-            self._update_status(account_id, "processing", 0)
-            self._log(f"Memproses: {nama} ({username})", "info")
+        self._update_status(account_id, "processing", 0)
+        self._log(f"Memproses: {nama} ({username})", "info")
+
+        if api_client and not resumed and self._process_account_api(
+            api_client, account_id, username, nama, pin, pangkalan_id, dates
+        ):
+            return False
 
+        if prewarmed:
+            browser_manager = prewarmed["lease"]
+            route_policy = prewarmed["route_policy"]
+        else:
             browser_manager = None
+            route_policy = create_route_policy()
+        capture = None
+        wait_ledger = reset_wait_ledger()
 
-            try:
-                # 1. Check Internet
-                if not check_before_step(
-                    "setup browser",
+        try:
+            # 1. Check Internet
+            if not check_before_step(
+                "setup browser",
+                username,
+                max_wait=300,
+                log_callback=lambda m, l: self._log(m, l),
+            ):
+                self._handle_failure(
+                    account_id,
                     username,
-                    max_wait=300,
-                    log_callback=lambda m, l: self._log(m, l),
-                ):
-                    self._handle_failure(
-                        account_id,
-                        username,
-                        nama,
-                        "connection_timeout",
-                        f"Timeout koneksi internet untuk {nama}",
-                    )
-                    continue
+                    nama,
+                    "connection_timeout",
+                    f"Timeout koneksi internet untuk {nama}",
+                )
+                return False
 
-                # 2. Setup Browser
-                self._update_status(account_id, "processing", 10)
-                self._log(f"Setup browser untuk {nama}...", "info")
+            # 2. Setup Browser
+            self._update_status(account_id, "processing", 10)
+            self._log(f"Setup browser untuk {nama}...", "info")
+
+            if prewarmed:
+                storage_state = prewarmed["storage_state"]
+            else:
+                storage_state = (
+                    self.session_cache.load(username) if self.session_cache else None
+                )
 
                 self.telemetry.start_operation("browser_setup", username)
-                browser_manager = PlaywrightBrowserManager()
-                page = browser_manager.setup_browser(
-                    headless=headless_mode, use_session=False
+                browser_manager = browser_pool.acquire(
+                    storage_state=storage_state, route_policy=route_policy
                 )
                 self.telemetry.end_operation("browser_setup", username)
 
                 if not headless_mode:
                     time.sleep(2.0)
 
-                if not page:
-                    self._handle_failure(
-                        account_id,
-                        username,
-                        nama,
-                        "browser_setup_failed",
-                        f"Gagal setup browser untuk {nama}",
-                    )
-                    continue
+            page = browser_manager.page if browser_manager else None
 
-                # 3. Login
-                if not check_before_step(
-                    "login",
+            if not page:
+                self._handle_failure(
+                    account_id,
                     username,
-                    max_wait=300,
-                    log_callback=lambda m, l: self._log(m, l),
-                ):
-                    self._handle_failure(
-                        account_id,
-                        username,
-                        nama,
-                        "connection_timeout_login",
-                        f"Timeout koneksi sebelum login untuk {nama}",
-                    )
-                    browser_manager.close()
-                    continue
-
-                self._update_status(account_id, "processing", 30)
-                self._log(f"Login untuk {nama}...", "info")
-
-                self.telemetry.start_operation("login", username)
+                    nama,
+                    "browser_setup_failed",
+                    f"Gagal setup browser untuk {nama}",
+                )
+                return False
 
-                # Retry mechanism for login
-                max_retries = 1
-                success = False
-                gagal_info = {}
+            # Subscribe response XHR sebelum login: payload stok dashboard
+            # tiba segera setelah redirect ke dashboard
+            if run_options["response_capture"]:
+                capture = ResponseCapture()
+                capture.attach(page)
 
-                for attempt in range(max_retries + 1):
-                    if attempt > 0:
-                        self._log(
-                            f"Login gagal, mencoba ulang proses login untuk {nama}...",
-                            "warning",
-                        )
-                        time.sleep(2.0)
+            # 3. Login
+            if not check_before_step(
+                "login",
+                username,
+                max_wait=300,
+                log_callback=lambda m, l: self._log(m, l),
+            ):
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "connection_timeout_login",
+                    f"Timeout koneksi sebelum login untuk {nama}",
+                )
+                browser_manager.close()
+                return False
 
-                    success, gagal_info = login_direct(page, username, pin)
+            self._update_status(account_id, "processing", 30)
+            self._log(f"Login untuk {nama}...", "info")
 
-                    if success:
-                        break
+            self.telemetry.start_operation("login", username)
 
-                self.telemetry.end_operation("login", username)
+            # Retry mechanism for login
+            max_retries = 1
+            success = False
+            gagal_info = {}
 
-                if not success:
-                    self._handle_failure(
-                        account_id,
-                        username,
-                        nama,
-                        "login_failed",
-                        f"Login gagal untuk {nama}",
+            for attempt in range(max_retries + 1):
+                if attempt > 0:
+                    self._log(
+                        f"Login gagal, mencoba ulang proses login untuk {nama}...",
+                        "warning",
                     )
-                    browser_manager.close()
-                    continue
-
-                self._log(f"Login berhasil untuk {nama}", "success")
+                    time.sleep(2.0)
 
-                # 4. Get Data
-                if not check_before_step(
-                    "get data",
+                success, gagal_info = login_with_session(
+                    page,
                     username,
-                    max_wait=300,
-                    log_callback=lambda m, l: self._log(m, l),
-                ):
-                    self._handle_failure(
-                        account_id,
-                        username,
-                        nama,
-                        "connection_timeout_data",
-                        f"Timeout koneksi sebelum ambil data untuk {nama}",
-                    )
-                    browser_manager.close()
-                    continue
+                    pin,
+                    session_cache=self.session_cache,
+                    session_restored=storage_state is not None and attempt == 0,
+                    prewarmed=prewarmed is not None and attempt == 0,
+                    wait_on_lockout=False,
+                )
 
-                # Ambil Stok
-                self._update_status(account_id, "processing", 50)
-                self._log(f"Mengambil stok untuk {nama}...", "info")
+                # Lockout: retry langsung percuma sebelum cooldown selesai
+                if success or gagal_info.get("retry_after"):
+                    break
 
-                self.telemetry.start_operation("get_stock", username)
-                stok_value = get_stock_value_direct(page)
-                self.telemetry.end_operation("get_stock", username)
+            self.telemetry.end_operation("login", username)
 
-                if stok_value:
-                    self._log(f"Stok {nama}: {stok_value} tabung", "success")
-                else:
-                    self._log(f"Gagal ambil stok untuk {nama}", "warning")
-
-                # Ambil Penjualan
-                self._update_status(account_id, "processing", 70)
-                self._log(f"Mengambil data penjualan untuk {nama}...", "info")
-
-                tabung_terjual = None
-                if click_laporan_penjualan_direct(page):
-                    if selected_date:
-                        self._log(
-                            f"Menerapkan filter tanggal: {selected_date.strftime('%d/%m/%Y')}",
-                            "info",
-                        )
-                        if click_date_elements_direct(page, selected_date):
-                            self._log("Filter tanggal berhasil diterapkan", "success")
-                        else:
-                            self._log("Gagal menerapkan filter tanggal", "warning")
-
-                    tabung_terjual = get_tabung_terjual_direct(page)
-                    if tabung_terjual is not None:
-                        self._log(f"Tabung terjual {nama}: {tabung_terjual}", "success")
-                    else:
-                        self._log(f"Gagal ambil tabung terjual untuk {nama}", "warning")
-                else:
+            retry_after = gagal_info.get("retry_after")
+            if not success and retry_after:
+                if self._park_account(idx, account, username, retry_after):
+                    self._update_status(account_id, "waiting", 30)
                     self._log(
-                        f"Gagal navigasi ke Laporan Penjualan untuk {nama}", "warning"
+                        f"{nama} terkunci (Gagal Masuk Akun), diparkir "
+                        f"{retry_after} detik; worker lanjut ke akun lain",
+                        "warning",
                     )
+                    return True
 
-                # 5. Process Result
-                self._update_status(account_id, "processing", 90)
-
-                stok_int = self._safe_int(stok_value)
-                terjual_int = self._safe_int(tabung_terjual)
-
-                stok_formatted = f"{stok_int} Tabung"
-                tabung_formatted = f"{terjual_int} Tabung"
-                status = "Ada Penjualan" if terjual_int > 0 else "Tidak Ada Penjualan"
-
-                result = {
-                    "pangkalan_id": pangkalan_id,  # Use Pangkalan_id instead of username
-                    "nama": nama,
-                    "username": username,
-                    "stok": stok_formatted,
-                    "tabung_terjual": tabung_formatted,
-                    "status": status,
-                    "waktu": 0,  # Bisa ditambahkan perhitungan waktu per akun
-                }
-                self.results.append(result)
-
-                # Save to Excel
-                save_date = selected_date if selected_date else datetime.now()
-                tanggal_check = save_date.strftime("%Y-%m-%d")
-
-                save_to_excel_pivot_format(
-                    pangkalan_id=pangkalan_id,  # Use Pangkalan_id instead of username
-                    nama_pangkalan=nama,
-                    tanggal_check=tanggal_check,
-                    stok_awal=stok_formatted,
-                    total_inputan=tabung_formatted,
-                    status=status,
-                    selected_date=save_date,
+                self._handle_failure(
+                    account_id,
+                    username,
+                    nama,
+                    "gagal_masuk_akun",
+                    f"Akun {nama} masih terkunci setelah "
+                    f"{MAX_LOCKOUT_RETRIES}x retry",
                 )
+                return False
+
+            if success and gagal_info.get("session_reused"):
+                self._log(f"Session tersimpan dipakai untuk {nama}", "info")
 
-                # Telemetry Success
-                self.telemetry.record_account_success(
+            if not success:
+                self._handle_failure(
+                    account_id,
                     username,
-                    {
-                        "stok": stok_formatted,
-                        "terjual": tabung_formatted,
-                        "status": status,
-                    },
+                    nama,
+                    "login_failed",
+                    f"Login gagal untuk {nama}",
                 )
-                self.telemetry.record_business_metrics(stok_int, terjual_int)
-
-                # Update Supabase if client exists
-                if self.supabase_client:
-                    self._log(f"Updating database untuk {username}...", "info")
-                    if self.supabase_client.update_account_result(
-                        username,
-                        stok_formatted,
-                        tabung_formatted,
-                        status,
-                        pangkalan_id=pangkalan_id,
-                    ):
-                        self._log("Database updated", "success")
-                    else:
-                        self._log("Gagal update database", "warning")
+                browser_manager.close()
+                return False
 
-                # Call callback for result
-                if self.callbacks.get("on_result"):
-                    self.callbacks["on_result"](result)
+            self._log(f"Login berhasil untuk {nama}", "success")
 
-                self._update_status(
+            # Aturan routing post_login (blokir aset berat) mulai berlaku
+            if route_policy:
+                route_policy.set_phase(PHASE_POST_LOGIN)
+
+            # 4. Get Data
+            if not check_before_step(
+                "get data",
+                username,
+                max_wait=300,
+                log_callback=lambda m, l: self._log(m, l),
+            ):
+                self._handle_failure(
                     account_id,
-                    "done|Berhasil",
-                    100,
-                )
-                self._log(
-                    f"Selesai: {nama} - Stok: {stok_formatted}, Terjual: {tabung_formatted}",
-                    "success",
+                    username,
+                    nama,
+                    "connection_timeout_data",
+                    f"Timeout koneksi sebelum ambil data untuk {nama}",
                 )
-                self._update_progress(idx + 1, total_accounts, progress_percent)
+                browser_manager.close()
+                return False
+
+            # Ambil Stok
+            self._update_status(account_id, "processing", 50)
+            self._log(f"Mengambil stok untuk {nama}...", "info")
+
+            self.telemetry.start_operation("get_stock", username)
+            stok_value = get_stock_value_direct(page, capture=capture)
+            self.telemetry.end_operation("get_stock", username)
+
+            if stok_value:
+                self._log(f"Stok {nama}: {stok_value} tabung", "success")
+            else:
+                self._log(f"Gagal ambil stok untuk {nama}", "warning")
+
+            # Ambil Penjualan
+            self._update_status(account_id, "processing", 70)
+            self._log(f"Mengambil data penjualan untuk {nama}...", "info")
 
-            except Exception as e:
+            sales = self._collect_sales(page, capture, nama, dates)
+            if sales is None:
                 self._handle_failure(
                     account_id,
                     username,
                     nama,
-                    "exception",
-                    f"Error untuk {nama}: {str(e)}",
+                    "sales_navigation_failed",
+                    f"Gagal navigasi ke Laporan Penjualan untuk {nama}",
                 )
-                self.logger.error(
-                    f"Exception processing {nama}: {str(e)}", exc_info=True
+                return False
+
+            if TRANSACTION_SYNC_ENABLED and any(
+                self._safe_int(terjual) > 0 for _, terjual in sales
+            ):
+                self._sync_transactions(page, username, nama, pangkalan_id)
+
+            # 5. Process Result
+            self._update_status(account_id, "processing", 90)
+            self._finalize_sales(
+                account_id, username, nama, pangkalan_id, stok_value, sales
+            )
+
+        except Exception as e:
+            self._handle_failure(
+                account_id,
+                username,
+                nama,
+                "exception",
+                f"Error untuk {nama}: {str(e)}",
+            )
+            self.logger.error(
+                f"Exception processing {nama}: {str(e)}", exc_info=True
+            )
+
+        finally:
+            if not headless_mode:
+                time.sleep(1.0)
+            if capture:
+                capture.detach()
+                capture.record_to_telemetry(self.telemetry, username)
+            if browser_manager:
+                browser_manager.close()
+            if route_policy:
+                stats = route_policy.record_to_telemetry(self.telemetry, username)
+                self.logger.info(
+                    f"Routing {username}: {stats['requests_blocked']} diblokir, "
+                    f"{stats['requests_stubbed']} di-stub, "
+                    f"~{stats['bytes_saved'] // 1024} KB dihemat"
+                )
+            waits = wait_ledger.record_to_telemetry(self.telemetry, username)
+            if waits["replaced"]:
+                self.logger.info(
+                    f"Wait {username}: {waits['saved']:.1f} detik sleep dihemat "
+                    f"({waits['replaced']:.1f} diganti, {waits['waited']:.1f} ditunggu, "
+                    f"{waits['timeouts']} timeout)"
                 )
 
-            finally:
-                if not headless_mode:
-                    time.sleep(1.0)
-                if browser_manager:
-                    browser_manager.close()
+        return False
 
-                # Delay antar akun
-                if idx < total_accounts - 1 and not self.stop_requested:
-                    self._log(f"Delay {delay} detik...", "info")
-                    time.sleep(delay)
+    def _collect_sales(self, page, capture, nama, dates):
+        """
+        Buka Laporan Penjualan sekali lalu ambil tabung terjual untuk setiap
+        tanggal; filter tanggal diganti di halaman yang sama tanpa login ulang
+
+        Args:
+            page (Page): Page yang sudah login
+            capture (ResponseCapture): Capture XHR milik page
+            nama (str): Nama pangkalan (untuk log)
+            dates (list): Tanggal (datetime/None = hari ini), hari ini di depan
+
+        Returns:
+            list: [(tanggal, tabung_terjual)] sesuai urutan dates. Pada mode
+                  multi-tanggal, tanggal yang filternya gagal dilewati.
+                  None jika Laporan Penjualan tidak bisa dibuka (semua tanggal
+                  gagal, bukan 0 terjual)
+        """
+        multi_date = len(dates) > 1
+
+        if not click_laporan_penjualan_direct(page):
+            return None
+
+        sales = []
+        for selected_date in dates:
+            if selected_date:
+                self._log(
+                    f"Menerapkan filter tanggal: {selected_date.strftime('%d/%m/%Y')}",
+                    "info",
+                )
+                # Total penjualan tanggal sebelumnya tidak berlaku lagi
+                if capture:
+                    capture.reset_sales()
+                applied = click_date_elements_direct(page, selected_date)
+                if not self._accept_date_filter(selected_date, applied, multi_date):
+                    continue
+
+            tabung_terjual = get_tabung_terjual_direct(page, capture=capture)
+            self._log_tabung_terjual(nama, tabung_terjual)
+            sales.append((selected_date, tabung_terjual))
+
+        return sales
+
+    def _accept_date_filter(self, selected_date, applied, multi_date):
+        """
+        Aturan hasil filter tanggal (dipakai semua engine browser)
+
+        Args:
+            selected_date (datetime): Tanggal yang difilter
+            applied (bool): Filter berhasil diterapkan
+            multi_date (bool): Mode multi-tanggal
+
+        Returns:
+            bool: True jika angka penjualan tanggal ini boleh dibaca. Pada mode
+                  multi-tanggal, angka setelah filter gagal masih milik tanggal
+                  sebelumnya sehingga tanggal dilewati.
+        """
+        if applied:
+            self._log("Filter tanggal berhasil diterapkan", "success")
+            return True
+        if multi_date:
+            self._log(
+                f"Gagal menerapkan filter {selected_date.strftime('%d/%m/%Y')}, "
+                "tanggal dilewati",
+                "warning",
+            )
+            self.telemetry.increment_counter("date_filter_skipped")
+            return False
+        self._log("Gagal menerapkan filter tanggal", "warning")
+        return True
+
+    def _log_tabung_terjual(self, nama, tabung_terjual):
+        """Log hasil ekstraksi tabung terjual satu tanggal"""
+        if tabung_terjual is not None:
+            self._log(f"Tabung terjual {nama}: {tabung_terjual}", "success")
+        else:
+            self._log(f"Gagal ambil tabung terjual untuk {nama}", "warning")
+
+    def _finalize_sales(self, account_id, username, nama, pangkalan_id, stok_value, sales):
+        """
+        Simpan hasil semua tanggal satu akun (satu hasil per tanggal). Status
+        akun dan telemetry sukses dicatat sekali pada tanggal terakhir.
+
+        Args:
+            sales (list): [(tanggal, tabung_terjual)] hasil _collect_sales
+
+        Returns:
+            bool: False jika tidak ada tanggal yang berhasil (akun ditandai gagal)
+        """
+        if not sales:
+            self._handle_failure(
+                account_id,
+                username,
+                nama,
+                "date_filter_failed",
+                f"Filter tanggal gagal untuk semua tanggal {nama}",
+            )
+            return False
+
+        for sale_idx, (selected_date, tabung_terjual) in enumerate(sales):
+            self._finalize_account(
+                account_id,
+                username,
+                nama,
+                pangkalan_id,
+                stok_value,
+                tabung_terjual,
+                selected_date,
+                final=sale_idx == len(sales) - 1,
+                update_database=len(sales) == 1 or self._is_today(selected_date),
+            )
+        return True
+
+    def _sync_transactions(self, page, username, nama, pangkalan_id):
+        """
+        Buka Rekap Penjualan dan sync transaksi baru pangkalan ke database lokal.
+        Gagal sync tidak menggagalkan akun (stok/terjual sudah didapat).
+        """
+        try:
+            if not click_rekap_penjualan_direct(page):
+                self._log(f"Gagal membuka Rekap Penjualan untuk {nama}", "warning")
+                return
+
+            self.telemetry.start_operation("sync_transactions", username)
+            summary = sync_transactions(page, pangkalan_id)
+            self.telemetry.end_operation("sync_transactions", username)
+
+            self._log(
+                f"Sync transaksi {nama}: {summary['new']} baru, {summary['failed']} gagal",
+                "success" if not summary["failed"] else "warning",
+            )
+        except Exception as e:
+            self._log(f"Sync transaksi gagal untuk {nama}: {str(e)}", "warning")
+            self.logger.error(f"Error sync transaksi {nama}: {str(e)}", exc_info=True)
+
+    def _process_account_api(
+        self, api_client, account_id, username, nama, pin, pangkalan_id, dates
+    ):
+        """
+        Ambil stok & penjualan satu akun lewat HTTP API (tanpa Chromium),
+        satu login untuk semua tanggal
+
+        Returns:
+            bool: True jika akun sudah selesai (hasil disimpan, atau login
+                  ditolak dan akun ditandai gagal), False jika harus
+                  fallback ke Playwright
+        """
+        self._update_status(account_id, "processing", 30)
+        self._log(f"Mengambil data via API untuk {nama}...", "info")
+
+        self.telemetry.start_operation("api_fetch", username)
+        try:
+            token = api_client.login(username, pin)
+        except ApiAuthError as e:
+            # PIN ditolak: login browser hanya menambah percobaan PIN salah
+            # dan mempercepat lockout "Gagal Masuk Akun"
+            self.telemetry.end_operation("api_fetch", username)
+            self._handle_failure(
+                account_id,
+                username,
+                nama,
+                "api_login_rejected",
+                f"Login API ditolak untuk {nama} ({str(e)}), "
+                "tidak dicoba ulang via browser",
+            )
+            return True
+        except ApiClientError as e:
+            self.telemetry.end_operation("api_fetch", username)
+            self.telemetry.increment_counter("api_fallback")
+            self._log(
+                f"API gagal untuk {nama} ({str(e)}), fallback ke browser", "warning"
+            )
+            return False
+
+        try:
+            stok = api_client.get_stock(token)
+            sales = [
+                (selected_date, api_client.get_tabung_terjual(token, selected_date))
+                for selected_date in dates
+            ]
+        except ApiClientError as e:
+            self.telemetry.end_operation("api_fetch", username)
+            self.telemetry.increment_counter("api_fallback")
+            self._log(
+                f"API gagal untuk {nama} ({str(e)}), fallback ke browser", "warning"
+            )
+            return False
+        self.telemetry.end_operation("api_fetch", username)
+        self.telemetry.increment_counter("api_success")
 
         self._log(
-            f"Proses selesai! Total: {len(self.results)} akun berhasil diproses",
+            f"Stok {nama}: {stok} tabung, terjual: "
+            f"{', '.join(str(terjual) for _, terjual in sales)} (API)",
             "success",
         )
-        return self.results
+        self._update_status(account_id, "processing", 90)
+        try:
+            self._finalize_sales(account_id, username, nama, pangkalan_id, stok, sales)
+        except Exception as e:
+            # Data sudah didapat, gagal simpan bukan alasan untuk login ulang via browser
+            self._handle_failure(
+                account_id, username, nama, "exception", f"Error untuk {nama}: {str(e)}"
+            )
+            self.logger.error(f"Exception finalize {nama}: {str(e)}", exc_info=True)
+        return True
+
+    def _parse_account(self, idx, account):
+        """
+        Ambil info akun dari format dictionary (GUI) atau tuple/list (CLI)
+
+        Args:
+            idx (int): Index akun di list input
+            account (dict/tuple): Data akun
+
+        Returns:
+            tuple: (account_id, nama, username, pin, pangkalan_id)
+        """
+        if isinstance(account, dict):
+            account_id = account.get("id", idx)
+            nama = account["nama"]
+            username = account["username"]
+            pin = account["pin"]
+            pangkalan_id = account.get(
+                "pangkalan_id", username
+            )  # Get Pangkalan_id or fallback to username
+        else:
+            # Assuming tuple format (nama, username, pin, pangkalan_id) or old format (nama, username, pin)
+            account_id = idx
+            if len(account) >= 4:
+                nama = account[0]
+                username = account[1]
+                pin = account[2]
+                pangkalan_id = account[3]
+            else:
+                nama = account[0]
+                username = account[1]
+                pin = account[2]
+                pangkalan_id = username  # Fallback to username for old format
+
+        return account_id, nama, username, pin, pangkalan_id
+
+    def _finalize_account(
+        self,
+        account_id,
+        username,
+        nama,
+        pangkalan_id,
+        stok_value,
+        tabung_terjual,
+        selected_date,
+        final=True,
+        update_database=True,
+    ):
+        """
+        Format hasil satu akun (satu tanggal) lalu simpan ke results, Excel,
+        telemetry, Supabase dan callback on_result (blocking I/O, aman dari
+        banyak worker)
+
+        Args:
+            account_id: ID akun di UI
+            username (str): Username akun
+            nama (str): Nama pangkalan
+            pangkalan_id (str): ID pangkalan
+            stok_value: Nilai stok mentah dari extractor
+            tabung_terjual: Jumlah tabung terjual mentah dari extractor
+            selected_date (datetime): Tanggal filter atau None
+            final (bool): False untuk tanggal selain yang terakhir pada mode
+                multi-tanggal (status akun & telemetry sukses dicatat sekali)
+            update_database (bool): Kirim ke Supabase. Tabel automation_results
+                tidak punya kolom tanggal, jadi mode multi-tanggal hanya mengirim
+                hasil hari ini
+
+        Returns:
+            dict: Hasil yang sudah diformat
+        """
+        stok_int = self._safe_int(stok_value)
+        terjual_int = self._safe_int(tabung_terjual)
+
+        stok_formatted = f"{stok_int} Tabung"
+        tabung_formatted = f"{terjual_int} Tabung"
+        status = "Ada Penjualan" if terjual_int > 0 else "Tidak Ada Penjualan"
+
+        result = {
+            "pangkalan_id": pangkalan_id,  # Use Pangkalan_id instead of username
+            "nama": nama,
+            "username": username,
+            "stok": stok_formatted,
+            "tabung_terjual": tabung_formatted,
+            "status": status,
+            "waktu": 0,  # Bisa ditambahkan perhitungan waktu per akun
+        }
+
+        # Save to Excel
+        save_date = selected_date if selected_date else datetime.now()
+        tanggal_check = save_date.strftime("%Y-%m-%d")
+        result["tanggal"] = tanggal_check
+
+        with self._results_lock:
+            self.results.append(result)
+
+        if self.save_excel:
+            save_result_to_excel(result)
+
+        # Telemetry Success (sekali per akun)
+        if final:
+            self.telemetry.record_account_success(
+                username,
+                {
+                    "stok": stok_formatted,
+                    "terjual": tabung_formatted,
+                    "status": status,
+                },
+            )
+        # Stok sama untuk semua tanggal: dihitung sekali per akun
+        self.telemetry.record_business_metrics(stok_int if final else 0, terjual_int)
+
+        # Update Supabase if client exists
+        if self.supabase_client and update_database:
+            self._log(f"Updating database untuk {username}...", "info")
+            with self._supabase_lock:
+                db_updated = self.supabase_client.update_account_result(
+                    username,
+                    stok_formatted,
+                    tabung_formatted,
+                    status,
+                    pangkalan_id=pangkalan_id,
+                )
+            if db_updated:
+                self._log("Database updated", "success")
+            else:
+                self._log("Gagal update database", "warning")
+
+        # Call callback for result
+        self._emit("on_result", result)
+
+        if final:
+            self._update_status(
+                account_id,
+                "done|Berhasil",
+                100,
+            )
+        self._log(
+            f"Selesai: {nama} ({tanggal_check}) - Stok: {stok_formatted}, "
+            f"Terjual: {tabung_formatted}",
+            "success",
+        )
+
+        return result
+
+    @staticmethod
+    def _is_today(selected_date):
+        """True jika tanggal kosong (default hari ini) atau sama dengan hari ini"""
+        return selected_date is None or selected_date.date() == datetime.now().date()
 
     def _handle_failure(self, account_id, username, nama, error_type, message):
         """Helper untuk handle failure case"""
@@ -0,0 +1,417 @@
+"""
+Sharded Runner Module
+=====================
+Menjalankan list akun yang sangat besar di beberapa proses terpisah (shard).
+Setiap shard menjalankan ProcessManager sendiri dengan BrowserPool sendiri,
+lalu mengirim event (log, status, progress, hasil) ke proses induk lewat
+multiprocessing.Queue. Proses induk meneruskan event tersebut ke callback
+yang sama dengan ProcessManager (on_log, on_progress, on_account_status,
+on_result), sehingga GUI tidak perlu tahu bahwa proses dipecah.
+
+File master Excel hanya ditulis oleh proses induk dari event on_result
+(threading.Lock tidak berlaku lintas proses). Pencatatan telemetry per
+akun di shard diteruskan ke telemetry proses induk, dan metrik lain
+(counter, durasi, event, statistik per akun) dikirim bersama event
+shard_done lalu digabung di proses induk.
+
+Shard yang crash tidak menghentikan shard lain; akun yang belum selesai
+di shard tersebut ditandai error.
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from modules.core.process_manager import save_result_to_excel
+from modules.core.telemetry import get_telemetry_manager
+
+try:
+    from modules.core.config import NUM_SHARDS
+except ImportError:
+    NUM_SHARDS = 1
+
+# Interval polling event queue dan flag stop/pause (detik)
+POLL_INTERVAL = 0.5
+
+
+def assign_account_ids(accounts):
+    """
+    Beri setiap akun ID global sebelum dibagi ke shard. Akun tuple/list
+    diubah ke format dictionary, karena ProcessManager memakai index lokal
+    shard sebagai ID akun tuple sehingga ID antar shard bisa bentrok.
+
+    Args:
+        accounts (list): List akun dict (GUI) atau tuple (nama, username, pin[, pangkalan_id])
+
+    Returns:
+        list: List akun dictionary dengan key "id" unik
+    """
+    normalized = []
+    for idx, account in enumerate(accounts):
+        if isinstance(account, dict):
+            account = dict(account)
+            account.setdefault("id", idx)
+        else:
+            account = {
+                "id": idx,
+                "nama": account[0],
+                "username": account[1],
+                "pin": account[2],
+                "pangkalan_id": account[3] if len(account) >= 4 else account[1],
+            }
+        normalized.append(account)
+    return normalized
+
+
+class _TelemetryForwarder:
+    """
+    Bungkus TelemetryManager shard: pencatatan per akun tetap dicatat lokal
+    dan juga dikirim ke proses induk lewat event queue. Metrik yang dicatat
+    modul lain lewat get_telemetry_manager() dikirim di akhir (shard_done).
+    """
+
+    # Durasi yang dicatat oleh method FORWARDED, sudah ada di proses induk
+    LIFECYCLE_OPERATIONS = ("account_processing", "lockout_wait")
+
+    FORWARDED = (
+        "record_account_start",
+        "park_account",
+        "resume_account",
+        "record_account_success",
+        "record_account_failure",
+        "record_account_skip",
+        "record_business_metrics",
+    )
+
+    def __init__(self, telemetry, shard_index, event_queue):
+        self._telemetry = telemetry
+        self._shard_index = shard_index
+        self._event_queue = event_queue
+
+    def __getattr__(self, name):
+        attr = getattr(self._telemetry, name)
+        if name not in self.FORWARDED:
+            return attr
+
+        def forward(*args, **kwargs):
+            self._event_queue.put((self._shard_index, "telemetry", (name, args, kwargs)))
+            return attr(*args, **kwargs)
+
+        return forward
+
+
+def split_into_shards(accounts, num_shards):
+    """
+    Bagi list akun secara round-robin ke beberapa shard
+
+    Args:
+        accounts (list): List akun
+        num_shards (int): Jumlah shard
+
+    Returns:
+        list: List of list akun, shard kosong dibuang
+    """
+    num_shards = max(1, int(num_shards))
+    shards = [accounts[i::num_shards] for i in range(num_shards)]
+    return [shard for shard in shards if shard]
+
+
+def _shard_main(shard_index, accounts, settings, event_queue, stop_event, pause_event):
+    """
+    Entry point proses shard (harus top-level agar bisa di-pickle saat spawn)
+
+    Args:
+        shard_index (int): Nomor shard
+        accounts (list): Akun milik shard ini
+        settings (dict): Settings run (sama dengan ProcessManager.run)
+        event_queue (multiprocessing.Queue): Queue event ke proses induk
+        stop_event (multiprocessing.Event): Flag stop dari proses induk
+        pause_event (multiprocessing.Event): Flag pause dari proses induk
+    """
+    # Import di dalam proses anak: Playwright & Supabase client tidak bisa di-pickle
+    from modules.core.process_manager import ProcessManager
+
+    def post(name):
+        return lambda *args: event_queue.put((shard_index, name, args))
+
+    callbacks = {
+        "on_log": post("on_log"),
+        "on_progress": post("on_progress"),
+        "on_account_status": post("on_account_status"),
+        "on_result": post("on_result"),
+    }
+
+    supabase_client = None
+    if settings.get("use_supabase", True):
+        try:
+            from modules.data.supabase_client import SupabaseManager
+
+            supabase_client = SupabaseManager()
+        except Exception as e:
+            event_queue.put(
+                (shard_index, "on_log", (f"Supabase tidak tersedia: {str(e)}", "warning"))
+            )
+
+    # Excel ditulis proses induk dari on_result
+    manager = ProcessManager(callbacks, supabase_client=supabase_client, save_excel=False)
+    manager.telemetry = _TelemetryForwarder(manager.telemetry, shard_index, event_queue)
+
+    def watch_flags():
+        # Teruskan stop/pause dari proses induk ke ProcessManager shard
+        while not stop_event.is_set():
+            if pause_event.is_set() != manager.pause_requested:
+                manager.pause_requested = pause_event.is_set()
+            time.sleep(POLL_INTERVAL)
+        manager.stop_requested = True
+
+    threading.Thread(target=watch_flags, daemon=True).start()
+
+    results = manager.run(accounts, settings)
+    # Counter/durasi/event (navigasi, routing, asset cache, login, wait ledger,
+    # browser_recycle) dicatat ke telemetry shard, kirim untuk digabung di induk
+    metrics = get_telemetry_manager().export_metrics(
+        exclude_operations=_TelemetryForwarder.LIFECYCLE_OPERATIONS
+    )
+    event_queue.put((shard_index, "shard_done", (len(results), metrics)))
+
+
+class ShardedRunner:
+    """
+    Runner multi-proses untuk list akun besar.
+    Interface (callbacks, stop/pause/resume, run) sama dengan ProcessManager.
+    """
+
+    def __init__(self, callbacks=None, supabase_client=None, num_shards=None):
+        """
+        Inisialisasi ShardedRunner
+
+        Args:
+            callbacks (dict): Callback yang sama dengan ProcessManager
+            supabase_client: SupabaseManager milik proses induk, dipakai untuk
+                fetch_accounts. Setiap shard membuat client sendiri.
+            num_shards (int): Jumlah proses. Jika None, gunakan NUM_SHARDS config
+        """
+        self.callbacks = callbacks or {}
+        self.supabase_client = supabase_client
+        self.num_shards = num_shards or NUM_SHARDS
+        self.logger = logging.getLogger("sharded_runner")
+        self.telemetry = get_telemetry_manager()
+        self.results = []
+        self.stop_requested = False
+        self.pause_requested = False
+
+        # spawn: aman untuk Playwright (tidak mewarisi thread/driver induk)
+        self._mp = multiprocessing.get_context("spawn")
+        self._stop_event = self._mp.Event()
+        self._pause_event = self._mp.Event()
+
+    def _emit(self, name, *args):
+        """Panggil callback UI jika ada"""
+        callback = self.callbacks.get(name)
+        if callback:
+            callback(*args)
+
+    def _log(self, message, level="info"):
+        """Internal helper untuk logging ke callback dan file"""
+        self._emit("on_log", message, level)
+        if level == "error":
+            self.logger.error(message)
+        elif level == "warning":
+            self.logger.warning(message)
+        else:
+            self.logger.info(message)
+
+    def stop(self):
+        """Request stop ke semua shard"""
+        self.stop_requested = True
+        self._stop_event.set()
+        self._log("Permintaan stop diterima...", "warning")
+
+    def pause(self):
+        """Pause semua shard"""
+        self.pause_requested = True
+        self._pause_event.set()
+        self._log("Proses dipause", "warning")
+
+    def resume(self):
+        """Resume semua shard"""
+        self.pause_requested = False
+        self._pause_event.clear()
+        self._log("Proses dilanjutkan", "info")
+
+    def fetch_accounts(self, company_filter=None):
+        """
+        Ambil akun dari Supabase menggunakan client proses induk
+
+        Returns:
+            list: List akun, kosong jika client tidak tersedia
+        """
+        if not self.supabase_client:
+            self._log("Supabase client tidak tersedia untuk fetch akun", "error")
+            return []
+        return self.supabase_client.fetch_accounts(company_filter=company_filter)
+
+    def run(self, accounts, settings):
+        """
+        Jalankan akun di beberapa proses shard
+
+        Args:
+            accounts (list): List akun. Jika None, diambil dari
+                SupabaseManager.fetch_accounts(settings["company_filter"])
+            settings (dict): Settings run, diteruskan ke ProcessManager tiap shard
+                - max_workers (int): Worker per shard
+                - use_supabase (bool): Shard update Supabase (default True)
+
+        Returns:
+            list: Gabungan hasil semua shard
+        """
+        self.stop_requested = False
+        self.results = []
+        self._stop_event.clear()
+        self._pause_event.clear()
+
+        if accounts is None:
+            accounts = self.fetch_accounts(settings.get("company_filter"))
+        accounts = assign_account_ids(accounts)
+        self.telemetry.reset()
+
+        total_accounts = len(accounts)
+        shards = split_into_shards(accounts, self.num_shards)
+        if not shards:
+            self._log("Tidak ada akun untuk diproses", "warning")
+            return self.results
+
+        self._log(
+            f"Memulai proses untuk {total_accounts} akun di {len(shards)} shard...",
+            "info",
+        )
+
+        # Pastikan settings bisa di-pickle (tanpa object non-serializable)
+        shard_settings = {
+            key: value for key, value in settings.items() if key != "company_filter"
+        }
+        if self.supabase_client is None:
+            shard_settings.setdefault("use_supabase", False)
+
+        event_queue = self._mp.Queue()
+        processes = []
+        for shard_index, shard_accounts in enumerate(shards):
+            process = self._mp.Process(
+                target=_shard_main,
+                args=(
+                    shard_index,
+                    shard_accounts,
+                    shard_settings,
+                    event_queue,
+                    self._stop_event,
+                    self._pause_event,
+                ),
+                name=f"snapflux-shard-{shard_index + 1}",
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+
+        self._collect_events(shards, processes, event_queue, total_accounts)
+
+        for process in processes:
+            process.join()
+
+        if self.stop_requested:
+            self._log("Proses dihentikan oleh user", "error")
+
+        self._log(
+            f"Proses selesai! Total: {len(self.results)} akun berhasil diproses",
+            "success",
+        )
+        return self.results
+
+    def _collect_events(self, shards, processes, event_queue, total_accounts):
+        """
+        Baca event dari semua shard dan teruskan ke callback sampai semua
+        shard selesai atau mati
+
+        Args:
+            shards (list): Akun per shard
+            processes (list): Process per shard (index sama dengan shards)
+            event_queue (multiprocessing.Queue): Queue event dari shard
+            total_accounts (int): Total akun semua shard
+        """
+        # account_id -> True jika sudah selesai (done/error)
+        finished = {}
+        shard_completed = [0] * len(shards)
+        shard_done = [False] * len(shards)
+        shard_handled = [False] * len(shards)
+
+        while not all(shard_handled):
+            try:
+                shard_index, name, args = event_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                shard_index = None
+
+            if shard_index is not None:
+                if name == "shard_done":
+                    shard_done[shard_index] = True
+                    self.telemetry.merge_metrics(args[1])
+                elif name == "on_progress":
+                    # Progress shard -> progress global
+                    shard_completed[shard_index] = args[0]
+                    completed = sum(shard_completed)
+                    percent = (
+                        int((completed / total_accounts) * 100)
+                        if total_accounts
+                        else 100
+                    )
+                    self._emit("on_progress", completed, total_accounts, percent)
+                elif name == "on_account_status":
+                    account_id, status, _ = args
+                    if status == "error" or str(status).startswith("done"):
+                        finished[account_id] = True
+                    self._emit(name, *args)
+                elif name == "on_result":
+                    self.results.append(args[0])
+                    save_result_to_excel(args[0])
+                    self._emit(name, *args)
+                elif name == "telemetry":
+                    method, method_args, method_kwargs = args
+                    getattr(self.telemetry, method)(*method_args, **method_kwargs)
+                elif name == "on_log":
+                    message, level = args
+                    self._emit(name, f"[Shard {shard_index + 1}] {message}", level)
+                else:
+                    self._emit(name, *args)
+                continue
+
+            # Queue kosong: cek shard yang sudah berhenti
+            for index, process in enumerate(processes):
+                if shard_handled[index] or process.is_alive():
+                    continue
+                shard_handled[index] = True
+                if not shard_done[index]:
+                    self._handle_crashed_shard(
+                        index, shards[index], process.exitcode, finished
+                    )
+
+    def _handle_crashed_shard(self, shard_index, shard_accounts, exitcode, finished):
+        """Tandai akun yang belum selesai di shard yang crash sebagai error"""
+        self._log(
+            f"Shard {shard_index + 1} berhenti tidak normal (exitcode={exitcode})",
+            "error",
+        )
+
+        for account in shard_accounts:
+            account_id = account["id"]
+            username = account.get("username", "")
+            nama = account.get("nama", username)
+
+            if finished.get(account_id):
+                continue
+
+            message = f"Shard crash sebelum {nama} selesai diproses"
+            self._emit("on_account_status", account_id, "error", 0)
+            self._log(message, "error")
+            self.telemetry.record_account_failure(
+                username, "shard_crashed", message, nama
+            )
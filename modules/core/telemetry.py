@@ -5,6 +5,7 @@ Monitoring metrics, performance tracking, dan analytics minimal tapi standar ind
 
 import json
 import logging
+import threading
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -34,6 +35,9 @@ class TelemetryManager:
         self.metrics_dir = Path(metrics_dir)
         self.metrics_dir.mkdir(exist_ok=True)
 
+        # Lock untuk update metrics dari banyak worker thread
+        self._lock = threading.RLock()
+
         # Current session metrics
         self.session_start = datetime.now()
         self.session_id = self.session_start.strftime("%Y%m%d_%H%M%S")
@@ -57,6 +61,15 @@ class TelemetryManager:
         self.start_times = {}  # Track operation start times
         self.operation_durations = defaultdict(list)  # Operation timings
 
+        # Generic counters (network, cache, dsb) dan statistik per akun
+        self.counters = defaultdict(int)
+        self.account_stats = defaultdict(dict)
+        self.events = []  # Event penting (e.g., browser recycle) beserta datanya
+
+        # Akun yang diparkir (lockout): waktu aktif sebelum parkir & total tunggu
+        self.parked_active_time = defaultdict(float)
+        self.lockout_wait_time = defaultdict(float)
+
         logger.info(f"TelemetryManager initialized - Session: {self.session_id}")
 
     def start_operation(self, operation_name: str, identifier: str = None):
@@ -67,8 +80,9 @@ class TelemetryManager:
             operation_name (str): Name of operation (e.g., 'login', 'data_extraction')
             identifier (str): Unique identifier (e.g., username)
         """
-        key = f"{operation_name}:{identifier}" if identifier else operation_name
-        self.start_times[key] = time.time()
+        with self._lock:
+            key = f"{operation_name}:{identifier}" if identifier else operation_name
+            self.start_times[key] = time.time()
 
     def end_operation(self, operation_name: str, identifier: str = None) -> float:
         """
@@ -81,13 +95,66 @@ class TelemetryManager:
         Returns:
             float: Duration in seconds
         """
-        key = f"{operation_name}:{identifier}" if identifier else operation_name
-        if key in self.start_times:
-            duration = time.time() - self.start_times[key]
+        with self._lock:
+            key = f"{operation_name}:{identifier}" if identifier else operation_name
+            if key in self.start_times:
+                duration = time.time() - self.start_times[key]
+                self.operation_durations[operation_name].append(duration)
+                del self.start_times[key]
+                return duration
+            return 0.0
+
+    def record_duration(self, operation_name: str, duration: float):
+        """
+        Catat durasi operasi yang diukur sendiri oleh pemanggil
+
+        Args:
+            operation_name (str): Name of operation (e.g., 'browser_launch')
+            duration (float): Duration in seconds
+        """
+        with self._lock:
             self.operation_durations[operation_name].append(duration)
-            del self.start_times[key]
-            return duration
-        return 0.0
+
+    def increment_counter(self, counter_name: str, value: int = 1):
+        """
+        Tambah nilai counter generik
+
+        Args:
+            counter_name (str): Nama counter (e.g., 'requests_blocked')
+            value (int): Nilai penambah
+        """
+        with self._lock:
+            self.counters[counter_name] += value
+
+    def record_event(self, event_type: str, data: Dict[str, Any] = None):
+        """
+        Catat event penting beserta datanya (e.g., browser_recycle + RSS)
+
+        Args:
+            event_type (str): Jenis event
+            data (Dict): Data tambahan
+        """
+        with self._lock:
+            self.counters[event_type] += 1
+            self.events.append(
+                {
+                    "type": event_type,
+                    "timestamp": datetime.now().isoformat(),
+                    **(data or {}),
+                }
+            )
+
+    def record_account_stats(self, username: str, category: str, stats: Dict[str, Any]):
+        """
+        Simpan statistik tambahan per akun (e.g., network routing)
+
+        Args:
+            username (str): Account username
+            category (str): Kategori statistik (e.g., 'routing')
+            stats (Dict): Nilai statistik
+        """
+        with self._lock:
+            self.account_stats[username][category] = stats
 
     def record_account_start(self, username: str):
         """
@@ -96,8 +163,48 @@ class TelemetryManager:
         Args:
             username (str): Account username
         """
-        self.total_accounts += 1
-        self.start_operation("account_processing", username)
+        with self._lock:
+            self.total_accounts += 1
+            self.start_operation("account_processing", username)
+
+    def park_account(self, username: str):
+        """
+        Hentikan timer aktif akun yang diparkir (lockout) dan mulai timer tunggu.
+        Waktu tunggu dilaporkan terpisah dari waktu proses aktif.
+
+        Args:
+            username (str): Account username
+        """
+        with self._lock:
+            key = f"account_processing:{username}"
+            if key in self.start_times:
+                self.parked_active_time[username] += (
+                    time.time() - self.start_times.pop(key)
+                )
+            self.start_operation("lockout_wait", username)
+
+    def resume_account(self, username: str):
+        """
+        Akun parkir diproses lagi: catat lama tunggu, lanjutkan timer aktif
+
+        Args:
+            username (str): Account username
+
+        Returns:
+            float: Lama tunggu (detik)
+        """
+        with self._lock:
+            waited = self.end_operation("lockout_wait", username)
+            self.lockout_wait_time[username] += waited
+            self.start_operation("account_processing", username)
+            return waited
+
+    def _finish_account_timing(self, username: str):
+        """Durasi aktif akun (tanpa waktu tunggu lockout) dan total tunggu"""
+        duration = self.end_operation("account_processing", username)
+        duration += self.parked_active_time.pop(username, 0.0)
+        waited = self.lockout_wait_time.pop(username, 0.0)
+        return duration, waited
 
     def record_account_success(self, username: str, data: Dict[str, Any] = None):
         """
@@ -107,21 +214,23 @@ class TelemetryManager:
             username (str): Account username
             data (Dict): Additional data about the account
         """
-        self.successful_accounts += 1
-        duration = self.end_operation("account_processing", username)
-        self.account_timings.append(duration)
+        with self._lock:
+            self.successful_accounts += 1
+            duration, waited = self._finish_account_timing(username)
+            self.account_timings.append(duration)
 
-        self.accounts_processed.append(
-            {
-                "username": username,
-                "status": "success",
-                "duration": duration,
-                "timestamp": datetime.now().isoformat(),
-                "data": data or {},
-            }
-        )
+            self.accounts_processed.append(
+                {
+                    "username": username,
+                    "status": "success",
+                    "duration": duration,
+                    "lockout_wait": waited,
+                    "timestamp": datetime.now().isoformat(),
+                    "data": data or {},
+                }
+            )
 
-        logger.info(f"✓ Account success: {username} ({duration:.2f}s)")
+            logger.info(f"✓ Account success: {username} ({duration:.2f}s)")
 
     def record_account_failure(
         self, username: str, error_type: str, error_message: str = None, nama: str = None
@@ -135,23 +244,25 @@ class TelemetryManager:
             error_message (str): Detailed error message
             nama (str): Account name/display name
         """
-        self.failed_accounts += 1
-        duration = self.end_operation("account_processing", username)
-        self.errors[error_type] += 1
-
-        self.accounts_processed.append(
-            {
-                "username": username,
-                "nama": nama or username,
-                "status": "failed",
-                "duration": duration,
-                "timestamp": datetime.now().isoformat(),
-                "error_type": error_type,
-                "error_message": error_message,
-            }
-        )
-
-        logger.warning(f"✗ Account failed: {nama or username} - {error_type}")
+        with self._lock:
+            self.failed_accounts += 1
+            duration, waited = self._finish_account_timing(username)
+            self.errors[error_type] += 1
+
+            self.accounts_processed.append(
+                {
+                    "username": username,
+                    "nama": nama or username,
+                    "status": "failed",
+                    "duration": duration,
+                    "lockout_wait": waited,
+                    "timestamp": datetime.now().isoformat(),
+                    "error_type": error_type,
+                    "error_message": error_message,
+                }
+            )
+
+            logger.warning(f"✗ Account failed: {nama or username} - {error_type}")
 
     def record_account_skip(self, username: str, reason: str = None):
         """
@@ -161,18 +272,19 @@ class TelemetryManager:
             username (str): Account username
             reason (str): Reason for skip
         """
-        self.skipped_accounts += 1
+        with self._lock:
+            self.skipped_accounts += 1
 
-        self.accounts_processed.append(
-            {
-                "username": username,
-                "status": "skipped",
-                "timestamp": datetime.now().isoformat(),
-                "reason": reason,
-            }
-        )
+            self.accounts_processed.append(
+                {
+                    "username": username,
+                    "status": "skipped",
+                    "timestamp": datetime.now().isoformat(),
+                    "reason": reason,
+                }
+            )
 
-        logger.info(f"Account skipped: {username}")
+            logger.info(f"Account skipped: {username}")
 
     def record_business_metrics(self, stok: int, penjualan: int):
         """
@@ -182,10 +294,53 @@ class TelemetryManager:
             stok (int): Jumlah stok awal
             penjualan (int): Jumlah tabung terjual
         """
-        if stok > 0:
-            self.total_stok_terpantau += stok
-        if penjualan > 0:
-            self.total_penjualan_unit += penjualan
+        with self._lock:
+            if stok > 0:
+                self.total_stok_terpantau += stok
+            if penjualan > 0:
+                self.total_penjualan_unit += penjualan
+
+    def export_metrics(self, exclude_operations=()) -> Dict[str, Any]:
+        """
+        Salinan metrik generik (counter, durasi operasi, event, statistik per
+        akun) untuk dikirim ke proses lain, mis. dari shard ke proses induk
+
+        Args:
+            exclude_operations (iterable): Nama operasi yang tidak diikutkan
+                (mis. yang sudah dicatat proses induk lewat event per akun)
+
+        Returns:
+            Dict: Data untuk merge_metrics (bisa di-pickle)
+        """
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "operation_durations": {
+                    name: list(durations)
+                    for name, durations in self.operation_durations.items()
+                    if name not in exclude_operations
+                },
+                "events": list(self.events),
+                "account_stats": {
+                    username: dict(stats) for username, stats in self.account_stats.items()
+                },
+            }
+
+    def merge_metrics(self, metrics: Dict[str, Any]):
+        """
+        Gabungkan metrik dari export_metrics proses lain ke session ini
+
+        Args:
+            metrics (Dict): Hasil export_metrics
+        """
+        with self._lock:
+            for name, value in metrics.get("counters", {}).items():
+                self.counters[name] += value
+            for name, durations in metrics.get("operation_durations", {}).items():
+                self.operation_durations[name].extend(durations)
+            self.events.extend(metrics.get("events", []))
+            for username, stats in metrics.get("account_stats", {}).items():
+                self.account_stats[username].update(stats)
 
     def get_success_rate(self) -> float:
         """
@@ -283,6 +438,7 @@ class TelemetryManager:
             "failure_rate": round(self.get_failure_rate(), 2),
             "avg_processing_time": round(self.get_average_processing_time(), 2),
             "errors": dict(self.errors),
+            "counters": dict(self.counters),
             "failed_accounts_detail": failed_accounts_detail,  # NEW
             "business_metrics": {
                 "total_stok": self.total_stok_terpantau,
@@ -379,6 +535,9 @@ class TelemetryManager:
                 op: self.get_operation_stats(op)
                 for op in self.operation_durations.keys()
             },
+            "counters": dict(self.counters),
+            "account_stats": dict(self.account_stats),
+            "events": self.events,
         }
 
         try:
@@ -430,6 +589,11 @@ class TelemetryManager:
         self.accounts_processed = []
         self.start_times = {}
         self.operation_durations = defaultdict(list)
+        self.counters = defaultdict(int)
+        self.account_stats = defaultdict(dict)
+        self.events = []
+        self.parked_active_time = defaultdict(float)
+        self.lockout_wait_time = defaultdict(float)
         
         self.total_stok_terpantau = 0
         self.total_penjualan_unit = 0
@@ -208,6 +208,46 @@ def get_date_input():
             return None
 
 
+def parse_date_list(dates):
+    """
+    Normalisasi setting "dates" (multi-tanggal) menjadi list tanggal
+
+    Args:
+        dates: List tanggal (datetime atau "YYYY-MM-DD"), atau rentang
+               {"start": ..., "end": ...} (inklusif)
+
+    Returns:
+        list: List datetime unik terurut naik, [] jika kosong/tidak valid
+    """
+    def to_datetime(value):
+        if isinstance(value, datetime):
+            return datetime(value.year, value.month, value.day)
+        try:
+            return datetime.strptime(str(value).strip(), "%Y-%m-%d")
+        except ValueError:
+            logger.warning(f"Tanggal tidak valid diabaikan: {value}")
+            return None
+
+    if not dates:
+        return []
+
+    if isinstance(dates, dict):
+        start = to_datetime(dates.get("start"))
+        end = to_datetime(dates.get("end") or dates.get("start"))
+        if not start or not end:
+            return []
+        if end < start:
+            start, end = end, start
+        return [
+            datetime.fromordinal(ordinal)
+            for ordinal in range(start.toordinal(), end.toordinal() + 1)
+        ]
+
+    parsed = {to_datetime(value) for value in dates}
+    parsed.discard(None)
+    return sorted(parsed)
+
+
 # ============================================
 # SUMMARY FUNCTIONS
 # ============================================
@@ -0,0 +1,357 @@
+"""
+Riwayat transaksi per pangkalan (sync inkremental ke SQLite)
+File ini menyimpan setiap transaksi (customer, NIK, jumlah tabung, waktu)
+dari Rekap Penjualan ke tabel lokal, dan menyimpan high-water mark (waktu
+transaksi terbaru yang sudah tersimpan) per pangkalan. List Rekap Penjualan
+urut dari transaksi terbaru, jadi sync berhenti scroll begitu bertemu
+transaksi yang lebih lama dari high-water mark - biaya sync harian sebanding
+dengan jumlah transaksi baru, bukan panjang riwayat.
+
+Usage:
+    if click_laporan_penjualan_direct(page) and click_rekap_penjualan_direct(page):
+        summary = sync_transactions(page, account["pangkalan_id"])
+        # {"pangkalan_id": ..., "new": 5, "scanned": 6, "failed": 0, "high_water": ...}
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from playwright.sync_api import Page
+
+from modules.browser.detail_fetcher import customer_key, fetch_transaction_details
+from modules.browser.extractor import iter_customer_cards
+
+try:
+    from modules.core.constants import BULAN_SINGKAT, TRANSACTION_DB_FILE
+except ImportError:
+    BULAN_SINGKAT = ["", "Jan", "Feb", "Mar", "Apr", "Mei", "Jun", "Jul", "Agt", "Sep", "Okt", "Nov", "Des"]
+    TRANSACTION_DB_FILE = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "results",
+        "transactions.sqlite3",
+    )
+
+try:
+    from modules.core.config import TRANSACTION_SYNC_BATCH
+except ImportError:
+    TRANSACTION_SYNC_BATCH = 8
+
+logger = logging.getLogger("transaction_store")
+
+# Format waktu yang disimpan (urut secara leksikal = urut waktu)
+WAKTU_FORMAT = "%Y-%m-%d %H:%M"
+
+TRANSACTION_TIME_REGEX = re.compile(
+    r"(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s*·\s*(\d{2}):(\d{2})"
+)
+
+# Singkatan bulan di UI (Indonesia) + variasi Inggris / "Agu"
+MONTH_ABBREVIATIONS = {name.lower(): idx for idx, name in enumerate(BULAN_SINGKAT) if name}
+MONTH_ABBREVIATIONS.update({"may": 5, "agu": 8, "aug": 8, "oct": 10, "dec": 12})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    pangkalan_id TEXT NOT NULL,
+    waktu TEXT NOT NULL,
+    nik TEXT NOT NULL,
+    nama TEXT,
+    tabung INTEGER,
+    urutan INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (pangkalan_id, waktu, nik, urutan)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    pangkalan_id TEXT PRIMARY KEY,
+    high_water TEXT,
+    last_sync TEXT
+);
+"""
+
+
+def parse_transaction_time(text: str) -> Optional[datetime]:
+    """
+    Parse timestamp detail transaksi
+
+    Args:
+        text (str): Mis. "30 Jan 2026 · 06:17" atau "5 Agt 2025 · 14:02"
+
+    Returns:
+        datetime: Waktu transaksi, None jika format tidak dikenali
+    """
+    match = TRANSACTION_TIME_REGEX.search(text or "")
+    if not match:
+        return None
+
+    day, month_name, year, hour, minute = match.groups()
+    month = MONTH_ABBREVIATIONS.get(month_name.lower())
+    if not month:
+        return None
+
+    try:
+        return datetime(int(year), month, int(day), int(hour), int(minute))
+    except ValueError:
+        return None
+
+
+class TransactionStore:
+    """
+    Tabel transaksi + high-water mark per pangkalan di satu file SQLite.
+    Satu koneksi dipakai bersama oleh semua worker (akses dijaga lock).
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): File database. Default TRANSACTION_DB_FILE
+        """
+        self.path = path or TRANSACTION_DB_FILE
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._migrate_urutan()
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _migrate_urutan(self):
+        """
+        Database lama (primary key tanpa urutan) dibangun ulang dengan kolom
+        urutan = 0, supaya pembelian berulang di menit yang sama bisa disimpan
+        """
+        columns = [
+            row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")
+        ]
+        if not columns or "urutan" in columns:
+            return
+
+        logger.info(f"Migrasi tabel transactions (kolom urutan): {self.path}")
+        with self._conn:
+            self._conn.execute("ALTER TABLE transactions RENAME TO transactions_lama")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(
+                "INSERT INTO transactions (pangkalan_id, waktu, nik, nama, tabung) "
+                "SELECT pangkalan_id, waktu, nik, nama, tabung FROM transactions_lama"
+            )
+            self._conn.execute("DROP TABLE transactions_lama")
+
+    def get_high_water(self, pangkalan_id) -> Optional[str]:
+        """
+        Returns:
+            str: Waktu transaksi terbaru yang sudah tersimpan ("YYYY-MM-DD HH:MM"),
+                 None jika pangkalan belum pernah di-sync
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water FROM sync_state WHERE pangkalan_id = ?",
+                (str(pangkalan_id),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_sync(self, pangkalan_id, records: List[Dict], high_water: Optional[str]) -> int:
+        """
+        Simpan transaksi baru dan high-water mark dalam satu transaksi database
+
+        Args:
+            pangkalan_id (str): ID pangkalan
+            records (list): [{"waktu", "nik", "nama", "tabung", "urutan"}].
+                "urutan" membedakan pembelian berulang NIK yang sama di menit yang sama
+            high_water (str): High-water mark baru
+
+        Returns:
+            int: Jumlah transaksi yang benar-benar baru (duplikat diabaikan)
+        """
+        pangkalan_id = str(pangkalan_id)
+        rows = [
+            (
+                pangkalan_id,
+                r["waktu"],
+                r["nik"],
+                r.get("nama"),
+                r.get("tabung"),
+                r.get("urutan", 0),
+            )
+            for r in records
+        ]
+
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO transactions "
+                "(pangkalan_id, waktu, nik, nama, tabung, urutan) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            inserted = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT INTO sync_state (pangkalan_id, high_water, last_sync) "
+                "VALUES (?, ?, ?) ON CONFLICT(pangkalan_id) DO UPDATE SET "
+                "high_water = excluded.high_water, last_sync = excluded.last_sync",
+                (pangkalan_id, high_water, datetime.now().strftime(WAKTU_FORMAT)),
+            )
+        return inserted
+
+    def get_transactions(self, pangkalan_id, since: Optional[str] = None) -> List[Dict]:
+        """
+        Returns:
+            list: Transaksi pangkalan (terbaru dulu), opsional mulai waktu since
+        """
+        query = "SELECT waktu, nik, nama, tabung, urutan FROM transactions WHERE pangkalan_id = ?"
+        params = [str(pangkalan_id)]
+        if since:
+            query += " AND waktu >= ?"
+            params.append(since)
+        query += " ORDER BY waktu DESC, urutan"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"waktu": waktu, "nik": nik, "nama": nama, "tabung": tabung, "urutan": urutan}
+            for waktu, nik, nama, tabung, urutan in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_transaction_store = None
+_transaction_store_lock = threading.Lock()
+
+
+def get_transaction_store():
+    """
+    Returns:
+        TransactionStore: Instance bersama (satu file database per proses)
+    """
+    global _transaction_store
+
+    with _transaction_store_lock:
+        if _transaction_store is None:
+            _transaction_store = TransactionStore()
+        return _transaction_store
+
+
+def _next_high_water(scanned: List[Dict], old_high_water: Optional[str]) -> Optional[str]:
+    """
+    Hitung high-water mark baru dari hasil scan (urut terbaru dulu).
+    Jika ada transaksi yang detailnya gagal diambil, mark hanya dinaikkan
+    sampai transaksi berhasil tepat di bawah kegagalan paling lama, supaya
+    transaksi yang gagal ikut diambil di sync berikutnya.
+    """
+    last_failure = max(
+        (idx for idx, item in enumerate(scanned) if item["waktu"] is None), default=None
+    )
+    if last_failure is None:
+        times = [item["waktu"] for item in scanned]
+        return max(times + [old_high_water or ""]) or None
+
+    for item in scanned[last_failure + 1 :]:
+        if item["waktu"] is not None:
+            return max(item["waktu"], old_high_water or "")
+    return old_high_water
+
+
+def sync_transactions(
+    page: Page,
+    pangkalan_id,
+    store: Optional[TransactionStore] = None,
+    batch_size: Optional[int] = None,
+) -> Dict:
+    """
+    Sync inkremental transaksi satu pangkalan dari halaman Rekap Penjualan.
+    Kartu di-harvest bertahap (iter_customer_cards), detail tiap batch diambil
+    paralel (fetch_transaction_details), dan harvest berhenti begitu batch
+    berisi transaksi yang lebih lama dari high-water mark.
+
+    Setiap kartu dibuka dari kartunya sendiri (customer_key), jadi pembelian
+    berulang customer yang sama tercatat sebagai transaksi terpisah.
+
+    Args:
+        page (Page): Page di halaman Rekap Penjualan
+        pangkalan_id (str): ID pangkalan (key high-water mark)
+        store (TransactionStore): Default get_transaction_store()
+        batch_size (int): Kartu per putaran. Default TRANSACTION_SYNC_BATCH
+
+    Returns:
+        dict: {"pangkalan_id", "new", "scanned", "failed", "high_water"}
+    """
+    store = store or get_transaction_store()
+    batch_size = batch_size or TRANSACTION_SYNC_BATCH
+    high_water = store.get_high_water(pangkalan_id)
+
+    print(f"Sync transaksi pangkalan {pangkalan_id} (sejak: {high_water or 'awal'})...")
+
+    scanned = []
+    batch = []
+    # Urutan kartu per (waktu, nik): pembelian berulang di menit yang sama
+    # tetap jadi baris terpisah, dan stabil saat menit high-water di-scan ulang
+    same_minute = {}
+    reached_old = False
+    completed = False
+
+    def process_batch():
+        details = fetch_transaction_details(
+            page, batch, which="all", serial_fallback=False
+        )
+        found_old = False
+        for customer in batch:
+            record = details.get(customer_key(customer))
+            waktu_dt = parse_transaction_time(record["waktu"]) if record else None
+            waktu = waktu_dt.strftime(WAKTU_FORMAT) if waktu_dt else None
+            # Waktu sama dengan high-water tetap diambil (resolusi menit),
+            # duplikat diabaikan oleh primary key
+            if waktu and high_water and waktu < high_water:
+                found_old = True
+                continue
+            urutan = same_minute.get((waktu, customer["nik"]), 0)
+            if waktu:
+                same_minute[(waktu, customer["nik"])] = urutan + 1
+            scanned.append(
+                {
+                    "waktu": waktu,
+                    "nik": customer["nik"],
+                    "nama": customer.get("nama"),
+                    "tabung": record.get("tabung") if record else None,
+                    "urutan": urutan,
+                }
+            )
+        batch.clear()
+        return found_old
+
+    try:
+        for customer in iter_customer_cards(page):
+            if not customer.get("nik"):
+                continue
+            batch.append(customer)
+            if len(batch) >= batch_size and process_batch():
+                reached_old = True
+                break
+
+        if batch and not reached_old:
+            process_batch()
+        completed = True
+
+    except Exception as e:
+        print(f"✗ Error sync transaksi: {str(e)}")
+        logger.error(f"Error sync_transactions {pangkalan_id}: {str(e)}", exc_info=True)
+
+    records = [item for item in scanned if item["waktu"] is not None]
+    failed = len(scanned) - len(records)
+    # Sync terputus: transaksi di bawah kartu terakhir belum terbaca, mark tidak dinaikkan
+    new_high_water = _next_high_water(scanned, high_water) if completed else high_water
+    inserted = store.save_sync(pangkalan_id, records, new_high_water)
+
+    if failed:
+        print(f"⚠ {failed} transaksi gagal diambil detailnya (diulang di sync berikutnya)")
+    print(f"✓ {inserted} transaksi baru tersimpan (high-water: {new_high_water or '-'})")
+
+    return {
+        "pangkalan_id": str(pangkalan_id),
+        "new": inserted,
+        "scanned": len(scanned),
+        "failed": failed,
+        "high_water": new_high_water,
+    }
@@ -0,0 +1,125 @@
+"""
+Fake Portal Server
+==================
+Server HTTP lokal yang meniru endpoint backend portal merchant yang dipakai
+MerchantApiClient (login, stok dashboard, Laporan Penjualan). Dipakai test
+engine "api" tanpa jaringan dan tanpa akun asli.
+
+Usage:
+    with FakePortalServer(accounts={"user@mail.com": "123456"}) as portal:
+        client = MerchantApiClient(base_url=portal.base_url)
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from modules.browser.api_client import (
+    API_ENDPOINTS,
+    API_LOGIN_FIELDS,
+    API_SALES_DATE_PARAMS,
+)
+
+
+class FakePortalServer:
+    """
+    Server portal palsu di 127.0.0.1 dengan port acak.
+    Semua request dicatat di self.requests sebagai (method, path).
+    """
+
+    def __init__(self, accounts=None, stock="1.234", sales=None):
+        """
+        Args:
+            accounts (dict): {username: pin} yang diterima endpoint login
+            stock: Nilai stockAvailable di response stok
+            sales (dict): {"YYYY-MM-DD": totalSold}; tanggal lain -> 0
+        """
+        self.accounts = accounts or {}
+        self.stock = stock
+        self.sales = sales or {}
+        self.requests = []
+        self.tokens = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def count(self, endpoint):
+        """Jumlah request ke endpoint (key API_ENDPOINTS)"""
+        path = API_ENDPOINTS[endpoint]
+        return sum(1 for _, request_path in self.requests if request_path == path)
+
+    def _make_handler(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self):
+                token = self.headers.get("Authorization", "").replace("Bearer ", "")
+                return token in portal.tokens
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                portal.requests.append(("POST", path))
+                if path != API_ENDPOINTS["login"]:
+                    return self._send(404, {"message": "not found"})
+
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                username = body.get(API_LOGIN_FIELDS["username"])
+                pin = body.get(API_LOGIN_FIELDS["pin"])
+                if portal.accounts.get(username) != pin:
+                    return self._send(401, {"message": "PIN salah"})
+
+                token = f"token-{len(portal.tokens) + 1}"
+                portal.tokens[token] = username
+                self._send(200, {"success": True, "data": {"accessToken": token}})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                portal.requests.append(("GET", url.path))
+                if not self._authorized():
+                    return self._send(401, {"message": "Unauthorized"})
+
+                if url.path == API_ENDPOINTS["stock"]:
+                    return self._send(
+                        200, {"data": [{"name": "LPG 3 Kg", "stockAvailable": portal.stock}]}
+                    )
+                if url.path == API_ENDPOINTS["sales"]:
+                    start_param, _ = API_SALES_DATE_PARAMS
+                    date_str = parse_qs(url.query).get(start_param, [""])[0]
+                    return self._send(
+                        200, {"data": {"totalSold": portal.sales.get(date_str, 0)}}
+                    )
+                self._send(404, {"message": "not found"})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,139 @@
+"""
+Test engine "api" (MerchantApiClient) terhadap FakePortalServer lokal
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import unittest
+from datetime import datetime
+
+from modules.browser import api_client
+from modules.browser.api_client import (
+    ApiAuthError,
+    MerchantApiClient,
+    _to_int,
+    parse_stock,
+)
+from tests.fake_portal import FakePortalServer
+
+HTTP_LIBRARY_MISSING = api_client.httpx is None and api_client.requests is None
+
+USERNAME = "pangkalan@mail.com"
+PIN = "123456"
+
+
+class ToIntTest(unittest.TestCase):
+    def test_decimal_string_is_not_multiplied(self):
+        self.assertEqual(_to_int("12.0"), 12)
+        self.assertEqual(_to_int("12,0"), 12)
+        self.assertEqual(_to_int(12.0), 12)
+
+    def test_thousands_separator(self):
+        self.assertEqual(_to_int("1.234"), 1234)
+        self.assertEqual(_to_int("12,500"), 12500)
+        self.assertEqual(_to_int("1.234.567"), 1234567)
+
+    def test_invalid_values(self):
+        self.assertIsNone(_to_int(None))
+        self.assertIsNone(_to_int(True))
+        self.assertIsNone(_to_int("tabung"))
+        self.assertIsNone(parse_stock({"data": {}}))
+
+
+@unittest.skipIf(HTTP_LIBRARY_MISSING, "httpx atau requests tidak terinstall")
+class MerchantApiClientTest(unittest.TestCase):
+    def setUp(self):
+        self.portal = FakePortalServer(
+            accounts={USERNAME: PIN},
+            stock="1.234",
+            sales={"2024-05-01": "12.0", "2024-05-02": 7},
+        ).start()
+        self.client = MerchantApiClient(base_url=self.portal.base_url, http2=False)
+
+    def tearDown(self):
+        self.client.close()
+        self.portal.stop()
+
+    def test_login_returns_token(self):
+        token = self.client.login(USERNAME, PIN)
+        self.assertEqual(self.portal.tokens[token], USERNAME)
+
+    def test_stock(self):
+        token = self.client.login(USERNAME, PIN)
+        self.assertEqual(self.client.get_stock(token), "1234")
+
+    def test_sales_per_date(self):
+        token = self.client.login(USERNAME, PIN)
+        self.assertEqual(
+            self.client.get_tabung_terjual(token, datetime(2024, 5, 1)), 12
+        )
+        self.assertEqual(self.client.get_tabung_terjual(token, datetime(2024, 5, 2)), 7)
+        self.assertEqual(self.client.get_tabung_terjual(token, datetime(2024, 5, 3)), 0)
+
+    def test_fetch_account_data(self):
+        data = self.client.fetch_account_data(USERNAME, PIN, datetime(2024, 5, 1))
+        self.assertEqual(data, {"stok": "1234", "tabung_terjual": 12})
+
+    def test_wrong_pin_raises_auth_error(self):
+        with self.assertRaises(ApiAuthError):
+            self.client.login(USERNAME, "000000")
+
+    def test_invalid_token_raises_auth_error(self):
+        with self.assertRaises(ApiAuthError):
+            self.client.get_stock("token-palsu")
+
+
+@unittest.skipIf(HTTP_LIBRARY_MISSING, "httpx atau requests tidak terinstall")
+class ProcessAccountApiTest(unittest.TestCase):
+    """Login API yang ditolak (401) tidak boleh fallback ke login browser"""
+
+    def setUp(self):
+        try:
+            from modules.core.process_manager import ProcessManager
+        except ImportError as e:
+            self.skipTest(f"Dependency ProcessManager tidak tersedia: {e}")
+
+        self.statuses = []
+        self.manager = ProcessManager(
+            {"on_account_status": lambda *args: self.statuses.append(args)},
+            save_excel=False,
+        )
+        self.portal = FakePortalServer(accounts={USERNAME: PIN}).start()
+        self.client = MerchantApiClient(base_url=self.portal.base_url, http2=False)
+
+    def tearDown(self):
+        self.client.close()
+        self.portal.stop()
+
+    def test_rejected_login_fails_account_without_fallback(self):
+        handled = self.manager._process_account_api(
+            self.client, 1, USERNAME, "Pangkalan", "000000", "P-1", [None]
+        )
+
+        self.assertTrue(handled)
+        self.assertEqual(self.statuses[-1], (1, "error", 0))
+        self.assertEqual(self.portal.count("login"), 1)
+        self.assertEqual(self.portal.count("stock"), 0)
+
+    def test_success_finalizes_every_date(self):
+        handled = self.manager._process_account_api(
+            self.client,
+            1,
+            USERNAME,
+            "Pangkalan",
+            PIN,
+            "P-1",
+            [datetime(2024, 5, 1), datetime(2024, 5, 2)],
+        )
+
+        self.assertTrue(handled)
+        self.assertEqual(self.portal.count("login"), 1)
+        self.assertEqual(
+            [result["tanggal"] for result in self.manager.results],
+            ["2024-05-01", "2024-05-02"],
+        )
+        self.assertEqual(self.statuses[-1], (1, "done|Berhasil", 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
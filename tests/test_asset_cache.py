@@ -0,0 +1,73 @@
+"""
+Test StaticAssetCache: index dibagi antar proses tanpa saling menimpa
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import os
+import tempfile
+import unittest
+
+try:
+    from modules.browser.setup import StaticAssetCache
+except ImportError as e:  # playwright tidak terinstall
+    StaticAssetCache = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+
+class FakeResponse:
+    status = 200
+
+    def __init__(self, etag="v1"):
+        self.headers = {
+            "content-type": "text/javascript",
+            "cache-control": "public, max-age=600",
+            "etag": etag,
+        }
+
+
+@unittest.skipIf(StaticAssetCache is None, f"Dependency tidak tersedia: {IMPORT_ERROR}")
+class StaticAssetCacheIndexTest(unittest.TestCase):
+    """Dua instance di folder yang sama mensimulasikan dua proses shard"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self, max_bytes=1024 * 1024):
+        return StaticAssetCache(cache_dir=self.tmp.name, max_bytes=max_bytes, hosts=["x"])
+
+    def test_entries_from_other_process_are_kept(self):
+        first, second = self._cache(), self._cache()
+
+        first._store("https://x/a.js", FakeResponse(), b"a" * 10)
+        second._store("https://x/b.js", FakeResponse(), b"b" * 10)
+        first.flush()
+
+        self.assertEqual(set(self._cache()._index), {"https://x/a.js", "https://x/b.js"})
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.endswith(".tmp")])
+
+    def test_newer_entry_wins_and_eviction_is_shared(self):
+        first, second = self._cache(max_bytes=25), self._cache(max_bytes=25)
+
+        first._store("https://x/a.js", FakeResponse("v1"), b"a" * 10)
+        second._store("https://x/a.js", FakeResponse("v2"), b"A" * 10)
+        first.flush()
+        self.assertEqual(self._cache()._index["https://x/a.js"]["etag"], "v2")
+
+        # Total 30 byte > 25: entry LRU (a.js) dibuang untuk kedua proses
+        first._store("https://x/c.js", FakeResponse(), b"c" * 10)
+        second._store("https://x/d.js", FakeResponse(), b"d" * 10)
+        second.flush()
+
+        index = self._cache()._index
+        self.assertNotIn("https://x/a.js", index)
+        self.assertEqual(set(index), {"https://x/c.js", "https://x/d.js"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Test RouteTable: route yang dipelajari beberapa proses (shard) digabung
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import os
+import tempfile
+import unittest
+
+try:
+    from modules.browser.page_routes import RouteTable
+except ImportError as e:  # playwright tidak terinstall
+    RouteTable = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+ORIGIN = "https://subsiditepatlpg.mypertamina.id"
+
+
+@unittest.skipIf(RouteTable is None, f"Dependency tidak tersedia: {IMPORT_ERROR}")
+class RouteTableSaveTest(unittest.TestCase):
+    """Dua instance di file yang sama mensimulasikan dua proses shard"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page_routes.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _table(self):
+        return RouteTable(self.path, configured={})
+
+    def test_routes_from_every_process_are_kept(self):
+        first, second = self._table(), self._table()
+
+        self.assertTrue(first.learn("dashboard", f"{ORIGIN}/merchant/app"))
+        self.assertTrue(second.learn("atur-produk", f"{ORIGIN}/merchant/app/produk"))
+
+        table = self._table()
+        self.assertEqual(table.get("dashboard"), "/merchant/app")
+        self.assertEqual(table.get("atur-produk"), "/merchant/app/produk")
+        self.assertEqual(second.get("dashboard"), "/merchant/app")
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.endswith(".tmp")])
+
+    def test_forget_only_removes_own_route(self):
+        first, second = self._table(), self._table()
+        first.learn("dashboard", f"{ORIGIN}/merchant/app")
+        second.learn("atur-produk", f"{ORIGIN}/merchant/app/produk")
+
+        first.forget("dashboard")
+
+        table = self._table()
+        self.assertIsNone(table.get("dashboard"))
+        self.assertEqual(table.get("atur-produk"), "/merchant/app/produk")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Test SessionCache: session dengan token/cookie kedaluwarsa tidak dipulihkan
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import base64
+import json
+import tempfile
+import time
+import unittest
+
+try:
+    from modules.browser.session_cache import SessionCache
+except ImportError as e:  # playwright tidak terinstall
+    SessionCache = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+USERNAME = "pangkalan@mail.com"
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode()
+    return f"header.{payload.rstrip('=')}.signature"
+
+
+class FakeContext:
+    def __init__(self, state):
+        self.state = state
+
+    def storage_state(self):
+        return self.state
+
+
+@unittest.skipIf(SessionCache is None, f"Dependency tidak tersedia: {IMPORT_ERROR}")
+class SessionCacheExpiryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SessionCache(cache_dir=self.tmp.name, ttl_hours=6)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _save(self, state):
+        self.assertTrue(self.cache.save(USERNAME, FakeContext(state)))
+
+    def test_valid_token_is_restored(self):
+        state = {
+            "cookies": [{"name": "sid", "expires": -1}],
+            "origins": [{"localStorage": [{"name": "token", "value": _jwt(time.time() + 600)}]}],
+        }
+        self._save(state)
+        self.assertEqual(self.cache.load(USERNAME), state)
+
+    def test_expired_token_is_skipped(self):
+        stored = json.dumps({"accessToken": _jwt(time.time() - 60)})
+        self._save({"cookies": [], "origins": [{"localStorage": [{"name": "auth", "value": stored}]}]})
+
+        self.assertIsNone(self.cache.load(USERNAME))
+        # File session ikut dihapus
+        self.assertIsNone(self.cache.load(USERNAME))
+
+    def test_expired_cookies_are_skipped(self):
+        self._save({"cookies": [{"name": "sid", "expires": time.time() - 60}], "origins": []})
+        self.assertIsNone(self.cache.load(USERNAME))
+
+    def test_state_without_expiry_is_restored(self):
+        state = {"cookies": [{"name": "sid", "expires": -1}], "origins": []}
+        self._save(state)
+        self.assertEqual(self.cache.load(USERNAME), state)
+
+
+if __name__ == "__main__":
+    unittest.main()
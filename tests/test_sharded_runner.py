@@ -0,0 +1,59 @@
+"""
+Test ShardedRunner: metrik telemetry shard digabung di proses induk
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import queue
+import unittest
+
+from modules.core.telemetry import TelemetryManager
+
+try:
+    from modules.core.sharded_runner import ShardedRunner, _TelemetryForwarder
+except ImportError as e:  # playwright tidak terinstall
+    ShardedRunner = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+
+class FinishedProcess:
+    exitcode = 0
+
+    def is_alive(self):
+        return False
+
+
+@unittest.skipIf(ShardedRunner is None, f"Dependency tidak tersedia: {IMPORT_ERROR}")
+class ShardTelemetryTest(unittest.TestCase):
+    def test_shard_metrics_are_merged_once(self):
+        shard = TelemetryManager()
+        events = queue.Queue()
+        forwarder = _TelemetryForwarder(shard, 0, events)
+
+        forwarder.record_account_start("akun1")
+        shard.increment_counter("nav_pushstate")
+        shard.record_duration("login_outcome", 0.4)
+        shard.record_event("browser_recycle", {"rss_mb": 1600})
+        forwarder.record_account_success("akun1")
+        metrics = shard.export_metrics(
+            exclude_operations=_TelemetryForwarder.LIFECYCLE_OPERATIONS
+        )
+        events.put((0, "shard_done", (1, metrics)))
+
+        runner = ShardedRunner()
+        runner.telemetry = TelemetryManager()
+        runner._collect_events([[{"id": 0}]], [FinishedProcess()], events, 1)
+
+        parent = runner.telemetry
+        self.assertEqual(parent.successful_accounts, 1)
+        self.assertEqual(parent.counters["nav_pushstate"], 1)
+        self.assertEqual(parent.counters["browser_recycle"], 1)
+        self.assertEqual(parent.operation_durations["login_outcome"], [0.4])
+        self.assertEqual(len(parent.operation_durations["account_processing"]), 1)
+        self.assertEqual(parent.events[0]["rss_mb"], 1600)
+
+
+if __name__ == "__main__":
+    unittest.main()
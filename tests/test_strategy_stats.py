@@ -0,0 +1,58 @@
+"""
+Test StrategyStats: statistik beberapa proses (shard) digabung, bukan ditimpa
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import os
+import tempfile
+import unittest
+
+from modules.browser.strategy_stats import StrategyStats
+
+
+class StrategyStatsSaveTest(unittest.TestCase):
+    """Dua instance di file yang sama mensimulasikan dua proses shard"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "strategy_stats.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_counts_from_every_process_are_kept(self):
+        first = StrategyStats(self.path, window=0)
+        second = StrategyStats(self.path, window=0)
+
+        first.record("extract:stock", "a", True, 1.0)
+        second.record("extract:stock", "a", False, 2.0)
+        second.record("extract:stock", "b", True, 0.5)
+        first.save()
+        second.save()
+        # Save ulang tanpa percobaan baru tidak menggandakan hitungan
+        first.save()
+
+        merged = StrategyStats(self.path, window=0)
+        self.assertEqual(
+            merged.get("extract:stock", "a"),
+            {"hits": 1, "misses": 1, "total_seconds": 3.0},
+        )
+        self.assertEqual(merged.get("extract:stock", "b")["hits"], 1)
+        self.assertEqual(first.get("extract:stock", "b")["hits"], 1)
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.endswith(".tmp")])
+
+    def test_decay_applies_to_merged_counts(self):
+        first = StrategyStats(self.path, window=4)
+        second = StrategyStats(self.path, window=4)
+        for stats in (first, second):
+            stats.record("nav:dashboard", "goto", True, 1.0)
+            stats.record("nav:dashboard", "goto", True, 1.0)
+            stats.save()
+
+        merged = StrategyStats(self.path, window=4)
+        self.assertEqual(merged.get("nav:dashboard", "goto")["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Test sync transaksi: pembelian berulang NIK yang sama tercatat per kartu
+
+Jalankan: python -m pytest tests  (atau python -m unittest discover tests)
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    from modules.browser.extractor import card_key
+    from modules.data import transaction_store
+    from modules.data.transaction_store import TransactionStore, sync_transactions
+except ImportError as e:  # playwright tidak terinstall
+    transaction_store = None
+    IMPORT_ERROR = str(e)
+else:
+    IMPORT_ERROR = ""
+
+NIK_A = "7101010101010011"
+NIK_B = "7101010101010022"
+
+
+def _cards(*niks):
+    """Kartu seperti hasil iter_customer_cards (urut terbaru dulu)"""
+    occurrences = {}
+    cards = []
+    for no, nik in enumerate(niks, start=1):
+        ke = occurrences.get(nik, 0)
+        occurrences[nik] = ke + 1
+        cards.append({"no": no, "nama": f"Customer {nik[-2:]}", "nik": nik,
+                      "ke": ke, "key": card_key(nik, ke)})
+    return cards
+
+
+@unittest.skipIf(transaction_store is None, f"Dependency tidak tersedia: {IMPORT_ERROR}")
+class SyncTransactionsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "transactions.sqlite3")
+        self.store = TransactionStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _sync(self, cards, details):
+        opened = []
+
+        def fake_fetch(page, batch, which="all", serial_fallback=True):
+            opened.extend(customer["key"] for customer in batch)
+            return {customer["key"]: details.get(customer["key"]) for customer in batch}
+
+        with mock.patch.object(transaction_store, "iter_customer_cards",
+                               return_value=iter(cards)), \
+                mock.patch.object(transaction_store, "fetch_transaction_details",
+                                  side_effect=fake_fetch):
+            summary = sync_transactions(None, "P-1", store=self.store, batch_size=2)
+        return summary, opened
+
+    def test_repeat_purchases_are_separate_transactions(self):
+        cards = _cards(NIK_A, NIK_B, NIK_A, NIK_A)
+        details = {
+            card_key(NIK_A, 0): {"waktu": "30 Jan 2026 · 09:00", "tabung": 1},
+            card_key(NIK_B, 0): {"waktu": "30 Jan 2026 · 08:00", "tabung": 2},
+            card_key(NIK_A, 1): {"waktu": "30 Jan 2026 · 07:00", "tabung": 1},
+            card_key(NIK_A, 2): {"waktu": "30 Jan 2026 · 07:00", "tabung": 3},
+        }
+
+        summary, opened = self._sync(cards, details)
+
+        self.assertEqual(opened, [card["key"] for card in cards])
+        self.assertEqual(summary["new"], 4)
+        self.assertEqual(summary["high_water"], "2026-01-30 09:00")
+        rows = self.store.get_transactions("P-1")
+        self.assertEqual(
+            [(row["waktu"], row["nik"], row["tabung"], row["urutan"]) for row in rows],
+            [
+                ("2026-01-30 09:00", NIK_A, 1, 0),
+                ("2026-01-30 08:00", NIK_B, 2, 0),
+                ("2026-01-30 07:00", NIK_A, 1, 0),
+                ("2026-01-30 07:00", NIK_A, 3, 1),
+            ],
+        )
+
+    def test_resync_of_high_water_minute_adds_no_duplicates(self):
+        cards = _cards(NIK_A, NIK_A)
+        details = {
+            card_key(NIK_A, 0): {"waktu": "30 Jan 2026 · 09:00", "tabung": 1},
+            card_key(NIK_A, 1): {"waktu": "30 Jan 2026 · 09:00", "tabung": 2},
+        }
+        self._sync(cards, details)
+
+        summary, _ = self._sync(cards, details)
+
+        self.assertEqual(summary["new"], 0)
+        self.assertEqual(len(self.store.get_transactions("P-1")), 2)
+
+    def test_old_database_is_migrated(self):
+        self.store.close()
+        old_path = os.path.join(self.tmp.name, "lama.sqlite3")
+        conn = sqlite3.connect(old_path)
+        conn.executescript(
+            "CREATE TABLE transactions (pangkalan_id TEXT NOT NULL, waktu TEXT NOT NULL,"
+            " nik TEXT NOT NULL, nama TEXT, tabung INTEGER,"
+            " PRIMARY KEY (pangkalan_id, waktu, nik)) WITHOUT ROWID;"
+            "INSERT INTO transactions VALUES ('P-1', '2026-01-30 09:00', '1', 'A', 1);"
+        )
+        conn.commit()
+        conn.close()
+
+        self.store = TransactionStore(old_path)
+
+        self.assertEqual(
+            self.store.get_transactions("P-1"),
+            [{"waktu": "2026-01-30 09:00", "nik": "1", "nama": "A", "tabung": 1, "urutan": 0}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()